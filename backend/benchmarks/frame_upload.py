@@ -0,0 +1,127 @@
+"""
+Frame Upload Benchmark
+Compares bytes-on-wire and latency of the base64 JSON path (/cheating/log)
+against the binary path (/cheating/log_binary) and the WebSocket stream
+
+Requires a running backend and ML service:
+
+    python benchmarks/frame_upload.py --image frame.jpg --requests 200
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+
+from latency_stats import latency_summary
+
+
+def _request_size(request: httpx.Request) -> int:
+    """Approximate HTTP/1.1 request size: request line + headers + body"""
+    head = f"{request.method} {request.url.raw_path.decode()} HTTP/1.1\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in request.headers.items()) + "\r\n"
+    return len(head.encode()) + len(request.content)
+
+
+def _report(name: str, latencies: List[float], bytes_sent: List[int]) -> Dict:
+    return {
+        "path": name,
+        "requests": len(latencies),
+        "bytes_per_frame": int(statistics.mean(bytes_sent)),
+        **latency_summary(latencies),
+    }
+
+
+async def bench_json(client: httpx.AsyncClient, frame: bytes, n: int) -> Dict:
+    interview_id = f"bench-{uuid.uuid4()}"
+    latencies, sizes = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        payload = {
+            "interview_id": interview_id,
+            "frame_data": base64.b64encode(frame).decode(),
+        }
+        request = client.build_request("POST", "/cheating/log", json=payload)
+        response = await client.send(request)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        sizes.append(_request_size(request))
+    await client.delete(f"/cheating/timeline/{interview_id}")
+    return _report("json_base64", latencies, sizes)
+
+
+async def bench_binary(client: httpx.AsyncClient, frame: bytes, n: int) -> Dict:
+    interview_id = f"bench-{uuid.uuid4()}"
+    latencies, sizes = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        request = client.build_request(
+            "POST",
+            "/cheating/log_binary",
+            params={"interview_id": interview_id},
+            content=frame,
+            headers={"Content-Type": "image/jpeg"},
+        )
+        response = await client.send(request)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        sizes.append(_request_size(request))
+    await client.delete(f"/cheating/timeline/{interview_id}")
+    return _report("binary", latencies, sizes)
+
+
+async def bench_websocket(base_url: str, frame: bytes, n: int) -> Dict:
+    try:
+        import websockets
+    except ImportError:
+        return {"path": "websocket", "skipped": "websockets package not installed"}
+
+    interview_id = f"bench-{uuid.uuid4()}"
+    ws_url = (
+        base_url.replace("http", "ws", 1)
+        + f"/cheating/stream/{interview_id}?push=all"
+    )
+    latencies, sizes = [], []
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        for _ in range(n):
+            start = time.perf_counter()
+            await ws.send(frame)
+            await ws.recv()
+            latencies.append(time.perf_counter() - start)
+            # Binary frame header is 2-14 bytes; client frames add a 4 byte mask
+            sizes.append(len(frame) + 8 + 4)
+    return _report("websocket", latencies, sizes)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--image", required=True, help="JPEG webcam frame to send")
+    parser.add_argument("--url", default="http://localhost:8005", help="Backend URL")
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        frame = f.read()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0) as client:
+        # Warm up connections and the ML service before measuring
+        await bench_binary(client, frame, 3)
+
+        results = [
+            await bench_json(client, frame, args.requests),
+            await bench_binary(client, frame, args.requests),
+        ]
+    results.append(await bench_websocket(args.url, frame, args.requests))
+
+    print(f"Frame size: {len(frame)} bytes")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
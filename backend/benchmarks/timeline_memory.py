@@ -0,0 +1,103 @@
+"""
+Timeline Memory Benchmark
+Compares bytes per event of a list of event dicts against CompactTimeline
+(plain and run-length encoded)
+
+Runs offline (no services needed):
+
+    python benchmarks/timeline_memory.py --events 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.compact_timeline import CompactTimeline, pack_event  # noqa: E402
+
+# Representative ML results: mostly normal frames with occasional issues
+_SAMPLES = [
+    ("NORMAL", "low", 1, False, [], 0),
+    ("NORMAL", "low", 1, False, ["Eyes not clearly visible - possible gaze away"], 5),
+    ("LOOKING_AWAY_INTERNAL", "medium", 1, False,
+     ["Face not centered - possible looking away"], 30),
+    ("NO_FACE_INTERNAL", "high", 0, False, ["No face detected"], 70),
+    ("MULTIPLE_FACES_INTERNAL", "critical", 2, False,
+     ["Multiple faces detected (2)"], 90),
+    ("MOBILE_DEVICE_DETECTED", "critical", 1, True,
+     ["Possible mobile phone detected in frame"], 85),
+]
+_WEIGHTS = [80, 8, 5, 4, 2, 1]
+
+
+def make_events(count: int):
+    start = datetime.utcnow()
+    events = []
+    for i in range(count):
+        event, severity, faces, mobile, issues, score = random.choices(
+            _SAMPLES, _WEIGHTS
+        )[0]
+        events.append(
+            {
+                "timestamp": (start + timedelta(seconds=3 * i)).isoformat(),
+                "event": event,
+                "severity": severity,
+                "num_faces": faces,
+                "mobile_detected": mobile,
+                # Each parsed ML response carries its own list and strings
+                "issues": [str(issue) for issue in issues],
+                "cheating_score": score,
+                "message": " | ".join(issues) or "No significant issues detected",
+            }
+        )
+    return events
+
+
+def measure(build) -> int:
+    """Bytes allocated (and still live) while building a structure"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    structure = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del structure
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Events are rebuilt inside each measurement so both pay for their own copies
+    dict_bytes = measure(lambda: make_events(args.events))
+    compact_bytes = measure(lambda: CompactTimeline(make_events(args.events)))
+    rle_bytes = measure(
+        lambda: CompactTimeline(make_events(args.events), compress=True)
+    )
+    packed_bytes = sum(
+        len(json.dumps(pack_event(e), separators=(",", ":")))
+        for e in make_events(args.events)
+    )
+    json_bytes = sum(len(json.dumps(e)) for e in make_events(args.events))
+
+    results = {
+        "events": args.events,
+        "list_of_dicts_bytes_per_event": round(dict_bytes / args.events, 1),
+        "compact_timeline_bytes_per_event": round(compact_bytes / args.events, 1),
+        "reduction": f"{dict_bytes / max(compact_bytes, 1):.1f}x",
+        # Random frames are a worst case; steady real sessions form longer runs
+        "compact_rle_bytes_per_event": round(rle_bytes / args.events, 1),
+        "redis_json_bytes_per_event": round(json_bytes / args.events, 1),
+        "redis_packed_bytes_per_event": round(packed_bytes / args.events, 1),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,14 @@ Provides conversational AI interview simulator with anti-cheating integration
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import interview_router, cheating_router
+from services.capture_governor import capture_governor
+from services.greeting_cache import greeting_cache
+from services.llm_client import llm_clients
+from services.ml_client import ml_client
+from services.prompt_templates import get_cache_stats as get_prompt_cache_stats
+from services.session_store import session_store, run_sweeper
 from utils.config import settings
+import asyncio
 import uvicorn
 
 # Initialize FastAPI app
@@ -32,6 +39,40 @@ app.include_router(
 )
 
 
+# Background tasks started with the app
+background_tasks = []
+
+
+@app.on_event("startup")
+async def startup():
+    """Open the shared ML service connection pool and start background tasks"""
+    await ml_client.start()
+    background_tasks.append(
+        asyncio.create_task(
+            run_sweeper(session_store, settings.SESSION_SWEEP_INTERVAL)
+        )
+    )
+    if settings.GREETING_CACHE_ENABLED and settings.GREETING_PREWARM:
+        # Warm in the background so startup is not blocked on the LLM
+        background_tasks.append(
+            asyncio.create_task(
+                greeting_cache.prewarm(
+                    interview_router.VALID_ROLES, interview_router.VALID_PERSONAS
+                )
+            )
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks and close shared clients and the session store"""
+    for task in background_tasks:
+        task.cancel()
+    await ml_client.close()
+    await llm_clients.close()
+    await session_store.close()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -48,7 +89,13 @@ async def health_check():
     return {
         "status": "healthy",
         "llm_provider": settings.LLM_PROVIDER,
+        "llm_clients": llm_clients.get_stats(),
+        "greeting_cache": greeting_cache.get_stats(),
+        "prompt_cache": get_prompt_cache_stats(),
         "ml_service_url": settings.ML_SERVICE_URL,
+        "ml_connection_pool": ml_client.get_stats(),
+        "capture_governor": capture_governor.get_stats(),
+        "sessions": await session_store.get_stats(),
     }
 
 
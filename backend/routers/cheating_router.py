@@ -3,18 +3,28 @@ Cheating Router
 Handles cheating detection logging and timeline retrieval
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+import time
 import httpx
+from services.capture_governor import capture_governor
+from services.cheating_monitor import EventAggregate
+from services.compact_timeline import format_timestamp, parse_timestamp
+from services.ml_client import MLFrameStream, MLServiceError, ml_client
+from services.session_store import session_store
 from utils.config import settings
 
 router = APIRouter()
 
-# In-memory storage for cheating events (use Redis/DB in production)
-cheating_timelines: Dict[str, List[Dict[str, Any]]] = {}
-
 
 # Pydantic models
 class CheatingLogRequest(BaseModel):
@@ -28,6 +38,8 @@ class CheatingLogResponse(BaseModel):
     event_logged: bool
     detection_result: Dict[str, Any]
     severity: str
+    event: Optional[str] = None
+    next_capture_ms: Optional[int] = None  # Recommended delay before the next frame
 
 
 class CheatingTimelineResponse(BaseModel):
@@ -35,6 +47,9 @@ class CheatingTimelineResponse(BaseModel):
     total_events: int
     timeline: List[Dict[str, Any]]
     summary: Dict[str, Any]
+    view: str = "events"  # "intervals": timeline holds runs of identical events
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
+    has_more: bool = False
 
 
 @router.post("/log", response_model=CheatingLogResponse)
@@ -45,74 +60,172 @@ async def log_cheating_event(request: CheatingLogRequest):
     - Stores event in timeline
     - Returns detection result
     """
-    # Use provided timestamp or generate new one
-    timestamp = request.timestamp or datetime.utcnow().isoformat()
-
-    # Initialize timeline for this interview if not exists
-    if request.interview_id not in cheating_timelines:
-        cheating_timelines[request.interview_id] = []
-
     try:
         # Decode base64 image
         import base64
 
         image_bytes = base64.b64decode(request.frame_data)
-
-        # Call ML service for face detection with multipart/form-data
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            files = {"image": ("frame.jpg", image_bytes, "image/jpeg")}
-            ml_response = await client.post(
-                f"{settings.ML_SERVICE_URL}/ml/check_face", files=files
-            )
-            ml_response.raise_for_status()
-            detection_result = ml_response.json()
-
-        # Determine event type based on detection result
-        event_type = determine_event_type(detection_result)
-        severity = detection_result.get("severity", "low")
-
-        # Create event entry
-        event_entry = {
-            "timestamp": timestamp,
-            "event": event_type,
-            "severity": severity,
-            "num_faces": detection_result.get("num_faces", 0),
-            "mobile_detected": detection_result.get("mobile_detected", False),
-            "issues": detection_result.get("issues", []),
-            "cheating_score": detection_result.get("cheating_score", 0),
-            "message": detection_result.get("message", ""),
-        }
-
-        # Log all events internally for backend tracking
-        cheating_timelines[request.interview_id].append(event_entry)
-
-        # Notify frontend for critical events (mobile detection only)
-        critical_events = ["MOBILE_DEVICE_DETECTED"]
-        event_logged = event_type in critical_events
-
-        return CheatingLogResponse(
-            interview_id=request.interview_id,
-            event_logged=event_logged,
-            detection_result=detection_result,
-            severity=severity,
-        )
-
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=503, detail=f"ML service unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error processing cheating detection: {str(e)}"
         )
 
+    return await process_frame(request.interview_id, image_bytes, request.timestamp)
+
+
+@router.post("/log_binary", response_model=CheatingLogResponse)
+async def log_cheating_event_binary(
+    request: Request,
+    interview_id: Optional[str] = Query(None),
+    timestamp: Optional[str] = Query(None),
+    x_interview_id: Optional[str] = Header(None),
+    x_frame_timestamp: Optional[str] = Header(None),
+):
+    """
+    Log a cheating detection event from a binary frame
+    - Accepts the encoded image as the raw body (image/jpeg or
+      application/octet-stream) with interview_id in the query string or
+      X-Interview-Id header, or as multipart/form-data with a "frame" file
+    - Forwards the bytes to the ML service without base64 or multipart re-encoding
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        frame = form.get("frame")
+        if frame is None or not hasattr(frame, "read"):
+            raise HTTPException(status_code=400, detail="Missing 'frame' file field")
+        image_bytes = await frame.read()
+        frame_content_type = frame.content_type or "image/jpeg"
+        interview_id = interview_id or form.get("interview_id")
+        timestamp = timestamp or form.get("timestamp")
+    else:
+        image_bytes = await request.body()
+        frame_content_type = content_type or "application/octet-stream"
+
+    # The ML service only decodes images; reject anything else here rather
+    # than surfacing its 415 as an ML outage
+    if not frame_content_type.startswith(("image/", "application/octet-stream")):
+        raise HTTPException(
+            status_code=415,
+            detail="Frame must be an image or application/octet-stream",
+        )
+
+    interview_id = interview_id or x_interview_id
+    if not interview_id:
+        raise HTTPException(status_code=400, detail="interview_id is required")
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty frame")
+
+    return await process_frame(
+        interview_id,
+        image_bytes,
+        timestamp or x_frame_timestamp,
+        content_type=frame_content_type,
+    )
+
+
+@router.websocket("/stream/{interview_id}")
+async def stream_cheating_frames(
+    websocket: WebSocket, interview_id: str, push: str = "changes"
+):
+    """
+    Continuous proctoring channel for an interview
+    - Each binary client message is one encoded frame (JPEG)
+    - Frames are forwarded to the ML service over one long-lived connection
+    - With push="changes" (default) the server only sends a message when the
+      detected state (event type and severity) or the recommended capture
+      interval changes; push="all" answers every frame
+    - Messages are {"type": "alert" | "state", ...CheatingLogResponse} or
+      {"type": "error", "error", "status_code"}
+    """
+    await websocket.accept()
+    stream = ml_client.open_stream(interview_id)
+    last_state = None
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            frame = message.get("bytes")
+            if not frame:
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "error": "Frames must be sent as binary messages",
+                        "status_code": 400,
+                    }
+                )
+                continue
+
+            try:
+                response = await process_frame(
+                    interview_id, frame, None, content_type="image/jpeg", stream=stream
+                )
+                state = (response.event, response.severity, response.next_capture_ms)
+                payload = {
+                    "type": "alert" if response.event_logged else "state",
+                    **response.model_dump(),
+                }
+            except HTTPException as e:
+                state = ("ERROR", e.status_code)
+                payload = {"type": "error", "error": e.detail, "status_code": e.status_code}
+
+            if push == "all" or state != last_state:
+                await websocket.send_json(payload)
+            last_state = state
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if stream is not None:
+            await stream.close()
+
 
 @router.get("/timeline/{interview_id}", response_model=CheatingTimelineResponse)
-async def get_cheating_timeline(interview_id: str):
+async def get_cheating_timeline(
+    interview_id: str,
+    view: str = Query("events", pattern="^(events|intervals)$"),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    event: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    summary_only: bool = False,
+):
     """
-    Retrieve complete cheating timeline for an interview
-    - Returns all logged events
-    - Provides summary statistics
+    Retrieve cheating timeline for an interview
+    - Returns logged events, or with view=intervals, runs of identical
+      (event, severity, num_faces) frames with start/end, count and max_score
+    - since/until (ISO 8601) and event (repeatable) filter the timeline
+    - limit pages the result; pass next_cursor back as cursor while has_more
+    - summary_only skips the timeline and returns just the summary
+    - Provides summary statistics (always over the whole interview)
     """
-    if interview_id not in cheating_timelines:
+    since_epoch = _parse_time_filter("since", since)
+    until_epoch = _parse_time_filter("until", until)
+
+    # Summary statistics are maintained as events are logged
+    summary = await session_store.get_event_summary(interview_id)
+
+    if summary_only:
+        page = None
+    else:
+        try:
+            page = await session_store.query_timeline(
+                interview_id,
+                cursor=cursor,
+                since=since_epoch,
+                until=until_epoch,
+                event_types=set(event) if event else None,
+                limit=limit,
+                as_intervals=view == "intervals",
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    if summary is None and page is None:
         # Return empty timeline if no events logged
         return CheatingTimelineResponse(
             interview_id=interview_id,
@@ -127,31 +240,131 @@ async def get_cheating_timeline(interview_id: str):
                 "distance_violations": 0,
                 "overall_cheating_probability": 0,
             },
+            view=view,
         )
 
-    timeline = cheating_timelines[interview_id]
-
-    # Calculate summary statistics
-    summary = calculate_cheating_summary(timeline)
+    if summary is None:
+        summary = calculate_cheating_summary(
+            await session_store.get_events(interview_id) or []
+        )
 
     return CheatingTimelineResponse(
         interview_id=interview_id,
-        total_events=len(timeline),
-        timeline=timeline,
+        total_events=summary["total_events"],
+        timeline=page["items"] if page else [],
         summary=summary,
+        view=view,
+        next_cursor=page["next_cursor"] if page else None,
+        has_more=page["has_more"] if page else False,
     )
 
 
+def _parse_time_filter(name: str, value: Optional[str]) -> Optional[float]:
+    """ISO 8601 query parameter -> epoch seconds (400 if unparseable)"""
+    if value is None:
+        return None
+    epoch = parse_timestamp(value)
+    if epoch is None:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp: {value}")
+    return epoch
+
+
 @router.delete("/timeline/{interview_id}")
 async def clear_timeline(interview_id: str):
     """Clear cheating timeline for an interview (cleanup)"""
-    if interview_id in cheating_timelines:
-        del cheating_timelines[interview_id]
+    if await session_store.delete_events(interview_id):
         return {"message": "Timeline cleared", "interview_id": interview_id}
     return {"message": "No timeline found", "interview_id": interview_id}
 
 
 # Helper functions
+async def process_frame(
+    interview_id: str,
+    image_bytes: bytes,
+    timestamp: Optional[str],
+    content_type: Optional[str] = None,
+    stream: Optional[MLFrameStream] = None,
+) -> CheatingLogResponse:
+    """
+    Analyze one frame and record it in the interview's timeline
+
+    Frames go over the given ML stream when there is one (falling back to
+    HTTP if the stream breaks). Otherwise, when content_type is given the
+    bytes are forwarded as the raw request body, else as multipart/form-data.
+    """
+    try:
+        if stream is not None:
+            try:
+                detection_result = await stream.analyze(image_bytes)
+            except MLServiceError:
+                raise
+            except Exception:
+                detection_result = await ml_client.check_face_raw(
+                    image_bytes, content_type or "image/jpeg", interview_id
+                )
+        # Call ML service for face detection over the shared connection pool
+        elif content_type:
+            detection_result = await ml_client.check_face_raw(
+                image_bytes, content_type, interview_id
+            )
+        else:
+            detection_result = await ml_client.check_face(image_bytes, interview_id)
+
+        return await record_detection(interview_id, detection_result, timestamp)
+
+    except (httpx.HTTPError, MLServiceError) as e:
+        raise HTTPException(status_code=503, detail=f"ML service unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error processing cheating detection: {str(e)}"
+        )
+
+
+async def record_detection(
+    interview_id: str, detection_result: Dict[str, Any], timestamp: Optional[str]
+) -> CheatingLogResponse:
+    """Store an ML detection result in the interview's timeline"""
+    # Use provided timestamp or generate new one, in the format the timeline
+    # returns (UTC, millisecond precision) so nothing is lost on storage
+    timestamp = timestamp or format_timestamp(time.time())
+
+    # Determine event type based on detection result
+    event_type = determine_event_type(detection_result)
+    severity = detection_result.get("severity", "low")
+
+    # Create event entry
+    event_entry = {
+        "timestamp": timestamp,
+        "event": event_type,
+        "severity": severity,
+        "num_faces": detection_result.get("num_faces", 0),
+        "mobile_detected": detection_result.get("mobile_detected", False),
+        "issues": detection_result.get("issues", []),
+        "cheating_score": detection_result.get("cheating_score", 0),
+        "message": detection_result.get("message", ""),
+    }
+
+    # Log all events internally for backend tracking
+    calm_streak = await session_store.append_event(interview_id, event_entry)
+
+    # Notify frontend for critical events (mobile detection only)
+    critical_events = ["MOBILE_DEVICE_DETECTED"]
+    event_logged = event_type in critical_events
+
+    return CheatingLogResponse(
+        interview_id=interview_id,
+        event_logged=event_logged,
+        detection_result=detection_result,
+        severity=severity,
+        event=event_type,
+        next_capture_ms=(
+            capture_governor.next_interval_ms(severity, calm_streak)
+            if settings.CAPTURE_ADAPTIVE
+            else None
+        ),
+    )
+
+
 def determine_event_type(detection_result: Dict[str, Any]) -> str:
     """Determine cheating event type from ML service response"""
     num_faces = detection_result.get("num_faces", 0)
@@ -186,36 +399,5 @@ def determine_event_type(detection_result: Dict[str, Any]) -> str:
 
 
 def calculate_cheating_summary(timeline: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate summary statistics from cheating timeline"""
-    total_events = len(timeline)
-    critical_events = sum(1 for e in timeline if e["severity"] == "critical")
-    face_missing_count = sum(1 for e in timeline if e["event"] == "NO_FACE")
-    looking_away_count = sum(1 for e in timeline if e["event"] == "LOOKING_AWAY")
-    multiple_faces_count = sum(1 for e in timeline if e["event"] == "MULTIPLE_FACES")
-    distance_violations = sum(
-        1 for e in timeline if e["event"] in ["DISTANCE_TOO_CLOSE", "DISTANCE_TOO_FAR"]
-    )
-
-    # Calculate overall cheating probability
-    if total_events == 0:
-        probability = 0
-    else:
-        # Weight different violations
-        score = (
-            critical_events * 20
-            + multiple_faces_count * 15
-            + face_missing_count * 10
-            + looking_away_count * 5
-            + distance_violations * 3
-        )
-        probability = min(100, score)
-
-    return {
-        "total_events": total_events,
-        "critical_events": critical_events,
-        "face_missing_count": face_missing_count,
-        "looking_away_count": looking_away_count,
-        "multiple_faces_count": multiple_faces_count,
-        "distance_violations": distance_violations,
-        "overall_cheating_probability": probability,
-    }
+    """Calculate summary statistics from cheating timeline (single pass)"""
+    return EventAggregate.from_events(timeline).summary()
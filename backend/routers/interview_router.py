@@ -4,20 +4,26 @@ Handles all interview-related endpoints: start, next, end
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from services.llm_agent import LLMAgent
 from services.memory_manager import MemoryManager
 from services.questionnaire import Questionnaire
 from services.cheating_monitor import CheatingMonitor
+from services.greeting_cache import greeting_cache
+from services.session_store import SessionConflictError, session_store
+from utils.config import settings
 from utils.scoring import calculate_final_scores
+import json
 import uuid
 from datetime import datetime
 
 router = APIRouter()
 
-# In-memory storage for active interviews (use Redis/DB in production)
-active_interviews: Dict[str, Dict[str, Any]] = {}
+VALID_ROLES = ["SDE", "Sales", "Retail Associate", "HR"]
+# Adaptive auto-detects the user's communication style
+VALID_PERSONAS = ["Confused", "Efficient", "Chatty", "Edge-case", "Adaptive"]
 
 
 # Pydantic models for request/response
@@ -67,17 +73,15 @@ async def start_interview(request: StartInterviewRequest):
     - Returns greeting and first question
     """
     # Validate role
-    valid_roles = ["SDE", "Sales", "Retail Associate", "HR"]
-    if request.role not in valid_roles:
+    if request.role not in VALID_ROLES:
         raise HTTPException(
-            status_code=400, detail=f"Invalid role. Must be one of: {valid_roles}"
+            status_code=400, detail=f"Invalid role. Must be one of: {VALID_ROLES}"
         )
 
     # Validate persona (now includes Adaptive for auto-detection)
-    valid_personas = ["Confused", "Efficient", "Chatty", "Edge-case", "Adaptive"]
-    if request.persona not in valid_personas:
+    if request.persona not in VALID_PERSONAS:
         raise HTTPException(
-            status_code=400, detail=f"Invalid persona. Must be one of: {valid_personas}"
+            status_code=400, detail=f"Invalid persona. Must be one of: {VALID_PERSONAS}"
         )
 
     # Generate unique interview ID
@@ -86,22 +90,26 @@ async def start_interview(request: StartInterviewRequest):
     # Initialize services
     memory_manager = MemoryManager(interview_id)
     questionnaire = Questionnaire(request.role)
-    llm_agent = LLMAgent(request.persona)
     cheating_monitor = CheatingMonitor(interview_id)
 
     # Get greeting and first question
-    greeting = llm_agent.generate_greeting(request.role, request.user_name)
+    if settings.GREETING_CACHE_ENABLED:
+        greeting = await greeting_cache.get_greeting(
+            request.role, request.persona, request.user_name
+        )
+    else:
+        llm_agent = LLMAgent(request.persona)
+        greeting = await llm_agent.generate_greeting(request.role, request.user_name)
     first_question = questionnaire.get_next_question()
 
     # Store interview state
-    active_interviews[interview_id] = {
+    interview = {
         "id": interview_id,
         "role": request.role,
         "persona": request.persona,
         "user_name": request.user_name,
         "memory_manager": memory_manager,
         "questionnaire": questionnaire,
-        "llm_agent": llm_agent,
         "cheating_monitor": cheating_monitor,
         "start_time": datetime.utcnow().isoformat(),
         "question_count": 1,
@@ -110,6 +118,7 @@ async def start_interview(request: StartInterviewRequest):
 
     # Add to memory
     memory_manager.add_message("assistant", f"{greeting}\n\n{first_question}")
+    await session_store.save_interview(interview)
 
     return StartInterviewResponse(
         interview_id=interview_id,
@@ -128,14 +137,9 @@ async def next_question(request: NextQuestionRequest):
     - Decides on follow-up or next question
     - Returns agent response
     """
-    # Validate interview exists
-    if request.interview_id not in active_interviews:
-        raise HTTPException(status_code=404, detail="Interview session not found")
-
-    interview = active_interviews[request.interview_id]
+    interview = await load_interview(request.interview_id)
     memory_manager = interview["memory_manager"]
-    questionnaire = interview["questionnaire"]
-    llm_agent = interview["llm_agent"]
+    llm_agent = LLMAgent(interview["persona"])
     cheating_monitor = interview["cheating_monitor"]
 
     # Add user answer to memory
@@ -148,7 +152,7 @@ async def next_question(request: NextQuestionRequest):
     cheating_summary = cheating_monitor.get_summary()
 
     # Agent evaluates answer and decides next action
-    agent_decision = llm_agent.evaluate_and_decide(
+    agent_decision = await llm_agent.evaluate_and_decide(
         user_answer=request.user_answer,
         current_question=interview["current_question"],
         conversation_history=conversation_history,
@@ -156,43 +160,49 @@ async def next_question(request: NextQuestionRequest):
         role=interview["role"],
     )
 
-    agent_response = agent_decision["response"]
-    should_ask_followup = agent_decision["followup"]
-    interview_complete = agent_decision["complete"]
+    return await apply_agent_decision(interview, agent_decision)
 
-    # Add agent response to memory
-    memory_manager.add_message("assistant", agent_response)
 
-    next_q = None
-    is_followup = False
-    interview_ended = False
+@router.post("/next/stream")
+async def next_question_stream(request: NextQuestionRequest):
+    """
+    Streaming variant of /next (Server-Sent Events)
+    - Emits "token" events with the agent response text as it is generated
+    - Emits a final "done" event carrying the same payload as /next
+    """
+    interview = await load_interview(request.interview_id)
+    memory_manager = interview["memory_manager"]
+    llm_agent = LLMAgent(interview["persona"])
+    cheating_monitor = interview["cheating_monitor"]
 
-    if interview_complete or interview["question_count"] >= 7:
-        # Interview is complete
-        interview_ended = True
-    elif should_ask_followup:
-        # Generate follow-up question
-        next_q = agent_decision.get("followup_question", "Could you elaborate on that?")
-        is_followup = True
-        interview["current_question"] = next_q
-        memory_manager.add_message("assistant", next_q)
-    else:
-        # Move to next question
-        next_q = questionnaire.get_next_question()
-        if next_q:
-            interview["question_count"] += 1
-            interview["current_question"] = next_q
-            memory_manager.add_message("assistant", next_q)
-        else:
-            # No more questions
-            interview_ended = True
+    memory_manager.add_message("user", request.user_answer)
+    conversation_history = memory_manager.get_conversation_history()
+    cheating_summary = cheating_monitor.get_summary()
 
-    return NextQuestionResponse(
-        interview_id=request.interview_id,
-        agent_response=agent_response,
-        next_question=next_q,
-        is_followup=is_followup,
-        interview_ended=interview_ended,
+    async def event_stream():
+        try:
+            async for kind, payload in llm_agent.evaluate_and_decide_stream(
+                user_answer=request.user_answer,
+                current_question=interview["current_question"],
+                conversation_history=conversation_history,
+                cheating_summary=cheating_summary,
+                role=interview["role"],
+            ):
+                if kind == "token":
+                    yield format_sse("token", {"text": payload})
+                else:
+                    result = await apply_agent_decision(interview, payload)
+                    yield format_sse("done", result.model_dump())
+        except HTTPException as e:
+            yield format_sse("error", {"detail": e.detail, "status_code": e.status_code})
+        except Exception as e:
+            print(f"❌ Streaming error: {str(e)}")
+            yield format_sse("error", {"detail": "Failed to generate response"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -204,13 +214,9 @@ async def end_interview(request: EndInterviewRequest):
     - Includes cheating summary
     - Calculates final scores
     """
-    # Validate interview exists
-    if request.interview_id not in active_interviews:
-        raise HTTPException(status_code=404, detail="Interview session not found")
-
-    interview = active_interviews[request.interview_id]
+    interview = await load_interview(request.interview_id)
     memory_manager = interview["memory_manager"]
-    llm_agent = interview["llm_agent"]
+    llm_agent = LLMAgent(interview["persona"])
     cheating_monitor = interview["cheating_monitor"]
 
     # Get conversation history
@@ -220,14 +226,15 @@ async def end_interview(request: EndInterviewRequest):
     cheating_summary = cheating_monitor.get_detailed_summary()
 
     # Generate final feedback using LLM
-    feedback = llm_agent.generate_final_feedback(
+    feedback = await llm_agent.generate_final_feedback(
         conversation_history=conversation_history,
         role=interview["role"],
         cheating_summary=cheating_summary,
+        transcript=memory_manager.build_context(settings.CONTEXT_TOKEN_BUDGET),
     )
 
     # Clean up interview session
-    del active_interviews[request.interview_id]
+    await session_store.delete_interview(request.interview_id)
 
     return EndInterviewResponse(
         interview_id=request.interview_id,
@@ -239,16 +246,86 @@ async def end_interview(request: EndInterviewRequest):
 @router.get("/sessions")
 async def list_active_sessions():
     """List all active interview sessions (for debugging)"""
+    interviews = await session_store.list_interviews()
     return {
-        "active_sessions": len(active_interviews),
+        "active_sessions": len(interviews),
         "sessions": [
             {
-                "id": iid,
+                "id": data["id"],
                 "role": data["role"],
                 "persona": data["persona"],
                 "question_count": data["question_count"],
                 "start_time": data["start_time"],
             }
-            for iid, data in active_interviews.items()
+            for data in interviews
         ],
     }
+
+
+# Helper functions
+async def load_interview(interview_id: str) -> Dict[str, Any]:
+    """Load an interview from the session store or raise 404"""
+    interview = await session_store.get_interview(interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    return interview
+
+
+async def apply_agent_decision(
+    interview: Dict[str, Any], agent_decision: Dict[str, Any]
+) -> NextQuestionResponse:
+    """Advance the interview from the agent's decision and persist it"""
+    memory_manager = interview["memory_manager"]
+    questionnaire = interview["questionnaire"]
+
+    agent_response = agent_decision["response"]
+    should_ask_followup = agent_decision["followup"]
+    interview_complete = agent_decision["complete"]
+
+    # Add agent response to memory
+    memory_manager.add_message("assistant", agent_response)
+
+    next_q = None
+    is_followup = False
+    interview_ended = False
+
+    if interview_complete or interview["question_count"] >= 7:
+        # Interview is complete
+        interview_ended = True
+    elif should_ask_followup:
+        # Generate follow-up question
+        next_q = agent_decision.get("followup_question", "Could you elaborate on that?")
+        is_followup = True
+        interview["current_question"] = next_q
+        memory_manager.add_message("assistant", next_q)
+    else:
+        # Move to next question
+        next_q = questionnaire.get_next_question()
+        if next_q:
+            interview["question_count"] += 1
+            interview["current_question"] = next_q
+            memory_manager.add_message("assistant", next_q)
+        else:
+            # No more questions
+            interview_ended = True
+
+    try:
+        await session_store.save_interview(interview)
+    except SessionConflictError:
+        raise HTTPException(
+            status_code=409,
+            detail="Interview was updated by another request; please retry",
+        )
+
+    return NextQuestionResponse(
+        interview_id=interview["id"],
+        agent_response=agent_response,
+        next_question=next_q,
+        is_followup=is_followup,
+        interview_ended=interview_ended,
+    )
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
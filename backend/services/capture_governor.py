@@ -0,0 +1,103 @@
+"""
+Capture Governor
+Recommends how long the frontend should wait before sending the next frame
+"""
+
+from typing import Any, Dict, Optional
+from services.ml_client import ml_client
+from utils.config import settings
+
+# Severities that call for the fastest sampling rate
+ALERT_SEVERITIES = ("critical", "high")
+
+
+class CaptureGovernor:
+    """
+    Adaptive capture interval per interview
+    - Risk: high/critical detections drop to the minimum interval; a run of
+      clean ("low") frames stretches the interval towards the maximum
+    - Load: when the ML inference pool fills up (as reported by the ML
+      service, so it covers every backend worker) or this worker's ML calls
+      pile up or slow down, every interval is stretched by the same factor so
+      the fleet sheds sampling rate instead of queueing frames
+
+    The governor keeps no per-interview state: the calm streak comes from the
+    session store's timeline counters, so every worker sees the same value.
+    """
+
+    def __init__(
+        self,
+        base_interval: float = 3.0,
+        min_interval: float = 1.0,
+        max_interval: float = 12.0,
+        calm_frames: int = 5,
+        latency_target: float = 0.5,
+        in_flight_target: int = 50,
+        pool_load_target: float = 0.5,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.calm_frames = max(1, calm_frames)
+        self.latency_target = latency_target
+        self.in_flight_target = max(1, in_flight_target)
+        self.pool_load_target = pool_load_target
+
+        # Statistics
+        self.recommendations = 0
+        self.last_load_factor = 1.0
+
+    def risk_interval(self, severity: Optional[str], calm_streak: int) -> float:
+        """Interval from the latest severity and the interview's calm streak (seconds)"""
+        if severity in ALERT_SEVERITIES:
+            return self.min_interval
+        # Every calm_frames clean frames in a row add one base interval
+        return self.base_interval * (1 + calm_streak // self.calm_frames)
+
+    def load_factor(self) -> float:
+        """How far the ML service is over its pool / latency / concurrency targets (>= 1)"""
+        factor = max(
+            1.0,
+            ml_client.pool_load / self.pool_load_target
+            if self.pool_load_target > 0
+            else 1.0,
+            ml_client.in_flight / self.in_flight_target,
+            ml_client.recent_latency / self.latency_target
+            if self.latency_target > 0
+            else 1.0,
+        )
+        self.last_load_factor = factor
+        return factor
+
+    def next_interval_ms(self, severity: Optional[str], calm_streak: int = 0) -> int:
+        """
+        Recommended delay before an interview's next frame (milliseconds)
+        calm_streak is the interview's consecutive low-severity frame count
+        (as returned by SessionStore.append_event)
+        """
+        self.recommendations += 1
+        interval = self.risk_interval(severity, calm_streak) * self.load_factor()
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        return int(interval * 1000)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get governor statistics"""
+        return {
+            "recommendations": self.recommendations,
+            "load_factor": round(self.last_load_factor, 2),
+            "base_interval": self.base_interval,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+        }
+
+
+# Global governor instance
+capture_governor = CaptureGovernor(
+    base_interval=settings.CHEATING_CHECK_INTERVAL,
+    min_interval=settings.CAPTURE_MIN_INTERVAL,
+    max_interval=settings.CAPTURE_MAX_INTERVAL,
+    calm_frames=settings.CAPTURE_CALM_FRAMES,
+    latency_target=settings.CAPTURE_LOAD_LATENCY_TARGET,
+    in_flight_target=settings.CAPTURE_LOAD_IN_FLIGHT_TARGET,
+    pool_load_target=settings.CAPTURE_LOAD_POOL_TARGET,
+)
@@ -3,10 +3,115 @@ Cheating Monitor Service
 Tracks and analyzes cheating events during interviews
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
 
 
+def calculate_cheating_probability(
+    total: int,
+    critical: int,
+    multiple_faces: int,
+    no_face: int,
+    looking_away: int,
+    distance: int,
+) -> int:
+    """Calculate overall cheating probability (0-100)"""
+    if total == 0:
+        return 0
+
+    # Weighted scoring
+    score = (
+        critical * 20
+        + multiple_faces * 15
+        + no_face * 10
+        + looking_away * 5
+        + distance * 3
+    )
+
+    # Cap at 100
+    return min(100, score)
+
+
+class EventAggregate:
+    """
+    Running counts over a cheating timeline
+    Updated once per event so summaries never rescan the timeline
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.by_event: Dict[str, int] = {}
+        self.by_severity: Dict[str, int] = {}
+        self.last_severity: Optional[str] = None
+        # Consecutive low-severity events ending with the latest one
+        self.calm_streak = 0
+
+    def add(self, event: Dict[str, Any]):
+        """Count one timeline event"""
+        event_type = event.get("event")
+        severity = event.get("severity")
+        self.total += 1
+        self.by_event[event_type] = self.by_event.get(event_type, 0) + 1
+        self.by_severity[severity] = self.by_severity.get(severity, 0) + 1
+        self.last_severity = severity
+        self.calm_streak = self.calm_streak + 1 if severity == "low" else 0
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict[str, Any]]) -> "EventAggregate":
+        """Build an aggregate in a single pass over existing events"""
+        aggregate = cls()
+        for event in events:
+            aggregate.add(event)
+        return aggregate
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary statistics (same fields as the timeline endpoint's summary)"""
+        by_event = self.by_event
+        critical = self.by_severity.get("critical", 0)
+        face_missing = by_event.get("NO_FACE", 0)
+        looking_away = by_event.get("LOOKING_AWAY", 0)
+        multiple_faces = by_event.get("MULTIPLE_FACES", 0)
+        distance_issues = by_event.get("DISTANCE_TOO_CLOSE", 0) + by_event.get(
+            "DISTANCE_TOO_FAR", 0
+        )
+
+        return {
+            "total_events": self.total,
+            "critical_events": critical,
+            "face_missing_count": face_missing,
+            "looking_away_count": looking_away,
+            "multiple_faces_count": multiple_faces,
+            "distance_violations": distance_issues,
+            "overall_cheating_probability": calculate_cheating_probability(
+                self.total,
+                critical,
+                multiple_faces,
+                face_missing,
+                looking_away,
+                distance_issues,
+            ),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "by_event": self.by_event,
+            "by_severity": self.by_severity,
+            "last_severity": self.last_severity,
+            "calm_streak": self.calm_streak,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EventAggregate":
+        aggregate = cls()
+        aggregate.total = data.get("total", 0)
+        aggregate.by_event = dict(data.get("by_event", {}))
+        aggregate.by_severity = dict(data.get("by_severity", {}))
+        aggregate.last_severity = data.get("last_severity")
+        aggregate.calm_streak = data.get("calm_streak", 0)
+        return aggregate
+
+
 class CheatingMonitor:
     """
     Monitors and tracks cheating events for an interview session
@@ -16,107 +121,52 @@ class CheatingMonitor:
     def __init__(self, interview_id: str):
         self.interview_id = interview_id
         self.events: List[Dict[str, Any]] = []
+        self.aggregate = EventAggregate()
 
     def add_event(self, event_data: Dict[str, Any]):
         """Add a cheating event to the timeline"""
         event_data["logged_at"] = datetime.utcnow().isoformat()
         self.events.append(event_data)
+        self.aggregate.add(event_data)
 
     def get_summary(self) -> Dict[str, Any]:
         """Get current cheating summary (used during interview)"""
-        if not self.events:
+        if not self.aggregate.total:
             return {"total_events": 0, "critical_events": 0, "recent_severity": "low"}
 
-        critical_count = sum(1 for e in self.events if e.get("severity") == "critical")
-
-        # Get most recent severity
-        recent_severity = (
-            self.events[-1].get("severity", "low") if self.events else "low"
-        )
-
         return {
-            "total_events": len(self.events),
-            "critical_events": critical_count,
-            "recent_severity": recent_severity,
+            "total_events": self.aggregate.total,
+            "critical_events": self.aggregate.by_severity.get("critical", 0),
+            "recent_severity": self.aggregate.last_severity or "low",
         }
 
     def get_detailed_summary(self) -> Dict[str, Any]:
         """Get comprehensive cheating summary (used at end of interview)"""
-        if not self.events:
-            return {
-                "total_events": 0,
-                "critical_events": 0,
-                "face_missing_count": 0,
-                "looking_away_count": 0,
-                "multiple_faces_count": 0,
-                "distance_violations": 0,
-                "overall_cheating_probability": 0,
-                "timeline": [],
-            }
-
-        # Count different event types
-        face_missing = sum(1 for e in self.events if e.get("event") == "NO_FACE")
-        looking_away = sum(1 for e in self.events if e.get("event") == "LOOKING_AWAY")
-        multiple_faces = sum(
-            1 for e in self.events if e.get("event") == "MULTIPLE_FACES"
-        )
-        distance_issues = sum(
-            1
-            for e in self.events
-            if e.get("event") in ["DISTANCE_TOO_CLOSE", "DISTANCE_TOO_FAR"]
-        )
-        critical = sum(1 for e in self.events if e.get("severity") == "critical")
-
-        # Calculate overall probability
-        probability = self._calculate_cheating_probability(
-            len(self.events),
-            critical,
-            multiple_faces,
-            face_missing,
-            looking_away,
-            distance_issues,
-        )
-
-        return {
-            "total_events": len(self.events),
-            "critical_events": critical,
-            "face_missing_count": face_missing,
-            "looking_away_count": looking_away,
-            "multiple_faces_count": multiple_faces,
-            "distance_violations": distance_issues,
-            "overall_cheating_probability": probability,
-            "timeline": self.events,
-        }
-
-    def _calculate_cheating_probability(
-        self,
-        total: int,
-        critical: int,
-        multiple_faces: int,
-        no_face: int,
-        looking_away: int,
-        distance: int,
-    ) -> int:
-        """Calculate overall cheating probability (0-100)"""
-        if total == 0:
-            return 0
-
-        # Weighted scoring
-        score = (
-            critical * 20
-            + multiple_faces * 15
-            + no_face * 10
-            + looking_away * 5
-            + distance * 3
-        )
-
-        # Cap at 100
-        return min(100, score)
+        return {**self.aggregate.summary(), "timeline": self.events}
 
     def has_critical_violations(self) -> bool:
         """Check if there are any critical violations"""
-        return any(e.get("severity") == "critical" for e in self.events)
+        return self.aggregate.by_severity.get("critical", 0) > 0
 
     def get_violation_count(self) -> int:
         """Get total number of violations"""
-        return len(self.events)
+        return self.aggregate.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize monitor state (for external session stores)"""
+        return {
+            "interview_id": self.interview_id,
+            "events": self.events,
+            "aggregate": self.aggregate.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CheatingMonitor":
+        """Rebuild a CheatingMonitor from to_dict() output"""
+        monitor = cls(data["interview_id"])
+        monitor.events = list(data.get("events", []))
+        if "aggregate" in data:
+            monitor.aggregate = EventAggregate.from_dict(data["aggregate"])
+        else:
+            monitor.aggregate = EventAggregate.from_events(monitor.events)
+        return monitor
@@ -0,0 +1,576 @@
+"""
+Compact Timeline
+Column-oriented, array-backed storage for proctoring timelines
+
+A logged frame kept as a dict of strings costs several hundred bytes; stored
+as one row across typed `array` columns (epoch timestamps, interned codes
+for event types, severities, messages and issue lists) it costs ~30 bytes.
+Events are expanded back to the usual dicts only when read.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class Codebook:
+    """Interns values to small integer codes (process-wide, append-only)"""
+
+    def __init__(self):
+        self._codes: Dict[Any, int] = {}
+        self._values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def value(self, code: int) -> Any:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Shared by all timelines: event types, severities, messages and issue lists
+# come from small fixed vocabularies, so these stay tiny
+EVENT_CODES = Codebook()
+SEVERITY_CODES = Codebook()
+MESSAGE_CODES = Codebook()
+ISSUE_CODES = Codebook()
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[float]:
+    """ISO 8601 string -> epoch seconds (naive values are taken as UTC)"""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(epoch: float) -> str:
+    """Epoch seconds -> UTC ISO string with milliseconds and a Z suffix"""
+    utc = datetime.fromtimestamp(round(epoch, 3), timezone.utc)
+    return utc.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _run_key(event: Dict[str, Any]):
+    return (event.get("event"), event.get("severity"), event.get("num_faces", 0))
+
+
+def event_to_interval(event: Dict[str, Any]) -> Dict[str, Any]:
+    """A single event as a one-frame interval"""
+    return {
+        "start": event.get("timestamp"),
+        "end": event.get("timestamp"),
+        "count": 1,
+        "event": event.get("event"),
+        "severity": event.get("severity"),
+        "num_faces": event.get("num_faces", 0),
+        "mobile_detected": event.get("mobile_detected", False),
+        "issues": event.get("issues", []),
+        "message": event.get("message", ""),
+        "max_score": event.get("cheating_score", 0),
+    }
+
+
+def merge_intervals(intervals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge adjacent intervals with the same (event, severity, num_faces)
+    The merged interval keeps the details of its highest-scoring frame
+    """
+    merged: List[Dict[str, Any]] = []
+    for interval in intervals:
+        if merged and _run_key(merged[-1]) == _run_key(interval):
+            last = merged[-1]
+            last["end"] = interval["end"]
+            last["count"] += interval["count"]
+            if interval["max_score"] > last["max_score"]:
+                for field in ("max_score", "mobile_detected", "issues", "message"):
+                    last[field] = interval[field]
+            continue
+        merged.append(dict(interval))
+    return merged
+
+
+def collapse_runs(events: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse consecutive identical (event, severity, num_faces) events into intervals"""
+    return merge_intervals(event_to_interval(event) for event in events)
+
+
+def _frame_epochs(
+    start: Optional[float], end: Optional[float], count: int
+) -> List[Optional[float]]:
+    """Per-frame epochs of an interval, spread evenly between start and end"""
+    if start is None or end is None:
+        return [start] + [end] * (count - 1)
+    if count == 1:
+        return [start]
+    return [start + (end - start) * i / (count - 1) for i in range(count)]
+
+
+def expand_interval(
+    interval: Dict[str, Any], first_frame: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """
+    Expand an interval back into per-frame events
+    Frame timestamps are spread evenly between start and end, and every
+    frame carries the interval's highest-scoring details
+    """
+    count = interval["count"]
+    start = parse_timestamp(interval["start"])
+    end = parse_timestamp(interval["end"])
+    epochs = _frame_epochs(start, end, count)
+    for i in range(first_frame, count):
+        if start is None or end is None or count == 1:
+            timestamp = interval["start"] if i == 0 else interval["end"]
+        else:
+            timestamp = format_timestamp(epochs[i])
+        yield {
+            "timestamp": timestamp,
+            "event": interval["event"],
+            "severity": interval["severity"],
+            "num_faces": interval["num_faces"],
+            "mobile_detected": interval["mobile_detected"],
+            "issues": list(interval["issues"]),
+            "cheating_score": interval["max_score"],
+            "message": interval["message"],
+        }
+
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """
+    Decode a timeline cursor "<row>" or "<row>:<frame>" (frame within a run)
+    Raises ValueError for malformed cursors
+    """
+    if not cursor:
+        return 0, 0
+    row, _, frame = cursor.partition(":")
+    row_index, frame_index = int(row), int(frame or 0)
+    if row_index < 0 or frame_index < 0:
+        raise ValueError("cursor must not be negative")
+    return row_index, frame_index
+
+
+def format_cursor(row: int, frame: int = 0) -> str:
+    return f"{row}:{frame}" if frame else str(row)
+
+
+def _merge_rows(rows):
+    """
+    Merge adjacent rows of the same run
+    Yields rows extended with the frame count of the last merged row, whose
+    row index is the one kept
+    """
+    pending = None
+    for row_index, interval, start, end in rows:
+        if pending is not None and _run_key(pending[1]) == _run_key(interval):
+            merged = merge_intervals([pending[1], interval])[0]
+            pending = (row_index, merged, pending[2], end, interval["count"])
+            continue
+        if pending is not None:
+            yield pending
+        pending = (row_index, interval, start, end, interval["count"])
+    if pending is not None:
+        yield pending
+
+
+def query_rows(
+    rows: Iterable[Tuple[int, Dict[str, Any], Optional[float], Optional[float]]],
+    first_frame: int = 0,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    event_types: Optional[Set[str]] = None,
+    limit: Optional[int] = None,
+    as_intervals: bool = False,
+    ordered: bool = True,
+) -> Dict[str, Any]:
+    """
+    Filter and paginate timeline rows
+
+    rows yields (row_index, interval, start_epoch, end_epoch) from the
+    cursor position on; first_frame skips frames of the first row (events
+    view only). For the intervals view adjacent rows of one run are merged
+    before filtering. With ordered rows the scan stops at the first row starting
+    after `until`. Returns {"items", "next_cursor", "has_more", "done"}:
+    next_cursor resumes right after the last scanned item, and done means the
+    end of the time range was reached.
+
+    Cursors point inside the last scanned row ("<row>:<frames seen>"), so
+    polling picks up frames added to a run that is still open. The intervals
+    view returns such a run again, with its new count, once it has grown.
+    """
+    items: List[Dict[str, Any]] = []
+    time_filter = since is not None or until is not None
+    next_cursor = None
+    if as_intervals:
+        rows = _merge_rows(rows)
+    else:
+        rows = ((*row, row[1]["count"]) for row in rows)
+
+    for row_index, interval, start, end, row_frames in rows:
+        skip = first_frame if next_cursor is None else 0
+        next_cursor = format_cursor(row_index, row_frames)
+
+        if ordered and until is not None and start is not None and start > until:
+            return {
+                "items": items,
+                "next_cursor": format_cursor(row_index),
+                "has_more": False,
+                "done": True,
+            }
+        if event_types and interval["event"] not in event_types:
+            continue
+
+        if as_intervals:
+            if skip and interval["count"] <= skip:
+                continue  # Already returned and not grown since
+            if time_filter and (
+                start is None
+                or (until is not None and start > until)
+                or (since is not None and (end if end is not None else start) < since)
+            ):
+                continue
+            items.append(interval)
+            if limit and len(items) >= limit:
+                return {
+                    "items": items,
+                    "next_cursor": next_cursor,
+                    "has_more": True,
+                    "done": False,
+                }
+            continue
+
+        epochs = _frame_epochs(start, end, interval["count"])
+        for frame_index, event in enumerate(expand_interval(interval, skip), skip):
+            epoch = epochs[frame_index]
+            if time_filter and (
+                epoch is None
+                or (since is not None and epoch < since)
+                or (until is not None and epoch > until)
+            ):
+                continue
+            items.append(event)
+            if limit and len(items) >= limit:
+                return {
+                    "items": items,
+                    "next_cursor": format_cursor(row_index, frame_index + 1),
+                    "has_more": True,
+                    "done": False,
+                }
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": False,
+        "done": False,
+    }
+
+
+class CompactTimeline:
+    """
+    Append-only timeline of cheating events stored as typed columns
+
+    With compress=True each row is a run of identical (event, severity,
+    num_faces) frames: a new frame matching the last row only extends its
+    end timestamp and count (keeping the highest-scoring frame's details),
+    so a steady state costs one row however long it lasts
+    """
+
+    def __init__(
+        self, events: Optional[List[Dict[str, Any]]] = None, compress: bool = False
+    ):
+        self.compress = compress
+        self.timestamps = array("d")
+        self.events = array("H")
+        self.severities = array("H")
+        self.num_faces = array("H")
+        self.mobile = array("B")
+        self.scores = array("f")
+        self.issues = array("I")
+        self.messages = array("I")
+        # Run columns (compressed mode only)
+        self.end_timestamps = array("d")
+        self.counts = array("I")
+        # Timestamps that do not parse as ISO 8601 are kept verbatim
+        self._raw_timestamps: Dict[int, str] = {}
+        self._event_count = 0
+        # Whether timestamps are non-decreasing (so time ranges can bisect)
+        self.ordered = True
+
+        for event in events or []:
+            self.append(event)
+
+    def append(self, event: Dict[str, Any]):
+        """Append one event dict (as built by the cheating router)"""
+        self._event_count += 1
+        epoch = parse_timestamp(event.get("timestamp"))
+        event_code = EVENT_CODES.code(event.get("event"))
+        severity_code = SEVERITY_CODES.code(event.get("severity"))
+        num_faces = min(int(event.get("num_faces", 0) or 0), 0xFFFF)
+        score = float(event.get("cheating_score", 0) or 0)
+
+        last = len(self.timestamps) - 1
+        if (
+            self.compress
+            and last >= 0
+            and epoch is not None
+            and last not in self._raw_timestamps
+            and self.events[last] == event_code
+            and self.severities[last] == severity_code
+            and self.num_faces[last] == num_faces
+        ):
+            if epoch < self.end_timestamps[last]:
+                self.ordered = False
+            self.end_timestamps[last] = epoch
+            self.counts[last] += 1
+            if score > self.scores[last]:
+                self._set_details(last, event, score)
+            return
+
+        index = last + 1
+        if epoch is None:
+            self._raw_timestamps[index] = event.get("timestamp")
+            epoch = float("nan")
+            self.ordered = False
+        elif last >= 0:
+            # A raw (unparsable) previous row has no epoch to compare against
+            previous_end = self._row_epochs(last)[1]
+            if previous_end is None or epoch < previous_end:
+                self.ordered = False
+
+        self.timestamps.append(epoch)
+        self.events.append(event_code)
+        self.severities.append(severity_code)
+        self.num_faces.append(num_faces)
+        self.mobile.append(0)
+        self.scores.append(0.0)
+        self.issues.append(0)
+        self.messages.append(0)
+        self._set_details(index, event, score)
+        if self.compress:
+            self.end_timestamps.append(epoch)
+            self.counts.append(1)
+
+    def _set_details(self, index: int, event: Dict[str, Any], score: float):
+        self.mobile[index] = 1 if event.get("mobile_detected") else 0
+        self.scores[index] = score
+        self.issues[index] = ISSUE_CODES.code(tuple(event.get("issues") or ()))
+        self.messages[index] = MESSAGE_CODES.code(event.get("message", ""))
+
+    def __len__(self) -> int:
+        """Number of logged frames (not rows)"""
+        return self._event_count
+
+    @property
+    def row_count(self) -> int:
+        return len(self.timestamps)
+
+    def _timestamp(self, index: int, column: array) -> str:
+        if index in self._raw_timestamps:
+            return self._raw_timestamps[index]
+        return format_timestamp(column[index])
+
+    def _row_epochs(self, index: int) -> Tuple[Optional[float], Optional[float]]:
+        """Start and end epoch of a row (None for unparseable timestamps)"""
+        if index in self._raw_timestamps:
+            return None, None
+        start = self.timestamps[index]
+        return start, self.end_timestamps[index] if self.compress else start
+
+    def row_interval(self, index: int) -> Dict[str, Any]:
+        """A row as an interval record (one frame unless compressed)"""
+        score = self.scores[index]
+        start = self._timestamp(index, self.timestamps)
+        if self.compress and index not in self._raw_timestamps:
+            end = format_timestamp(self.end_timestamps[index])
+        else:
+            end = start
+        return {
+            "start": start,
+            "end": end,
+            "count": self.counts[index] if self.compress else 1,
+            "event": EVENT_CODES.value(self.events[index]),
+            "severity": SEVERITY_CODES.value(self.severities[index]),
+            "num_faces": self.num_faces[index],
+            "mobile_detected": bool(self.mobile[index]),
+            "issues": list(ISSUE_CODES.value(self.issues[index])),
+            "message": MESSAGE_CODES.value(self.messages[index]),
+            "max_score": int(score) if score.is_integer() else score,
+        }
+
+    def iter_rows(self, start_row: int = 0):
+        """Yield (row_index, interval, start_epoch, end_epoch) from start_row"""
+        for index in range(start_row, self.row_count):
+            yield (index, self.row_interval(index), *self._row_epochs(index))
+
+    def first_row_since(self, since: float) -> int:
+        """First row that may hold frames at or after `since`"""
+        if not self.ordered:
+            return 0
+        ends = self.end_timestamps if self.compress else self.timestamps
+        return bisect_left(ends, since)
+
+    def intervals(self) -> List[Dict[str, Any]]:
+        """Runs of identical frames as interval records"""
+        return merge_intervals(self.row_interval(i) for i in range(self.row_count))
+
+    def query(
+        self,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        event_types: Optional[Set[str]] = None,
+        limit: Optional[int] = None,
+        as_intervals: bool = False,
+    ) -> Dict[str, Any]:
+        """Filtered, paginated read (see query_rows); bisects on since when ordered"""
+        start_row, first_frame = parse_cursor(cursor)
+        if since is not None:
+            since_row = self.first_row_since(since)
+            if since_row > start_row:
+                start_row, first_frame = since_row, 0
+
+        result = query_rows(
+            self.iter_rows(start_row),
+            first_frame=first_frame,
+            since=since,
+            until=until,
+            event_types=event_types,
+            limit=limit,
+            as_intervals=as_intervals,
+            ordered=self.ordered,
+        )
+        if result["next_cursor"] is None:
+            result["next_cursor"] = format_cursor(start_row, first_frame)
+        return result
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.row_count):
+            yield from expand_interval(self.row_interval(index))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Expand all events to dicts"""
+        return list(self)
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns (codebooks are shared and excluded)"""
+        columns = (
+            self.timestamps,
+            self.events,
+            self.severities,
+            self.num_faces,
+            self.mobile,
+            self.scores,
+            self.issues,
+            self.messages,
+            self.end_timestamps,
+            self.counts,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+def pack_event(event: Dict[str, Any]) -> List[Any]:
+    """
+    Positional record for external stores (no repeated keys, epoch timestamp)
+    Codes are process-local, so packed records keep the strings themselves.
+    Run-length encoded stores extend a record with [end, count]
+
+    Timestamps are integer epoch milliseconds: Lua's cjson re-encodes numbers
+    with 14 significant digits, which would truncate fractional seconds.
+    """
+    epoch = parse_timestamp(event.get("timestamp"))
+    return [
+        round(epoch * 1000) if epoch is not None else event.get("timestamp"),
+        event.get("event"),
+        event.get("severity"),
+        event.get("num_faces", 0),
+        1 if event.get("mobile_detected") else 0,
+        event.get("cheating_score", 0),
+        event.get("issues", []),
+        event.get("message", ""),
+    ]
+
+
+def packed_epoch(timestamp: Any) -> Optional[float]:
+    """Packed timestamp (epoch milliseconds) -> epoch seconds, None if unparseable"""
+    if isinstance(timestamp, (int, float)):
+        return timestamp / 1000
+    return None
+
+
+def _unpack_timestamp(timestamp: Any) -> Any:
+    epoch = packed_epoch(timestamp)
+    return format_timestamp(epoch) if epoch is not None else timestamp
+
+
+def unpack_event(record: List[Any]) -> Dict[str, Any]:
+    """Rebuild an event dict from pack_event() output"""
+    timestamp, event, severity, num_faces, mobile, score, issues, message = record[:8]
+    return {
+        "timestamp": _unpack_timestamp(timestamp),
+        "event": event,
+        "severity": severity,
+        "num_faces": num_faces,
+        "mobile_detected": bool(mobile),
+        # Lua's cjson re-encodes an empty list as {}
+        "issues": issues if isinstance(issues, list) else [],
+        "cheating_score": score,
+        "message": message,
+    }
+
+
+def unpack_interval(record: List[Any]) -> Dict[str, Any]:
+    """Rebuild an interval from a run-length encoded record"""
+    event = unpack_event(record)
+    return {
+        "start": event["timestamp"],
+        "end": _unpack_timestamp(record[8]),
+        "count": record[9],
+        "event": event["event"],
+        "severity": event["severity"],
+        "num_faces": event["num_faces"],
+        "mobile_detected": event["mobile_detected"],
+        "issues": event["issues"],
+        "message": event["message"],
+        "max_score": event["cheating_score"],
+    }
+
+
+def records_to_events(records: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Expand stored records (dicts, packed events or runs) into events"""
+    events: List[Dict[str, Any]] = []
+    for record in records:
+        if isinstance(record, dict):
+            events.append(record)
+        elif len(record) > 8:
+            events.extend(expand_interval(unpack_interval(record)))
+        else:
+            events.append(unpack_event(record))
+    return events
+
+
+def records_to_intervals(records: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert stored records into intervals, collapsing per-frame records"""
+    intervals: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []
+    for record in records:
+        if isinstance(record, dict):
+            pending.append(record)
+        elif len(record) > 8:
+            intervals.extend(collapse_runs(pending))
+            pending = []
+            intervals.append(unpack_interval(record))
+        else:
+            pending.append(unpack_event(record))
+    intervals.extend(collapse_runs(pending))
+    return intervals
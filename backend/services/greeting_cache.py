@@ -0,0 +1,147 @@
+"""
+Greeting Cache
+Pre-generated interview greetings per (role, persona) with a {user_name} slot
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import random
+import time
+from services.llm_agent import LLMAgent, USER_NAME_SLOT
+from utils.config import settings
+
+
+class GreetingCache:
+    """
+    Pool of greeting templates per (role, persona)
+    - Filled lazily on first use, or up front via prewarm()
+    - Entries older than the TTL are still served while a background
+      refresh replaces them, so session start never waits on a refresh
+    - When no template is available, falls back to live generation
+    """
+
+    def __init__(
+        self,
+        ttl: int = 86400,
+        pool_size: int = 3,
+        live_fallback: bool = True,
+    ):
+        self.ttl = ttl
+        self.pool_size = pool_size
+        self.live_fallback = live_fallback
+
+        # (role, persona) -> (templates, created_at)
+        self._entries: Dict[Tuple[str, str], Tuple[List[str], float]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._refreshing: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.live_generations = 0
+
+    async def get_greeting(self, role: str, persona: str, user_name: str) -> str:
+        """Get a greeting for the candidate, generating templates if needed"""
+        key = (role, persona)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            templates, created_at = entry
+            if self.ttl and time.time() - created_at > self.ttl:
+                self.stale_hits += 1
+                self._schedule_refresh(key)
+            else:
+                self.hits += 1
+            return self._render(templates, user_name)
+
+        self.misses += 1
+        templates = await self._fill(key)
+        if templates:
+            return self._render(templates, user_name)
+
+        if not self.live_fallback:
+            raise RuntimeError(f"No cached greeting available for {role}/{persona}")
+
+        self.live_generations += 1
+        return await LLMAgent(persona).generate_greeting(role, user_name)
+
+    async def prewarm(self, roles: List[str], personas: List[str]):
+        """Generate templates for every (role, persona) combination"""
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(self._fill((role, persona)) for role in roles for persona in personas)
+        )
+        print(
+            f"✓ Greeting cache warmed: {len(self._entries)} entries "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+    def clear(self):
+        """Drop all cached templates"""
+        self._entries.clear()
+
+    async def _fill(self, key: Tuple[str, str]) -> Optional[List[str]]:
+        """Generate templates for a key (concurrent callers share one generation)"""
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and not (
+                self.ttl and time.time() - entry[1] > self.ttl
+            ):
+                return entry[0]
+
+            templates = await self._generate_templates(*key)
+            if templates:
+                self._entries[key] = (templates, time.time())
+                return templates
+            return entry[0] if entry is not None else None
+
+    async def _generate_templates(self, role: str, persona: str) -> List[str]:
+        """Ask the LLM for a pool of templates, keeping only usable ones"""
+        try:
+            agent = LLMAgent(persona)
+            results = await asyncio.gather(
+                *(agent.generate_greeting_template(role) for _ in range(self.pool_size)),
+                return_exceptions=True,
+            )
+        except Exception as e:
+            print(f"⚠ Greeting template generation failed for {role}/{persona}: {e}")
+            return []
+
+        return [
+            template
+            for template in results
+            if isinstance(template, str) and USER_NAME_SLOT in template
+        ]
+
+    def _schedule_refresh(self, key: Tuple[str, str]):
+        """Refresh a stale entry in the background"""
+        task = self._refreshing.get(key)
+        if task is None or task.done():
+            self._refreshing[key] = asyncio.create_task(self._fill(key))
+
+    @staticmethod
+    def _render(templates: List[str], user_name: str) -> str:
+        # str.replace rather than format(): generated text may contain braces
+        return random.choice(templates).replace(USER_NAME_SLOT, str(user_name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            "entries": len(self._entries),
+            "templates": sum(len(t) for t, _ in self._entries.values()),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "live_generations": self.live_generations,
+        }
+
+
+# Global cache instance
+greeting_cache = GreetingCache(
+    ttl=settings.GREETING_CACHE_TTL,
+    pool_size=settings.GREETING_POOL_SIZE,
+    live_fallback=settings.GREETING_LIVE_FALLBACK,
+)
@@ -4,53 +4,52 @@ Handles all LLM interactions using Groq (primary) or OpenAI (fallback)
 Manages persona-based responses and interview flow
 """
 
-from typing import List, Dict, Any, Optional
-from groq import Groq
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from openai import OpenAI
+from services.llm_client import llm_clients
+from services.prompt_templates import (
+    JSON_ONLY_INSTRUCTION,
+    evaluation_system_prompt,
+    feedback_system_prompt,
+    get_persona_instructions,
+)
 from utils.config import settings
-from utils.role_data import get_role_context, get_scoring_rubric
+from utils.json_stream import JsonStringFieldStreamer
+import asyncio
 import json
 
+# Caps concurrent LLM requests across all interviews in this process
+llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+
+# Placeholder for the candidate's name in cached greeting templates
+USER_NAME_SLOT = "{user_name}"
+
 
 class LLMAgent:
     """
     Manages LLM interactions for interview simulation
     Supports multiple personas and role-specific behavior
+
+    Lightweight per-session persona wrapper: the underlying client and its
+    connection pool are shared process-wide via llm_clients
     """
 
     def __init__(self, persona: str = "Efficient"):
         self.persona = persona
 
         # Use Groq with llama-3.3-70b-versatile
-        if not settings.GROQ_API_KEY or not settings.GROQ_API_KEY.strip():
-            raise ValueError("GROQ_API_KEY is required")
-
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        self.client = llm_clients.get_client("groq")
         self.model = "llama-3.3-70b-versatile"
         self.provider = "groq"
-        print(f"✓ Using Groq LLM with {self.model}")
 
         self.persona_instructions = self._get_persona_instructions()
 
     def _get_persona_instructions(self) -> str:
         """Get system instructions based on persona"""
-        persona_guides = {
-            "Confused": "The user may be uncertain or need guidance. Be patient, provide clear explanations, and gently redirect if needed.",
-            "Efficient": "The user prefers concise, direct communication. Keep responses brief and to the point. Don't over-explain.",
-            "Chatty": "The user tends to go off-topic. Be friendly but firm in redirecting to interview questions. Keep the conversation professional.",
-            "Edge-case": "The user may provide unusual or unexpected responses. Handle these gracefully, set boundaries, and guide back to relevant answers.",
-            "Adaptive": """ADAPTIVE MODE: Automatically detect and adapt to the user's communication style:
-            - If user is confused/uncertain: Be patient, provide clear explanations, and gently guide them
-            - If user is efficient/direct: Keep responses brief and concise, don't over-explain
-            - If user is chatty/goes off-topic: Be friendly but firm in redirecting to interview questions
-            - If user provides edge-case/unusual responses: Handle gracefully, set boundaries, and guide back
-            
-            Continuously analyze the user's responses and adjust your communication style accordingly. 
-            Be flexible and responsive to their needs while maintaining professional interview standards.""",
-        }
-        return persona_guides.get(self.persona, persona_guides["Adaptive"])
+        return get_persona_instructions(self.persona)
 
-    def generate_greeting(self, role: str, user_name: str) -> str:
+    async def generate_greeting(self, role: str, user_name: str) -> str:
         """Generate interview greeting based on role"""
         adaptive_note = (
             "I'll adapt to your communication style throughout our conversation."
@@ -73,10 +72,33 @@ Keep it concise (3-4 sentences)."""
 
         user_prompt = f"Generate a greeting for {user_name} for a {role} interview."
 
-        response = self._call_llm(system_prompt, user_prompt)
+        response = await self._call_llm(system_prompt, user_prompt)
         return response
 
-    def evaluate_and_decide(
+    async def generate_greeting_template(self, role: str) -> str:
+        """
+        Generate a reusable greeting with USER_NAME_SLOT in place of the name
+        Used by the greeting cache; the caller checks the slot is present
+        """
+        system_prompt = f"""You are a professional interview agent conducting a mock {role} interview.
+
+{self.persona_instructions}
+
+Generate a warm, professional greeting that:
+1. Welcomes the candidate
+2. Explains the interview structure (5-7 questions)
+3. Mentions anti-cheating monitoring
+4. Sets expectations for honest, detailed answers
+{f'5. Mention that you will adapt to their communication style' if self.persona == 'Adaptive' else ''}
+
+Keep it concise (3-4 sentences).
+Address the candidate by writing the exact placeholder {USER_NAME_SLOT} where their name goes."""
+
+        user_prompt = f"Generate a greeting for {USER_NAME_SLOT} for a {role} interview."
+
+        return await self._call_llm(system_prompt, user_prompt)
+
+    async def evaluate_and_decide(
         self,
         user_answer: str,
         current_question: str,
@@ -93,40 +115,70 @@ Keep it concise (3-4 sentences)."""
             "complete": bool
         }
         """
-        role_context = get_role_context(role)
-        rubric = get_scoring_rubric(role)
-
-        system_prompt = f"""You are a professional interview agent conducting a {role} interview.
-
-{self.persona_instructions}
-
-Role Context: {role_context}
+        system_prompt, context = self._build_evaluation_prompts(
+            user_answer, current_question, conversation_history, cheating_summary, role
+        )
+        response = await self._call_llm(system_prompt, context, json_mode=True)
+        return self._parse_decision(response)
 
-Scoring Rubric: {rubric}
+    async def evaluate_and_decide_stream(
+        self,
+        user_answer: str,
+        current_question: str,
+        conversation_history: List[Dict[str, str]],
+        cheating_summary: Dict[str, Any],
+        role: str,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of evaluate_and_decide
+        Yields ("token", text) as the "response" field is generated, then
+        ("decision", dict) once the full JSON completion has been parsed
+        """
+        system_prompt, context = self._build_evaluation_prompts(
+            user_answer, current_question, conversation_history, cheating_summary, role
+        )
 
-Current Question: {current_question}
+        streamer = JsonStringFieldStreamer("response")
+        chunks, streamed = [], []
+        async for delta in self._stream_llm(system_prompt, context, json_mode=True):
+            chunks.append(delta)
+            text = streamer.feed(delta)
+            if text:
+                streamed.append(text)
+                yield "token", text
+
+        decision = self._parse_decision("".join(chunks))
+        if streamed:
+            # Keep the stored response identical to what the candidate saw
+            decision["response"] = "".join(streamed)
+        else:
+            # The model never produced a "response" field; send the fallback text
+            yield "token", decision["response"]
+        yield "decision", decision
+
+    def _build_evaluation_prompts(
+        self,
+        user_answer: str,
+        current_question: str,
+        conversation_history: List[Dict[str, str]],
+        cheating_summary: Dict[str, Any],
+        role: str,
+    ) -> Tuple[str, str]:
+        """Build the system and user prompts for answer evaluation"""
+        system_prompt = evaluation_system_prompt(role, self.persona)
 
-Evaluate the candidate's answer and decide:
-1. Provide brief acknowledgment/feedback on their answer (1-2 sentences)
-2. Decide if a follow-up question is needed (only if answer was vague or needs clarification)
-3. If no follow-up, just acknowledge and indicate readiness for next question
+        context = f"""Current Question: {current_question}
 
-Respond with JSON:
-{{
-    "response": "your acknowledgment",
-    "followup": true/false,
-    "followup_question": "optional follow-up question",
-    "complete": false
-}}"""
+Conversation so far: {len(conversation_history)} messages
 
-        context = f"""Conversation so far: {len(conversation_history)} messages
-        
 User's latest answer: {user_answer}
 
 Cheating events detected: {cheating_summary.get('total_events', 0)}"""
 
-        response = self._call_llm(system_prompt, context, json_mode=True)
+        return system_prompt, context
 
+    def _parse_decision(self, response: str) -> Dict[str, Any]:
+        """Parse the evaluation JSON, falling back to a neutral acknowledgment"""
         try:
             decision = json.loads(response)
         except json.JSONDecodeError:
@@ -139,59 +191,25 @@ Cheating events detected: {cheating_summary.get('total_events', 0)}"""
 
         return decision
 
-    def generate_final_feedback(
+    async def generate_final_feedback(
         self,
         conversation_history: List[Dict[str, str]],
         role: str,
         cheating_summary: Dict[str, Any],
+        transcript: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Generate comprehensive final feedback
         Returns structured feedback with scores and recommendations
         """
-        rubric = get_scoring_rubric(role)
-
-        system_prompt = f"""You are a professional interview evaluator for {role} positions.
-
-Analyze the complete interview conversation and provide detailed, HONEST feedback.
-
-Scoring Rubric: {rubric}
+        system_prompt = feedback_system_prompt(role, self.persona)
 
-{self.persona_instructions}
-
-SCORING GUIDELINES (Be honest and fair - don't inflate scores):
-- 9-10: Exceptional - Expert-level answers, clear communication, outstanding depth
-- 7-8: Strong - Good technical knowledge, well-articulated, minor gaps
-- 5-6: Adequate - Meets basic requirements, some unclear areas, room for improvement
-- 3-4: Below Average - Significant gaps, struggled with questions, needs development
-- 1-2: Poor - Major deficiencies, minimal understanding, very brief answers
-- 0: No participation or ended immediately
-
-IMPORTANT: Most candidates should score in the 4-7 range. Reserve 8+ for truly impressive answers.
-Give credit for effort and partial knowledge, but be honest about gaps.
-
-Generate feedback in JSON format:
-{{
-    "technical_score": 1-10,
-    "communication_score": 1-10,
-    "confidence_score": 1-10,
-    "overall_summary": "2-3 sentence summary",
-    "strengths": ["strength 1", "strength 2", "strength 3"],
-    "weaknesses": ["weakness 1", "weakness 2"],
-    "recommendations": ["recommendation 1", "recommendation 2", "recommendation 3"]
-}}
-
-Base scores on:
-- Technical accuracy and depth (not just answering, but quality of answers)
-- Communication clarity and structure
-- Confidence and professionalism
-- Ability to articulate complex thoughts
-- Handling of follow-up questions"""
-
-        # Prepare conversation context
-        conversation_text = "\n".join(
-            [f"{msg['role']}: {msg['content']}" for msg in conversation_history]
-        )
+        # Prepare conversation context (reuse the pre-rendered transcript if given)
+        conversation_text = transcript
+        if conversation_text is None:
+            conversation_text = "\n".join(
+                [f"{msg['role']}: {msg['content']}" for msg in conversation_history]
+            )
 
         # Check if candidate actually answered questions
         user_messages = [msg for msg in conversation_history if msg["role"] == "user"]
@@ -203,26 +221,9 @@ Base scores on:
 Cheating Summary:
 {json.dumps(cheating_summary, indent=2)}
 
-User provided {len(user_messages)} answers with {total_user_words} total words.
+User provided {len(user_messages)} answers with {total_user_words} total words."""
 
-EVALUATION INSTRUCTIONS:
-1. If NO participation (0 messages or <10 words): Give 0/10 for all categories
-2. If minimal effort (very short answers, no detail): Score 2-4 range
-3. If adequate but basic (answered questions but surface-level): Score 5-6 range
-4. If good (clear answers with examples, demonstrates knowledge): Score 7-8 range
-5. If exceptional (expert-level, insightful, excellent communication): Score 9-10 range
-
-Analyze each answer for:
-- Depth: Did they provide details/examples or just brief statements?
-- Relevance: Did they answer the actual question asked?
-- Technical accuracy: Were their statements correct?
-- Communication: Were answers well-structured and clear?
-
-Be fair but honest. Don't inflate scores. Most interviews should fall in 4-7 range.
-
-Provide comprehensive feedback with specific examples from their answers."""
-
-        response = self._call_llm(system_prompt, user_prompt, json_mode=True)
+        response = await self._call_llm(system_prompt, user_prompt, json_mode=True)
 
         try:
             # Try to parse JSON response
@@ -285,7 +286,7 @@ Provide comprehensive feedback with specific examples from their answers."""
             retry_prompt = user_prompt + "\n\nREMINDER: Return ONLY a JSON object. No extra text, no markdown formatting."
             
             try:
-                retry_response = self._call_llm(
+                retry_response = await self._call_llm(
                     system_prompt, retry_prompt, json_mode=True
                 )
                 
@@ -386,25 +387,27 @@ Provide comprehensive feedback with specific examples from their answers."""
 
         return feedback
 
-    def _call_llm(
+    async def _call_llm(
         self, system_prompt: str, user_prompt: str, json_mode: bool = False
     ) -> str:
-        """Call Groq LLM"""
+        """Call Groq LLM (non-blocking, limited by llm_semaphore)"""
         try:
             # Add JSON instruction if json_mode (Groq doesn't have response_format)
             system_content = system_prompt
             if json_mode:
-                system_content += "\n\nCRITICAL: You MUST respond with ONLY valid JSON. No markdown, no code blocks, no explanations. Just pure JSON starting with { and ending with }."
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_content},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.5,  # Lower temperature for more consistent JSON
-                max_tokens=2048,
-            )
+                system_content += JSON_ONLY_INSTRUCTION
+
+            async with llm_semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_content},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=0.5,  # Lower temperature for more consistent JSON
+                    max_tokens=2048,
+                )
+            llm_clients.record_usage(response.usage)
 
             content = response.choices[0].message.content
             if not content:
@@ -419,3 +422,43 @@ Provide comprehensive feedback with specific examples from their answers."""
             if json_mode:
                 return '{"response": "I apologize, but I\'m experiencing technical difficulties.", "followup": false, "complete": false}'
             return "I apologize, but I'm experiencing technical difficulties. Please try again."
+
+    async def _stream_llm(
+        self, system_prompt: str, user_prompt: str, json_mode: bool = False
+    ) -> AsyncIterator[str]:
+        """Stream a Groq completion as content deltas (limited by llm_semaphore)"""
+        system_content = system_prompt
+        if json_mode:
+            system_content += JSON_ONLY_INSTRUCTION
+
+        received = False
+        try:
+            async with llm_semaphore:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_content},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    temperature=0.5,
+                    max_tokens=2048,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        received = True
+                        yield delta
+
+        except Exception as e:
+            print(f"❌ LLM Streaming Error: {str(e)}")
+            print(f"Error type: {type(e).__name__}")
+
+            # Only substitute the fallback if nothing was streamed yet
+            if not received:
+                if json_mode:
+                    yield '{"response": "I apologize, but I\'m experiencing technical difficulties.", "followup": false, "complete": false}'
+                else:
+                    yield "I apologize, but I'm experiencing technical difficulties. Please try again."
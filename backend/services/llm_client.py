@@ -0,0 +1,85 @@
+"""
+LLM Client Registry
+Process-wide, connection-pooled LLM clients shared by all interview sessions
+"""
+
+from typing import Any, Dict
+import httpx
+from groq import AsyncGroq
+from utils.config import settings
+
+
+class LLMClientRegistry:
+    """
+    Creates one pooled client per provider on first use and reuses it,
+    so sessions share keep-alive connections to the LLM API
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+
+        # Token usage across all completions
+        self.completions = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def get_client(self, provider: str = "groq") -> AsyncGroq:
+        """Get the shared client for a provider"""
+        if provider in self._clients:
+            return self._clients[provider]
+
+        if provider != "groq":
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+
+        if not settings.GROQ_API_KEY or not settings.GROQ_API_KEY.strip():
+            raise ValueError("GROQ_API_KEY is required")
+
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        client = AsyncGroq(api_key=settings.GROQ_API_KEY, http_client=http_client)
+
+        self._http_clients[provider] = http_client
+        self._clients[provider] = client
+        print(f"✓ Groq LLM client pool ready ({settings.LLM_HTTP_MAX_CONNECTIONS} connections)")
+        return client
+
+    def record_usage(self, usage: Any):
+        """Accumulate token usage from a completion response"""
+        if usage is None:
+            return
+        self.completions += 1
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        # Reported by providers that cache prompt prefixes
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.cached_prompt_tokens += getattr(details, "cached_tokens", 0) or 0
+
+    async def close(self):
+        """Close all pooled connections (called from the app shutdown hook)"""
+        for http_client in self._http_clients.values():
+            await http_client.aclose()
+        self._http_clients.clear()
+        self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics"""
+        return {
+            "providers": list(self._clients.keys()),
+            "max_connections": settings.LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_HTTP_MAX_KEEPALIVE,
+            "completions": self.completions,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+# Global registry instance
+llm_clients = LLMClientRegistry()
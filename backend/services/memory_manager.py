@@ -3,19 +3,90 @@ Memory Manager Service
 Manages conversation history and context for interview sessions
 """
 
-from typing import List, Dict, Any
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from typing import List, Dict, Any, Optional
+from utils.config import settings
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# Each summarized message is cut to about this many tokens
+SUMMARY_LINE_TOKENS = 40
+
+
+class HistoryView(Sequence):
+    """
+    Read-only, zero-copy view over a deque owned by MemoryManager
+    Reflects later appends; copy with list() to take a snapshot
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: deque):
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __reversed__(self):
+        return reversed(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._items)[index]
+        return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"HistoryView({list(self._items)!r})"
 
 
 class MemoryManager:
     """
     Manages conversation memory for an interview session
     Stores and retrieves conversation history
+
+    Messages live in a bounded deque; per-role counters, the user answer and
+    question lists, and each message's rendered transcript line are
+    maintained on append in O(1). The transcript string itself is joined
+    from those lines on the first read after a change (O(history)) and
+    cached until the next append
+
+    Messages pushed out of the window are folded into a rolling extractive
+    summary instead of being dropped, and build_context() renders the
+    conversation within a token budget
     """
 
-    def __init__(self, interview_id: str):
+    def __init__(
+        self,
+        interview_id: str,
+        max_history: int = 50,
+        summary_budget: int = settings.CONTEXT_SUMMARY_TOKENS,
+    ):
         self.interview_id = interview_id
-        self.messages: List[Dict[str, str]] = []
-        self.max_history = 50  # Keep last 50 messages
+        self.max_history = max_history
+        self.summary_budget = summary_budget
+        self._reset()
+
+    def _reset(self):
+        self._messages: deque = deque(maxlen=self.max_history)
+        self._token_counts: deque = deque(maxlen=self.max_history)
+        self._lines: deque = deque(maxlen=self.max_history)  # Rendered messages
+        self._total_tokens = 0
+        self._summary: deque = deque()  # (line, tokens) for evicted messages
+        self._summary_tokens = 0
+        self._summarized_messages = 0
+        self._user_answers: deque = deque()
+        self._questions: deque = deque()
+        self._assistant_count = 0
+        self._transcript: Optional[str] = ""
+
+    @property
+    def messages(self) -> HistoryView:
+        """Read-only view of the retained messages"""
+        return HistoryView(self._messages)
 
     def add_message(self, role: str, content: str):
         """
@@ -25,55 +96,185 @@ class MemoryManager:
             role: "user" or "assistant"
             content: Message content
         """
-        self.messages.append({"role": role, "content": content})
+        # The deque drops the oldest message when full; retire its aggregates first
+        if len(self._messages) == self.max_history:
+            self._retire(self._messages[0])
+            self._summarize(self._messages[0])
+            self._total_tokens -= self._token_counts[0]
+
+        message = {"role": role, "content": content}
+        line = self._render(message)
+        tokens = count_tokens(line)
+        self._messages.append(message)
+        self._lines.append(line)
+        self._token_counts.append(tokens)
+        self._total_tokens += tokens
+        self._transcript = None
+
+        if role == "user":
+            self._user_answers.append(content)
+        elif role == "assistant":
+            self._assistant_count += 1
+            # Simple heuristic: assistant messages containing "?"
+            if "?" in content:
+                self._questions.append(content)
+
+    def _retire(self, message: Dict[str, str]):
+        """Remove an evicted message from the running aggregates"""
+        if message["role"] == "user":
+            self._user_answers.popleft()
+        elif message["role"] == "assistant":
+            self._assistant_count -= 1
+            if "?" in message["content"]:
+                self._questions.popleft()
 
-        # Trim history if too long (keep system context)
-        if len(self.messages) > self.max_history:
-            self.messages = self.messages[-self.max_history :]
+    def _summarize(self, message: Dict[str, str]):
+        """Fold an evicted message into the rolling summary"""
+        self._summarized_messages += 1
+        line = self._extract(message)
+        if line is None:
+            return
 
-    def get_conversation_history(self) -> List[Dict[str, str]]:
-        """Get full conversation history"""
-        return self.messages.copy()
+        tokens = count_tokens(line)
+        self._summary.append((line, tokens))
+        self._summary_tokens += tokens
+        # Over budget, the oldest summary lines go first
+        while self._summary_tokens > self.summary_budget and self._summary:
+            self._summary_tokens -= self._summary.popleft()[1]
+
+    @staticmethod
+    def _extract(message: Dict[str, str]) -> Optional[str]:
+        """One-line extractive summary of a message (None if not worth keeping)"""
+        content = " ".join(message["content"].split())
+        if message["role"] == "user":
+            return "- Candidate: " + truncate_to_tokens(content, SUMMARY_LINE_TOKENS)
+        if "?" in content:
+            # Keep the question itself, not the acknowledgment before it
+            question = content[: content.rindex("?") + 1]
+            start = max(question.rfind(". ", 0, -1), question.rfind("\n", 0, -1))
+            question = question[start + 1 :].strip()
+            return "- Interviewer asked: " + truncate_to_tokens(
+                question, SUMMARY_LINE_TOKENS
+            )
+        return None
+
+    @staticmethod
+    def _render(message: Dict[str, str]) -> str:
+        return f"{message['role']}: {message['content']}"
+
+    def get_conversation_history(self) -> HistoryView:
+        """Get full conversation history (read-only view, no copy)"""
+        return self.messages
 
     def get_recent_messages(self, count: int = 10) -> List[Dict[str, str]]:
         """Get recent messages"""
+        recent = list(islice(reversed(self._messages), count))
+        recent.reverse()
+        return recent
+
+    def get_transcript(self) -> str:
+        """
+        Get the conversation rendered as "role: content" lines
+        Joined on the first call after an append, then cached
+        """
+        if self._transcript is None:
+            self._transcript = "\n".join(self._lines)
+        return self._transcript
+
+    def build_context(self, token_budget: int) -> str:
+        """
+        Render the conversation within roughly token_budget tokens
+        The most recent messages are kept verbatim; older ones (including
+        those already evicted) appear as a summary ahead of them
+        """
+        if token_budget <= 0 or (
+            not self._summary and self._total_tokens <= token_budget
+        ):
+            return self.get_transcript()
+
+        # Reserve part of the budget for the summary, then fill with recent turns
+        reserve = min(self.summary_budget, token_budget // 4)
+        available = token_budget - reserve
+        kept = 0
+        for tokens in reversed(self._token_counts):
+            if tokens > available:
+                break
+            available -= tokens
+            kept += 1
+
+        overflow = len(self._messages) - kept
+        lines = [line for line, _ in self._summary]
+        for message in islice(self._messages, overflow):
+            line = self._extract(message)
+            if line is not None:
+                lines.append(line)
+
+        # Unused verbatim budget can go to the summary; trim oldest lines first
+        summary_budget = reserve + available
+        line_tokens = [count_tokens(line) for line in lines]
+        total = sum(line_tokens)
+        start = 0
+        while total > summary_budget and start < len(lines):
+            total -= line_tokens[start]
+            start += 1
+
+        recent = "\n".join(islice(self._lines, overflow, None))
+        summarized = self._summarized_messages + overflow
+        if not summarized:
+            return recent
+        summary = "\n".join(lines[start:])
         return (
-            self.messages[-count:]
-            if len(self.messages) >= count
-            else self.messages.copy()
+            f"Summary of the {summarized} earlier messages:\n{summary}\n\n"
+            f"Most recent messages:\n{recent}"
         )
 
-    def get_user_answers(self) -> List[str]:
+    def get_user_answers(self) -> HistoryView:
         """Extract all user answers from conversation"""
-        return [msg["content"] for msg in self.messages if msg["role"] == "user"]
+        return HistoryView(self._user_answers)
 
-    def get_questions_asked(self) -> List[str]:
+    def get_questions_asked(self) -> HistoryView:
         """Extract all questions asked by agent"""
-        # Simple heuristic: messages ending with "?"
-        return [
-            msg["content"]
-            for msg in self.messages
-            if msg["role"] == "assistant" and "?" in msg["content"]
-        ]
+        return HistoryView(self._questions)
 
     def get_message_count(self) -> int:
         """Get total message count"""
-        return len(self.messages)
+        return len(self._messages)
 
     def clear_history(self):
         """Clear all conversation history"""
-        self.messages = []
+        self._reset()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize memory state (for external session stores)"""
+        return {
+            "interview_id": self.interview_id,
+            "messages": list(self._messages),
+            "max_history": self.max_history,
+            "summary": [line for line, _ in self._summary],
+            "summarized_messages": self._summarized_messages,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MemoryManager":
+        """Rebuild a MemoryManager from to_dict() output"""
+        manager = cls(data["interview_id"], data.get("max_history", 50))
+        for message in data.get("messages", []):
+            manager.add_message(message["role"], message["content"])
+        for line in data.get("summary", []):
+            tokens = count_tokens(line)
+            manager._summary.append((line, tokens))
+            manager._summary_tokens += tokens
+        manager._summarized_messages = data.get("summarized_messages", 0)
+        return manager
 
     def get_context_summary(self) -> Dict[str, Any]:
         """Get summary of conversation context"""
-        user_messages = sum(1 for msg in self.messages if msg["role"] == "user")
-        assistant_messages = sum(
-            1 for msg in self.messages if msg["role"] == "assistant"
-        )
-
         return {
-            "total_messages": len(self.messages),
-            "user_messages": user_messages,
-            "assistant_messages": assistant_messages,
-            "questions_asked": len(self.get_questions_asked()),
+            "total_messages": len(self._messages),
+            "user_messages": len(self._user_answers),
+            "assistant_messages": self._assistant_count,
+            "questions_asked": len(self._questions),
+            "context_tokens": self._total_tokens,
+            "summarized_messages": self._summarized_messages,
+            "summary_tokens": self._summary_tokens,
         }
@@ -0,0 +1,266 @@
+"""
+ML Service Client
+Application-lifetime HTTP connection pool for forwarding frames to the ML service
+"""
+
+from typing import Any, Dict, Optional
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+import httpx
+from utils.config import settings
+
+try:
+    import websockets
+except ImportError:  # Streaming falls back to HTTP without it
+    websockets = None
+
+# Weight of the newest sample in recent_latency
+LATENCY_SMOOTHING = 0.2
+
+
+class MLServiceError(Exception):
+    """Error reported by the ML service for a single frame"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class MLFrameStream:
+    """
+    Long-lived WebSocket to the ML service's /ml/stream endpoint
+    Frames are sent one at a time and answered in order, so a single
+    connection carries an interview's whole frame stream
+    """
+
+    def __init__(self, owner: "MLServiceClient", url: str):
+        self._owner = owner
+        self.url = url
+        self._ws = None
+
+    async def analyze(self, frame: bytes) -> Dict[str, Any]:
+        """Send one frame and wait for its detection result"""
+        self._owner.in_flight += 1
+        try:
+            reply = await self._exchange(frame)
+        finally:
+            self._owner.in_flight -= 1
+
+        result = json.loads(reply)
+        self._owner.record_pool_load(
+            result.pop("inference_load", None), result.get("status_code", 200)
+        )
+        if result.get("success") is False:
+            raise MLServiceError(
+                result.get("status_code", 500), result.get("error", "Analysis failed")
+            )
+        return result
+
+    async def _exchange(self, frame: bytes) -> str:
+        for attempt in range(2):
+            try:
+                if self._ws is None:
+                    self._ws = await websockets.connect(
+                        self.url,
+                        max_size=None,
+                        open_timeout=settings.ML_HTTP_CONNECT_TIMEOUT,
+                    )
+                    self._owner.streams_opened += 1
+
+                start = time.perf_counter()
+                await self._ws.send(frame)
+                reply = await asyncio.wait_for(
+                    self._ws.recv(), settings.ML_HTTP_TIMEOUT
+                )
+                self._owner.stream_frames += 1
+                self._owner.record_latency(time.perf_counter() - start)
+                return reply
+            except Exception:
+                # A timed-out or broken stream can no longer be matched to replies
+                await self.close()
+                if attempt == 1:
+                    self._owner.errors += 1
+                    raise
+
+    async def close(self):
+        """Close the underlying connection"""
+        if self._ws is not None:
+            try:
+                await self._ws.close()
+            except Exception:
+                pass
+            self._ws = None
+
+
+class MLServiceClient:
+    """
+    Shared async HTTP client for the ML service
+    Created once at application startup so frame forwarding reuses
+    keep-alive connections instead of opening a new one per frame
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http2_enabled = False
+
+        # Statistics
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_latency = 0.0
+        self.streams_opened = 0
+        self.stream_frames = 0
+        # Exponentially weighted latency of recent calls (seconds)
+        self.recent_latency = 0.0
+        # ML inference pool occupancy (pending / capacity) from the latest reply;
+        # unlike in_flight it reflects every backend worker's traffic
+        self.pool_load = 0.0
+
+    async def start(self):
+        """Create the pooled client (called from the app startup hook)"""
+        if self._client is not None:
+            return
+
+        http2 = settings.ML_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("⚠ ML_HTTP2 requested but 'h2' is not installed, using HTTP/1.1")
+                http2 = False
+
+        self._client = httpx.AsyncClient(
+            base_url=settings.ML_SERVICE_URL,
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.ML_HTTP_TIMEOUT, connect=settings.ML_HTTP_CONNECT_TIMEOUT
+            ),
+            # The client only talks to the ML service, so these are per-host caps
+            limits=httpx.Limits(
+                max_connections=settings.ML_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ML_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.ML_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self.http2_enabled = http2
+        print(f"✓ ML service client ready ({settings.ML_SERVICE_URL})")
+
+    async def close(self):
+        """Close pooled connections (called from the app shutdown hook)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("ML service client not started")
+        return self._client
+
+    async def check_face(
+        self, image_bytes: bytes, interview_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send one frame to /ml/check_face and return the detection result"""
+        files = {"image": ("frame.jpg", image_bytes, "image/jpeg")}
+        data = {"interview_id": interview_id} if interview_id else None
+        return await self._post("/ml/check_face", files=files, data=data)
+
+    async def check_face_raw(
+        self,
+        image_bytes: bytes,
+        content_type: str = "image/jpeg",
+        interview_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send one frame as the raw body of /ml/check_face_raw (no multipart copy)
+        The interview ID lets the ML service reuse results for unchanged frames
+        """
+        headers = {"Content-Type": content_type}
+        if interview_id:
+            headers["X-Interview-Id"] = interview_id
+        return await self._post("/ml/check_face_raw", content=image_bytes, headers=headers)
+
+    def open_stream(self, interview_id: Optional[str] = None) -> Optional[MLFrameStream]:
+        """
+        Create a frame stream to /ml/stream (connected lazily on first frame)
+        Returns None when the websockets package is unavailable
+        """
+        if websockets is None:
+            return None
+        url = settings.ML_SERVICE_URL.replace("http", "ws", 1) + "/ml/stream"
+        if interview_id:
+            url += "?" + urlencode({"interview_id": interview_id})
+        return MLFrameStream(self, url)
+
+    async def _post(self, path: str, **kwargs) -> Dict[str, Any]:
+        self.requests += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await self.client.post(path, **kwargs)
+            self.record_pool_load(
+                response.headers.get("X-Inference-Load"), response.status_code
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.record_latency(time.perf_counter() - start)
+
+    def record_latency(self, elapsed: float):
+        """Add one call's latency to the totals and the recent average"""
+        self.total_latency += elapsed
+        self.recent_latency += LATENCY_SMOOTHING * (elapsed - self.recent_latency)
+
+    def record_pool_load(self, load: Any, status_code: int = 200):
+        """Track the ML pool load reported with a reply (429 means saturated)"""
+        if status_code == 429:
+            self.pool_load = 1.0
+            return
+        try:
+            self.pool_load = float(load)
+        except (TypeError, ValueError):  # Older ML service without the header
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        stats = {
+            "started": self._client is not None,
+            "http2": self.http2_enabled,
+            "max_connections": settings.ML_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.ML_HTTP_MAX_KEEPALIVE,
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "recent_latency_ms": round(self.recent_latency * 1000, 2),
+            "ml_pool_load": self.pool_load,
+            "stream_frames": self.stream_frames,
+            "streams_opened": self.streams_opened,
+            "avg_latency_ms": (
+                round(
+                    self.total_latency * 1000 / (self.requests + self.stream_frames), 2
+                )
+                if self.requests + self.stream_frames
+                else 0
+            ),
+        }
+
+        # Connection counts come from httpcore internals; report them when available
+        try:
+            connections = self._client._transport._pool.connections
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        except Exception:
+            pass
+
+        return stats
+
+
+# Global client instance
+ml_client = MLServiceClient()
@@ -3,7 +3,7 @@ Questionnaire Service
 Manages role-specific question banks and question flow
 """
 
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from utils.role_data import get_questions_for_role
 import random
 
@@ -82,3 +82,19 @@ class Questionnaire:
     def get_all_questions(self) -> List[str]:
         """Get all questions for this role"""
         return self.questions.copy()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize questionnaire progress (for external session stores)"""
+        return {
+            "role": self.role,
+            "current_index": self.current_index,
+            "asked_questions": self.asked_questions,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Questionnaire":
+        """Rebuild a Questionnaire from to_dict() output"""
+        questionnaire = cls(data["role"])
+        questionnaire.current_index = data.get("current_index", 0)
+        questionnaire.asked_questions = list(data.get("asked_questions", []))
+        return questionnaire
@@ -0,0 +1,793 @@
+"""
+Session Store Service
+Pluggable storage for interview sessions and cheating timelines so that
+several workers or nodes can serve the same interview
+"""
+
+from typing import List, Dict, Any, Optional, Set
+from collections import OrderedDict
+import asyncio
+import json
+import time
+from services.memory_manager import MemoryManager
+from services.questionnaire import Questionnaire
+from services.cheating_monitor import CheatingMonitor, EventAggregate
+from services.compact_timeline import (
+    CompactTimeline,
+    event_to_interval,
+    format_cursor,
+    pack_event,
+    packed_epoch,
+    parse_cursor,
+    parse_timestamp,
+    query_rows,
+    records_to_events,
+    records_to_intervals,
+    unpack_event,
+    unpack_interval,
+)
+from utils.config import settings
+
+# Interview fields holding service objects, and their classes
+_COMPONENTS = {
+    "memory_manager": MemoryManager,
+    "questionnaire": Questionnaire,
+    "cheating_monitor": CheatingMonitor,
+}
+
+
+def serialize_interview(interview: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an interview (with service objects) into plain JSON data"""
+    data = dict(interview)
+    for field in _COMPONENTS:
+        data[field] = interview[field].to_dict()
+    return data
+
+
+def deserialize_interview(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild an interview's service objects from serialize_interview() output"""
+    interview = dict(data)
+    for field, component_cls in _COMPONENTS.items():
+        interview[field] = component_cls.from_dict(data[field])
+    return interview
+
+
+class SessionConflictError(Exception):
+    """Raised when an interview was saved by someone else since it was loaded"""
+
+
+class SessionStore:
+    """
+    Storage interface for interview state and cheating timelines
+
+    Interviews are dicts holding scalar fields plus MemoryManager,
+    Questionnaire and CheatingMonitor objects. Callers must save_interview()
+    after mutating a loaded interview.
+
+    Saves are optimistic: each interview carries a "version" that
+    save_interview() checks and bumps, so a save based on a stale copy
+    raises SessionConflictError instead of overwriting newer state.
+    """
+
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """Load an interview, or None if it does not exist"""
+        raise NotImplementedError
+
+    async def save_interview(self, interview: Dict[str, Any]):
+        """
+        Create or update an interview (keyed by interview["id"])
+        Raises SessionConflictError if it changed since it was loaded
+        """
+        raise NotImplementedError
+
+    async def delete_interview(self, interview_id: str) -> bool:
+        """Delete an interview. Returns True if it existed"""
+        raise NotImplementedError
+
+    async def list_interviews(self) -> List[Dict[str, Any]]:
+        """Load all active interviews"""
+        raise NotImplementedError
+
+    async def append_event(self, interview_id: str, event: Dict[str, Any]) -> int:
+        """
+        Append a cheating event to an interview's timeline
+        Returns the calm streak: consecutive low-severity events ending with this one
+        """
+        raise NotImplementedError
+
+    async def get_events(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Get an interview's timeline, or None if nothing was logged"""
+        raise NotImplementedError
+
+    async def get_intervals(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get an interview's timeline as runs of identical events
+        (see compact_timeline.collapse_runs), or None if nothing was logged
+        """
+        raise NotImplementedError
+
+    async def query_timeline(
+        self,
+        interview_id: str,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        event_types: Optional[Set[str]] = None,
+        limit: Optional[int] = None,
+        as_intervals: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Filtered, paginated timeline read (see compact_timeline.query_rows)
+        since/until are epoch seconds; returns None if nothing was logged
+        """
+        raise NotImplementedError
+
+    async def get_event_summary(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an interview's timeline summary, or None if nothing was logged
+        Maintained incrementally on append, so this does not read the timeline
+        """
+        raise NotImplementedError
+
+    async def delete_events(self, interview_id: str) -> bool:
+        """Delete an interview's timeline. Returns True if it existed"""
+        raise NotImplementedError
+
+    async def evict_expired(self) -> int:
+        """Evict sessions idle longer than the TTL. Returns number evicted"""
+        raise NotImplementedError
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get live/evicted session counts and retained size"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections"""
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store (single worker only)
+    Keeps live service objects, so there is no serialization cost;
+    timelines are held as CompactTimeline columns
+
+    Sessions (an interview and its timeline) idle for longer than idle_ttl
+    seconds are evicted lazily on access and by the background sweeper;
+    beyond max_sessions the least recently used session is evicted.
+
+    Retained bytes are a running estimate (interviews sized when saved,
+    timelines when appended to), so get_stats() is O(1).
+    """
+
+    def __init__(
+        self, idle_ttl: float = 0, max_sessions: int = 0, compress_timelines: bool = False
+    ):
+        self.interviews: Dict[str, Dict[str, Any]] = {}
+        self.timelines: Dict[str, CompactTimeline] = {}
+        self.timeline_stats: Dict[str, EventAggregate] = {}
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.compress_timelines = compress_timelines
+
+        # Session ID -> last access time, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+        # Session ID -> estimated size, and their running total
+        self._interview_bytes: Dict[str, int] = {}
+        self._timeline_bytes: Dict[str, int] = {}
+        self._bytes_retained = 0
+
+    def _set_size(self, sizes: Dict[str, int], session_id: str, size: int):
+        self._bytes_retained += size - sizes.pop(session_id, 0)
+        if size:
+            sizes[session_id] = size
+
+    def _touch(self, session_id: str):
+        self._last_access[session_id] = time.monotonic()
+        self._last_access.move_to_end(session_id)
+
+        if self.max_sessions > 0:
+            while len(self._last_access) > self.max_sessions:
+                oldest = next(iter(self._last_access))
+                self._evict(oldest)
+                self.evicted_lru += 1
+                print(f"⚠ Session cap ({self.max_sessions}) reached, evicted {oldest}")
+
+    def _expire_if_idle(self, session_id: str):
+        last_access = self._last_access.get(session_id)
+        if (
+            last_access is not None
+            and self.idle_ttl > 0
+            and time.monotonic() - last_access > self.idle_ttl
+        ):
+            self._evict(session_id)
+            self.evicted_idle += 1
+
+    def _evict(self, session_id: str):
+        self.interviews.pop(session_id, None)
+        self.timelines.pop(session_id, None)
+        self.timeline_stats.pop(session_id, None)
+        self._last_access.pop(session_id, None)
+        self._set_size(self._interview_bytes, session_id, 0)
+        self._set_size(self._timeline_bytes, session_id, 0)
+
+    def _forget_if_empty(self, session_id: str):
+        if session_id not in self.interviews and session_id not in self.timelines:
+            self._last_access.pop(session_id, None)
+
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        self._expire_if_idle(interview_id)
+        interview = self.interviews.get(interview_id)
+        if interview is not None:
+            self._touch(interview_id)
+        return interview
+
+    async def save_interview(self, interview: Dict[str, Any]):
+        stored = self.interviews.get(interview["id"])
+        version = interview.get("version", 0)
+        if (stored.get("version", 0) if stored is not None else 0) != version:
+            raise SessionConflictError(f"Interview {interview['id']} was modified concurrently")
+        interview["version"] = version + 1
+        self.interviews[interview["id"]] = interview
+        self._set_size(
+            self._interview_bytes,
+            interview["id"],
+            len(json.dumps(serialize_interview(interview), default=str)),
+        )
+        self._touch(interview["id"])
+
+    async def delete_interview(self, interview_id: str) -> bool:
+        existed = self.interviews.pop(interview_id, None) is not None
+        self._set_size(self._interview_bytes, interview_id, 0)
+        self._forget_if_empty(interview_id)
+        return existed
+
+    async def list_interviews(self) -> List[Dict[str, Any]]:
+        await self.evict_expired()
+        return list(self.interviews.values())
+
+    async def append_event(self, interview_id: str, event: Dict[str, Any]) -> int:
+        self._expire_if_idle(interview_id)
+        timeline = self.timelines.get(interview_id)
+        if timeline is None:
+            timeline = self.timelines[interview_id] = CompactTimeline(
+                compress=self.compress_timelines
+            )
+        timeline.append(event)
+        self._set_size(self._timeline_bytes, interview_id, timeline.nbytes())
+        aggregate = self.timeline_stats.setdefault(interview_id, EventAggregate())
+        aggregate.add(event)
+        self._touch(interview_id)
+        return aggregate.calm_streak
+
+    async def get_events(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        self._expire_if_idle(interview_id)
+        timeline = self.timelines.get(interview_id)
+        if timeline is None:
+            return None
+        self._touch(interview_id)
+        return timeline.to_list()
+
+    async def get_intervals(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        self._expire_if_idle(interview_id)
+        timeline = self.timelines.get(interview_id)
+        if timeline is None:
+            return None
+        self._touch(interview_id)
+        return timeline.intervals()
+
+    async def query_timeline(
+        self,
+        interview_id: str,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        event_types: Optional[Set[str]] = None,
+        limit: Optional[int] = None,
+        as_intervals: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        self._expire_if_idle(interview_id)
+        timeline = self.timelines.get(interview_id)
+        if timeline is None:
+            return None
+        self._touch(interview_id)
+        return timeline.query(cursor, since, until, event_types, limit, as_intervals)
+
+    async def get_event_summary(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        self._expire_if_idle(interview_id)
+        aggregate = self.timeline_stats.get(interview_id)
+        if aggregate is None:
+            return None
+        self._touch(interview_id)
+        return aggregate.summary()
+
+    async def delete_events(self, interview_id: str) -> bool:
+        existed = self.timelines.pop(interview_id, None) is not None
+        self.timeline_stats.pop(interview_id, None)
+        self._set_size(self._timeline_bytes, interview_id, 0)
+        self._forget_if_empty(interview_id)
+        return existed
+
+    async def evict_expired(self) -> int:
+        if self.idle_ttl <= 0:
+            return 0
+
+        # Access order is oldest first, so stop at the first live session
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = []
+        for session_id, last_access in self._last_access.items():
+            if last_access > cutoff:
+                break
+            expired.append(session_id)
+
+        for session_id in expired:
+            self._evict(session_id)
+        self.evicted_idle += len(expired)
+        return len(expired)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "live_sessions": len(self._last_access),
+            "live_interviews": len(self.interviews),
+            "live_timelines": len(self.timelines),
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+            "bytes_retained": self._bytes_retained,
+            "idle_ttl_seconds": self.idle_ttl,
+            "max_sessions": self.max_sessions,
+            "timeline_compression": "rle" if self.compress_timelines else "none",
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-protocol store shared by all workers and nodes
+
+    Interviews are JSON documents under "<prefix>interview:<id>"; timelines
+    are Redis lists of packed JSON events (see pack_event) under
+    "<prefix>timeline:<id>", with
+    running counts in a hash under "<prefix>timeline_stats:<id>". Any
+    redis.asyncio-compatible client works, e.g. fakeredis.aioredis.FakeRedis
+    for local testing.
+
+    Idle expiry uses native key TTLs refreshed on every access. A sorted set
+    "<prefix>sessions" scored by last access time backs the max_sessions LRU
+    cap and lets the sweeper account for expired sessions.
+
+    With compress_timelines, a Lua script extends the last timeline record
+    into a run (see compact_timeline) when the new event matches it.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client=None,
+        prefix: str = "interview-service:",
+        idle_ttl: float = 0,
+        max_sessions: int = 0,
+        compress_timelines: bool = False,
+    ):
+        try:
+            import redis.asyncio as redis_asyncio
+            from redis.exceptions import WatchError
+        except ImportError as e:
+            raise ImportError(
+                "SESSION_STORE=redis requires the 'redis' package (pip install redis)"
+            ) from e
+        if client is None:
+            client = redis_asyncio.from_url(url)
+        self._watch_error = WatchError
+
+        self.client = client
+        self.prefix = prefix
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.compress_timelines = compress_timelines
+
+        # Evictions performed by this process
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def _interview_key(self, interview_id: str) -> str:
+        return f"{self.prefix}interview:{interview_id}"
+
+    def _timeline_key(self, interview_id: str) -> str:
+        return f"{self.prefix}timeline:{interview_id}"
+
+    def _timeline_stats_key(self, interview_id: str) -> str:
+        return f"{self.prefix}timeline_stats:{interview_id}"
+
+    @property
+    def _sessions_key(self) -> str:
+        return f"{self.prefix}sessions"
+
+    async def _touch(self, session_id: str):
+        pipe = self.client.pipeline()
+        pipe.zadd(self._sessions_key, {session_id: time.time()})
+        if self.idle_ttl > 0:
+            ttl = int(self.idle_ttl)
+            pipe.expire(self._interview_key(session_id), ttl)
+            pipe.expire(self._timeline_key(session_id), ttl)
+            pipe.expire(self._timeline_stats_key(session_id), ttl)
+        await pipe.execute()
+
+        if self.max_sessions > 0:
+            excess = await self.client.zcard(self._sessions_key) - self.max_sessions
+            if excess > 0:
+                oldest = await self.client.zpopmin(self._sessions_key, excess)
+                await self._delete_sessions([member for member, _ in oldest])
+                self.evicted_lru += len(oldest)
+                print(
+                    f"⚠ Session cap ({self.max_sessions}) reached, "
+                    f"evicted {len(oldest)} least recently used session(s)"
+                )
+
+    async def _delete_sessions(self, session_ids: List[Any]):
+        keys = []
+        for session_id in session_ids:
+            if isinstance(session_id, bytes):
+                session_id = session_id.decode()
+            keys += [
+                self._interview_key(session_id),
+                self._timeline_key(session_id),
+                self._timeline_stats_key(session_id),
+            ]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def _forget_if_empty(self, session_id: str):
+        if not await self.client.exists(
+            self._interview_key(session_id), self._timeline_key(session_id)
+        ):
+            await self.client.zrem(self._sessions_key, session_id)
+
+    async def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self._interview_key(interview_id))
+        if raw is None:
+            return None
+        await self._touch(interview_id)
+        return deserialize_interview(json.loads(raw))
+
+    async def save_interview(self, interview: Dict[str, Any]):
+        key = self._interview_key(interview["id"])
+        version = interview.get("version", 0)
+        data = json.dumps(serialize_interview({**interview, "version": version + 1}))
+
+        # WATCH makes the SET fail if another worker saves between check and write
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                raw = await pipe.get(key)
+                stored_version = json.loads(raw).get("version", 0) if raw is not None else 0
+                if stored_version != version:
+                    raise SessionConflictError(
+                        f"Interview {interview['id']} was modified concurrently"
+                    )
+                pipe.multi()
+                pipe.set(key, data)
+                await pipe.execute()
+            except self._watch_error as e:
+                raise SessionConflictError(
+                    f"Interview {interview['id']} was modified concurrently"
+                ) from e
+
+        interview["version"] = version + 1
+        await self._touch(interview["id"])
+
+    async def delete_interview(self, interview_id: str) -> bool:
+        existed = await self.client.delete(self._interview_key(interview_id)) > 0
+        await self._forget_if_empty(interview_id)
+        return existed
+
+    async def list_interviews(self) -> List[Dict[str, Any]]:
+        interviews = []
+        async for key in self.client.scan_iter(match=self._interview_key("*")):
+            raw = await self.client.get(key)
+            if raw is not None:
+                interviews.append(deserialize_interview(json.loads(raw)))
+        return interviews
+
+    async def append_event(self, interview_id: str, event: Dict[str, Any]) -> int:
+        stats_key = self._timeline_stats_key(interview_id)
+        record = pack_event(event)
+        pipe = self.client.pipeline()
+        if self.compress_timelines:
+            pipe.eval(
+                _APPEND_RUN_SCRIPT,
+                1,
+                self._timeline_key(interview_id),
+                json.dumps(record + [record[0], 1], separators=(",", ":")),
+            )
+        else:
+            pipe.rpush(
+                self._timeline_key(interview_id),
+                json.dumps(record, separators=(",", ":")),
+            )
+        pipe.hincrby(stats_key, "total", 1)
+        pipe.hincrby(stats_key, f"event:{event.get('event')}", 1)
+        pipe.hincrby(stats_key, f"severity:{event.get('severity')}", 1)
+        pipe.hset(stats_key, "last_severity", str(event.get("severity")))
+        pipe.eval(_TRACK_ORDER_SCRIPT, 1, stats_key, json.dumps(record[0]))
+        calm = event.get("severity") == "low"
+        if calm:
+            pipe.hincrby(stats_key, "calm_streak", 1)
+        else:
+            pipe.hset(stats_key, "calm_streak", 0)
+        results = await pipe.execute()
+        await self._touch(interview_id)
+        return int(results[-1]) if calm else 0
+
+    async def get_events(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        raw_events = await self.client.lrange(self._timeline_key(interview_id), 0, -1)
+        if not raw_events:
+            return None
+        await self._touch(interview_id)
+        # Events written before packing was introduced are plain dicts
+        return records_to_events(json.loads(raw) for raw in raw_events)
+
+    async def get_intervals(self, interview_id: str) -> Optional[List[Dict[str, Any]]]:
+        raw_events = await self.client.lrange(self._timeline_key(interview_id), 0, -1)
+        if not raw_events:
+            return None
+        await self._touch(interview_id)
+        return records_to_intervals(json.loads(raw) for raw in raw_events)
+
+    async def query_timeline(
+        self,
+        interview_id: str,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        event_types: Optional[Set[str]] = None,
+        limit: Optional[int] = None,
+        as_intervals: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        key = self._timeline_key(interview_id)
+        length = await self.client.llen(key)
+        if not length:
+            return None
+        await self._touch(interview_id)
+
+        start_row, first_frame = parse_cursor(cursor)
+        ordered = not await self.client.hexists(
+            self._timeline_stats_key(interview_id), "unordered"
+        )
+        if since is not None and ordered:
+            # Binary search server-side; -1 when a record has no epoch timestamp
+            since_row = int(await self.client.eval(_BISECT_SCRIPT, 1, key, since * 1000))
+            ordered = since_row >= 0
+            if since_row > start_row:
+                start_row, first_frame = since_row, 0
+
+        # Read in chunks so a small page does not pull the whole list; runs
+        # are merged within one read, so interval views take the remainder
+        chunk_size = length if as_intervals else max(limit or length, 256)
+        result = {"items": [], "next_cursor": None, "has_more": False, "done": False}
+        row = start_row
+        while row < length:
+            raw_records = await self.client.lrange(key, row, row + chunk_size - 1)
+            if not raw_records:
+                break
+            page = query_rows(
+                (
+                    _record_row(row + offset, json.loads(raw))
+                    for offset, raw in enumerate(raw_records)
+                ),
+                first_frame=first_frame if row == start_row else 0,
+                since=since,
+                until=until,
+                event_types=event_types,
+                limit=limit - len(result["items"]) if limit else None,
+                as_intervals=as_intervals,
+                ordered=ordered,
+            )
+            result["items"].extend(page["items"])
+            result["next_cursor"] = page["next_cursor"] or result["next_cursor"]
+            if page["has_more"] or page["done"]:
+                result["has_more"], result["done"] = page["has_more"], page["done"]
+                break
+            row += len(raw_records)
+
+        if result["next_cursor"] is None:
+            result["next_cursor"] = format_cursor(start_row, first_frame)
+        return result
+
+    async def get_event_summary(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self._timeline_stats_key(interview_id))
+        if not raw:
+            return None
+        await self._touch(interview_id)
+
+        aggregate = EventAggregate()
+        for field, value in raw.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            value = value.decode() if isinstance(value, bytes) else value
+            kind, _, name = field.partition(":")
+            if kind == "total":
+                aggregate.total = int(value)
+            elif kind == "event":
+                aggregate.by_event[name] = int(value)
+            elif kind == "severity":
+                aggregate.by_severity[name] = int(value)
+            elif kind == "last_severity":
+                aggregate.last_severity = value
+            elif kind == "calm_streak":
+                aggregate.calm_streak = int(value)
+        return aggregate.summary()
+
+    async def delete_events(self, interview_id: str) -> bool:
+        existed = (
+            await self.client.delete(
+                self._timeline_key(interview_id),
+                self._timeline_stats_key(interview_id),
+            )
+            > 0
+        )
+        await self._forget_if_empty(interview_id)
+        return existed
+
+    async def evict_expired(self) -> int:
+        if self.idle_ttl <= 0:
+            return 0
+
+        # Keys expire natively; drop their index entries (and any stragglers)
+        cutoff = time.time() - self.idle_ttl
+        expired = await self.client.zrangebyscore(self._sessions_key, 0, cutoff)
+        if not expired:
+            return 0
+
+        await self._delete_sessions(expired)
+        await self.client.zrem(self._sessions_key, *expired)
+        self.evicted_idle += len(expired)
+        return len(expired)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        members = await self.client.zrange(self._sessions_key, 0, -1)
+
+        # MEMORY USAGE is not available on every Redis-protocol server
+        bytes_retained = None
+        try:
+            pipe = self.client.pipeline()
+            for member in members:
+                session_id = member.decode() if isinstance(member, bytes) else member
+                pipe.memory_usage(self._interview_key(session_id))
+                pipe.memory_usage(self._timeline_key(session_id))
+            bytes_retained = sum(size or 0 for size in await pipe.execute())
+        except Exception:
+            pass
+
+        return {
+            "backend": "redis",
+            "live_sessions": len(members),
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+            "bytes_retained": bytes_retained,
+            "idle_ttl_seconds": self.idle_ttl,
+            "max_sessions": self.max_sessions,
+            "timeline_compression": "rle" if self.compress_timelines else "none",
+        }
+
+    async def close(self):
+        await self.client.close()
+
+
+# Extend the last run record when the new one has the same event, severity
+# and face count, else append it. Records are pack_event() + [end, count];
+# the run keeps the highest-scoring frame's details.
+_APPEND_RUN_SCRIPT = """
+local record = cjson.decode(ARGV[1])
+local raw_last = redis.call('LINDEX', KEYS[1], -1)
+if raw_last then
+    local last = cjson.decode(raw_last)
+    if #last == 10 and type(last[1]) == 'number' and type(record[1]) == 'number'
+        and last[2] == record[2] and last[3] == record[3] and last[4] == record[4] then
+        last[9] = record[1]
+        last[10] = last[10] + 1
+        if record[6] > last[6] then
+            last[5] = record[5]
+            last[6] = record[6]
+            last[7] = record[7]
+            last[8] = record[8]
+        end
+        redis.call('LSET', KEYS[1], -1, cjson.encode(last))
+        return 0
+    end
+end
+redis.call('RPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+# Flag a timeline whose timestamps arrive out of order (disables bisecting)
+_TRACK_ORDER_SCRIPT = """
+local epoch = cjson.decode(ARGV[1])
+if type(epoch) ~= 'number' then
+    redis.call('HSET', KEYS[1], 'unordered', 1)
+    return 0
+end
+local last = tonumber(redis.call('HGET', KEYS[1], 'last_epoch'))
+if last and epoch < last then
+    redis.call('HSET', KEYS[1], 'unordered', 1)
+end
+redis.call('HSET', KEYS[1], 'last_epoch', ARGV[1])
+return 1
+"""
+
+# First list index whose (end) timestamp is >= ARGV[1] (epoch ms), or -1 if
+# a record has no epoch timestamp (e.g. written before records were packed)
+_BISECT_SCRIPT = """
+local since = tonumber(ARGV[1])
+local lo, hi = 0, redis.call('LLEN', KEYS[1])
+while lo < hi do
+    local mid = math.floor((lo + hi) / 2)
+    local record = cjson.decode(redis.call('LINDEX', KEYS[1], mid))
+    local epoch = record[9] or record[1]
+    if type(epoch) ~= 'number' then
+        return -1
+    end
+    if epoch < since then
+        lo = mid + 1
+    else
+        hi = mid
+    end
+end
+return lo
+"""
+
+
+def _record_row(row_index: int, record: Any):
+    """A stored record as a query_rows() row"""
+    if isinstance(record, dict):
+        epoch = parse_timestamp(record.get("timestamp"))
+        return row_index, event_to_interval(record), epoch, epoch
+    if len(record) > 8:
+        start, end = packed_epoch(record[0]), packed_epoch(record[8])
+        return row_index, unpack_interval(record), start, end
+    epoch = packed_epoch(record[0])
+    return row_index, event_to_interval(unpack_event(record)), epoch, epoch
+
+
+async def run_sweeper(store: SessionStore, interval: float):
+    """Background task: periodically evict idle sessions"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            evicted = await store.evict_expired()
+            if evicted:
+                print(f"✓ Evicted {evicted} idle session(s)")
+        except Exception as e:
+            print(f"⚠ Session sweep failed: {e}")
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store selected by SESSION_STORE"""
+    if settings.TIMELINE_COMPRESSION not in ("none", "rle"):
+        raise ValueError(
+            f"Invalid TIMELINE_COMPRESSION '{settings.TIMELINE_COMPRESSION}'. "
+            "Must be 'none' or 'rle'"
+        )
+    compress_timelines = settings.TIMELINE_COMPRESSION == "rle"
+
+    if settings.SESSION_STORE == "redis":
+        return RedisSessionStore(
+            settings.REDIS_URL,
+            idle_ttl=settings.SESSION_IDLE_TTL,
+            max_sessions=settings.SESSION_MAX_SESSIONS,
+            compress_timelines=compress_timelines,
+        )
+    if settings.SESSION_STORE != "memory":
+        raise ValueError(
+            f"Invalid SESSION_STORE '{settings.SESSION_STORE}'. Must be 'memory' or 'redis'"
+        )
+    return InMemorySessionStore(
+        idle_ttl=settings.SESSION_IDLE_TTL,
+        max_sessions=settings.SESSION_MAX_SESSIONS,
+        compress_timelines=compress_timelines,
+    )
+
+
+# Global session store instance
+session_store = create_session_store()
@@ -0,0 +1,31 @@
+"""
+Shared fixtures
+"""
+
+import pytest
+
+from services.session_store import InMemorySessionStore, RedisSessionStore
+
+
+@pytest.fixture
+async def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def make_redis_store(redis_client):
+    def make(**kwargs):
+        return RedisSessionStore(client=redis_client, **kwargs)
+
+    return make
+
+
+@pytest.fixture(params=["memory", "redis"])
+def make_store(request):
+    """Store factory for tests that must hold for both backends"""
+    if request.param == "memory":
+        return InMemorySessionStore
+    return request.getfixturevalue("make_redis_store")
@@ -0,0 +1,50 @@
+"""
+Tests for the adaptive capture interval
+"""
+
+import pytest
+
+from services.capture_governor import CaptureGovernor
+from services.ml_client import ml_client
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    monkeypatch.setattr(ml_client, "in_flight", 0)
+    monkeypatch.setattr(ml_client, "recent_latency", 0.0)
+    monkeypatch.setattr(ml_client, "pool_load", 0.0)
+    return CaptureGovernor(
+        base_interval=3.0, min_interval=1.0, max_interval=12.0, calm_frames=5
+    )
+
+
+def test_alerts_use_min_interval(governor):
+    assert governor.next_interval_ms("critical", 0) == 1000
+    assert governor.next_interval_ms("high", 0) == 1000
+
+
+def test_calm_streak_stretches_interval(governor):
+    assert governor.next_interval_ms("low", 1) == 3000
+    assert governor.next_interval_ms("low", 5) == 6000
+    assert governor.next_interval_ms("low", 10) == 9000
+    assert governor.next_interval_ms("low", 100) == 12000
+
+
+def test_load_stretches_interval(governor, monkeypatch):
+    monkeypatch.setattr(ml_client, "in_flight", 100)
+    assert governor.next_interval_ms("low", 1) == 6000
+    assert governor.next_interval_ms("critical", 0) == 2000
+    assert governor.get_stats()["load_factor"] == 2.0
+
+
+def test_ml_pool_load_stretches_interval(governor, monkeypatch):
+    ml_client.record_pool_load("0.75")
+    assert governor.next_interval_ms("low", 1) == 4500
+
+    # A rejected frame means the pool is full
+    ml_client.record_pool_load(None, 429)
+    assert governor.next_interval_ms("low", 1) == 6000
+
+    # Replies without the header leave the last reading in place
+    ml_client.record_pool_load(None)
+    assert ml_client.pool_load == 1.0
@@ -0,0 +1,80 @@
+"""
+Tests for the cheating detection endpoints
+"""
+
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import cheating_router
+from services.session_store import InMemorySessionStore
+
+DETECTION = {
+    "success": True,
+    "face_detected": True,
+    "num_faces": 1,
+    "multiple_faces": False,
+    "gaze_direction": "center",
+    "face_distance": "normal",
+    "mobile_detected": False,
+    "cheating_score": 0,
+    "severity": "low",
+    "issues": [],
+    "message": "All clear",
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def check_face_raw(image_bytes, content_type="image/jpeg", interview_id=None):
+        return dict(DETECTION)
+
+    monkeypatch.setattr(cheating_router, "session_store", InMemorySessionStore())
+    monkeypatch.setattr(cheating_router.ml_client, "check_face_raw", check_face_raw)
+    app = FastAPI()
+    app.include_router(cheating_router.router, prefix="/cheating")
+    return TestClient(app)
+
+
+def test_log_binary_rejects_non_image_body(client):
+    response = client.post(
+        "/cheating/log_binary?interview_id=iv-1",
+        content=b"not a frame",
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 415
+
+
+def test_log_binary_rejects_non_image_multipart_frame(client):
+    response = client.post(
+        "/cheating/log_binary",
+        data={"interview_id": "iv-1"},
+        files={"frame": ("frame.txt", b"not a frame", "text/plain")},
+    )
+    assert response.status_code == 415
+
+
+def _log_frame(client, timestamp=None):
+    params = {"interview_id": "iv-1"}
+    if timestamp:
+        params["timestamp"] = timestamp
+    response = client.post(
+        "/cheating/log_binary",
+        params=params,
+        content=b"\xff\xd8jpeg",
+        headers={"Content-Type": "image/jpeg"},
+    )
+    assert response.status_code == 200
+
+
+def test_timeline_timestamps_are_utc_milliseconds(client):
+    _log_frame(client, "2024-01-01T14:00:00.123456+02:00")
+    _log_frame(client)
+
+    timeline = client.get("/cheating/timeline/iv-1").json()["timeline"]
+
+    assert timeline[0]["timestamp"] == "2024-01-01T12:00:00.123Z"
+    # Server-generated timestamps are already in the returned format
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z", timeline[1]["timestamp"])
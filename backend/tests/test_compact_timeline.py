@@ -0,0 +1,94 @@
+"""
+Tests for the compact timeline column store
+"""
+
+import pytest
+
+from services.compact_timeline import CompactTimeline, format_timestamp, parse_timestamp
+
+
+def _event(timestamp, event="normal", severity="low"):
+    return {
+        "timestamp": timestamp,
+        "event": event,
+        "severity": severity,
+        "num_faces": 1,
+        "cheating_score": 0.0,
+        "message": "",
+        "issues": [],
+    }
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_unparsable_then_valid_timestamp(compress):
+    timeline = CompactTimeline(compress=compress)
+    timeline.append(_event("not-a-timestamp"))
+    timeline.append(_event("2024-01-01T12:00:00"))
+
+    assert timeline.row_count == 2
+    assert not timeline.ordered
+    events = timeline.to_list()
+    assert events[0]["timestamp"] == "not-a-timestamp"
+    assert len(events) == 2
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_in_order_timestamps_stay_ordered(compress):
+    timeline = CompactTimeline(compress=compress)
+    timeline.append(_event("2024-01-01T12:00:00"))
+    timeline.append(_event("2024-01-01T12:00:03", event="no_face", severity="high"))
+
+    assert timeline.ordered
+    assert len(timeline) == 2
+
+
+def test_timestamps_come_back_as_utc():
+    timeline = CompactTimeline()
+    timeline.append(_event("2024-01-01T12:00:00.123456"))
+    timeline.append(_event("2024-01-01T14:00:05+02:00"))
+
+    timestamps = [event["timestamp"] for event in timeline]
+    assert timestamps == ["2024-01-01T12:00:00.123Z", "2024-01-01T12:00:05.000Z"]
+
+
+def test_format_timestamp_round_trips():
+    epoch = parse_timestamp("2024-01-01T12:00:00.250Z")
+    assert format_timestamp(epoch) == "2024-01-01T12:00:00.250Z"
+    assert parse_timestamp(format_timestamp(epoch)) == epoch
+
+
+@pytest.mark.parametrize("as_intervals", [False, True])
+@pytest.mark.parametrize("compress", [False, True])
+def test_polling_cursor_picks_up_growing_run(compress, as_intervals):
+    timeline = CompactTimeline(compress=compress)
+    timeline.append(_event("2024-01-01T12:00:00"))
+    timeline.append(_event("2024-01-01T12:00:03"))
+    first = timeline.query(as_intervals=as_intervals)
+
+    timeline.append(_event("2024-01-01T12:00:06"))
+    second = timeline.query(cursor=first["next_cursor"], as_intervals=as_intervals)
+
+    if as_intervals:
+        assert second["items"][-1]["end"] == "2024-01-01T12:00:06.000Z"
+    else:
+        assert [e["timestamp"] for e in second["items"]] == ["2024-01-01T12:00:06.000Z"]
+
+    # Nothing new: polling again returns nothing
+    third = timeline.query(cursor=second["next_cursor"], as_intervals=as_intervals)
+    assert third["items"] == []
+    assert third["next_cursor"] == second["next_cursor"]
+
+
+def test_paged_reads_do_not_repeat_frames():
+    timeline = CompactTimeline(compress=True)
+    for second in range(0, 30, 3):
+        timeline.append(_event(f"2024-01-01T12:00:{second:02d}"))
+
+    cursor, seen = None, []
+    while True:
+        page = timeline.query(cursor=cursor, limit=3)
+        seen.extend(event["timestamp"] for event in page["items"])
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+    assert len(seen) == 10 and len(set(seen)) == 10
@@ -0,0 +1,88 @@
+"""
+Tests for conversation memory eviction, summaries and context budgeting
+"""
+
+from services.memory_manager import MemoryManager
+from utils.tokens import count_tokens
+
+
+def _conversation(manager, turns):
+    for turn in range(turns):
+        manager.add_message("assistant", f"Question {turn}: what did you build?")
+        manager.add_message("user", f"Answer {turn}: a service")
+
+
+def test_eviction_keeps_aggregates_in_step():
+    manager = MemoryManager("iv-1", max_history=4, summary_budget=100)
+    _conversation(manager, 5)
+
+    assert manager.get_message_count() == 4
+    assert list(manager.get_user_answers()) == ["Answer 3: a service", "Answer 4: a service"]
+    assert list(manager.get_questions_asked()) == [
+        "Question 3: what did you build?",
+        "Question 4: what did you build?",
+    ]
+
+    summary = manager.get_context_summary()
+    assert summary["assistant_messages"] == 2
+    assert summary["user_messages"] == 2
+    assert summary["summarized_messages"] == 6
+    assert summary["context_tokens"] == count_tokens(manager.get_transcript())
+    assert summary["summary_tokens"] == sum(
+        count_tokens(line) for line, _ in manager._summary
+    )
+
+
+def test_transcript_tracks_appends_after_eviction():
+    manager = MemoryManager("iv-1", max_history=2)
+    manager.add_message("user", "one")
+    manager.add_message("assistant", "two")
+    assert manager.get_transcript() == "user: one\nassistant: two"
+
+    manager.add_message("user", "three")
+    assert manager.get_transcript() == "assistant: two\nuser: three"
+
+
+def test_build_context_returns_transcript_within_budget():
+    manager = MemoryManager("iv-1", max_history=10)
+    _conversation(manager, 2)
+
+    assert manager.build_context(1000) == manager.get_transcript()
+    assert manager.build_context(0) == manager.get_transcript()
+
+
+def test_build_context_summarizes_older_messages():
+    manager = MemoryManager("iv-1", max_history=50, summary_budget=20)
+    _conversation(manager, 10)
+    budget = 60
+
+    context = manager.build_context(budget)
+
+    assert context.startswith("Summary of the ")
+    assert context.endswith("user: Answer 9: a service")
+    assert "- Interviewer asked: Question" in context
+    # Summary lines are trimmed oldest first to stay within the budget
+    assert "Answer 0:" not in context
+    assert count_tokens(context) <= budget + 20
+
+
+def test_build_context_includes_evicted_messages():
+    manager = MemoryManager("iv-1", max_history=2, summary_budget=100)
+    _conversation(manager, 3)
+
+    context = manager.build_context(1000)
+
+    assert context.startswith("Summary of the 4 earlier messages:")
+    assert "- Candidate: Answer 0: a service" in context
+    assert context.endswith(manager.get_transcript())
+
+
+def test_round_trip_preserves_summary():
+    manager = MemoryManager("iv-1", max_history=2, summary_budget=100)
+    _conversation(manager, 3)
+
+    restored = MemoryManager.from_dict(manager.to_dict())
+
+    assert restored.get_transcript() == manager.get_transcript()
+    assert restored.build_context(1000) == manager.build_context(1000)
+    assert restored.get_context_summary() == manager.get_context_summary()
@@ -0,0 +1,392 @@
+"""
+Tests for the session store backends
+"""
+
+import json
+
+import pytest
+
+from services import session_store as session_store_module
+from services.cheating_monitor import CheatingMonitor
+from services.compact_timeline import parse_timestamp
+from services.memory_manager import MemoryManager
+from services.questionnaire import Questionnaire
+from services.session_store import (
+    _BISECT_SCRIPT,
+    InMemorySessionStore,
+    RedisSessionStore,
+    SessionConflictError,
+    deserialize_interview,
+    serialize_interview,
+)
+
+
+def _event(timestamp, event="normal", severity="low", score=0.0):
+    return {
+        "timestamp": timestamp,
+        "event": event,
+        "severity": severity,
+        "num_faces": 1,
+        "mobile_detected": False,
+        "cheating_score": score,
+        "message": "",
+        "issues": [],
+    }
+
+
+def _frame(second, millis=0, **kwargs):
+    return _event(f"2024-01-01T12:00:{second:02d}.{millis:03d}", **kwargs)
+
+
+async def test_rle_run_keeps_millisecond_precision(make_redis_store, redis_client):
+    store = make_redis_store(compress_timelines=True)
+    await store.append_event("run", _frame(0, 123))
+    await store.append_event("run", _frame(3, 456, score=0.5))
+    await store.append_event("run", _frame(6, 789))
+
+    raw = await redis_client.lrange(store._timeline_key("run"), 0, -1)
+    assert len(raw) == 1
+    record = json.loads(raw[0])
+    assert record[0] == round(parse_timestamp("2024-01-01T12:00:00.123") * 1000)
+    assert record[8] == round(parse_timestamp("2024-01-01T12:00:06.789") * 1000)
+    assert record[9] == 3
+    assert record[5] == 0.5
+
+    intervals = await store.get_intervals("run")
+    assert len(intervals) == 1
+    assert intervals[0]["start"] == "2024-01-01T12:00:00.123Z"
+    assert intervals[0]["end"] == "2024-01-01T12:00:06.789Z"
+    assert intervals[0]["count"] == 3
+
+
+async def test_rle_starts_new_run_on_change(make_redis_store, redis_client):
+    store = make_redis_store(compress_timelines=True)
+    await store.append_event("run", _frame(0))
+    await store.append_event("run", _frame(3, event="no_face", severity="high"))
+    await store.append_event("run", _frame(6, event="no_face", severity="high"))
+
+    assert await redis_client.llen(store._timeline_key("run")) == 2
+    events = await store.get_events("run")
+    assert [e["event"] for e in events] == ["normal", "no_face", "no_face"]
+    assert events[2]["timestamp"] == "2024-01-01T12:00:06.000Z"
+
+
+async def test_bisect_script_finds_first_row_since(make_redis_store, redis_client):
+    store = make_redis_store()
+    for second in range(0, 30, 3):
+        await store.append_event("bisect", _frame(second, 500))
+
+    key = store._timeline_key("bisect")
+    since = parse_timestamp("2024-01-01T12:00:09.500")
+    assert await redis_client.eval(_BISECT_SCRIPT, 1, key, since * 1000) == 3
+    assert await redis_client.eval(_BISECT_SCRIPT, 1, key, (since + 0.001) * 1000) == 4
+    assert await redis_client.eval(_BISECT_SCRIPT, 1, key, 0) == 0
+    assert await redis_client.eval(_BISECT_SCRIPT, 1, key, (since + 60) * 1000) == 10
+
+
+async def test_bisect_script_gives_up_on_unparsable_timestamp(make_redis_store, redis_client):
+    store = make_redis_store()
+    await store.append_event("bisect", _event("garbage"))
+    await store.append_event("bisect", _frame(3))
+
+    key = store._timeline_key("bisect")
+    assert await redis_client.eval(_BISECT_SCRIPT, 1, key, 0) == -1
+
+
+async def test_query_timeline_reads_in_chunks(make_redis_store, redis_client):
+    store = make_redis_store()
+    for i in range(600):
+        await store.append_event("chunks", _event(f"2024-01-01T12:{i // 60:02d}:{i % 60:02d}"))
+
+    reads = []
+    lrange = redis_client.lrange
+
+    async def counting_lrange(key, start, end):
+        reads.append((start, end))
+        return await lrange(key, start, end)
+
+    redis_client.lrange = counting_lrange
+
+    page = await store.query_timeline("chunks", limit=10)
+    assert len(page["items"]) == 10
+    assert page["has_more"]
+    assert reads == [(0, 255)]
+
+    since = parse_timestamp("2024-01-01T12:07:00")
+    page = await store.query_timeline("chunks", since=since, limit=5)
+    assert page["items"][0]["timestamp"] == "2024-01-01T12:07:00.000Z"
+    assert reads[-1] == (420, 675)
+
+    reads.clear()
+    everything = await store.query_timeline("chunks")
+    assert len(everything["items"]) == 600
+    assert reads == [(0, 599)]
+
+    # Cursor pagination walks the whole list exactly once
+    cursor, seen = None, []
+    while True:
+        page = await store.query_timeline("chunks", cursor=cursor, limit=250)
+        seen.extend(item["timestamp"] for item in page["items"])
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+    assert len(seen) == 600 and len(set(seen)) == 600
+
+
+def _interview(interview_id, role="SDE"):
+    memory_manager = MemoryManager(interview_id)
+    memory_manager.add_message("assistant", "Welcome! Tell me about yourself.")
+    memory_manager.add_message("user", "I build backend services.")
+    questionnaire = Questionnaire(role)
+    questionnaire.get_next_question()
+    cheating_monitor = CheatingMonitor(interview_id)
+    cheating_monitor.add_event(_event("2024-01-01T12:00:00", event="NO_FACE", severity="high"))
+    return {
+        "id": interview_id,
+        "role": role,
+        "persona": "Efficient",
+        "user_name": "Ada",
+        "memory_manager": memory_manager,
+        "questionnaire": questionnaire,
+        "cheating_monitor": cheating_monitor,
+        "start_time": "2024-01-01T12:00:00",
+        "question_count": 1,
+    }
+
+
+class FakeClock:
+    """Stands in for the time module inside session_store"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_store_module, "time", fake)
+    return fake
+
+
+async def test_interview_round_trip(make_store):
+    store = make_store()
+    await store.save_interview(_interview("a"))
+
+    loaded = await store.get_interview("a")
+    assert loaded["user_name"] == "Ada"
+    assert [m["content"] for m in loaded["memory_manager"].messages] == [
+        "Welcome! Tell me about yourself.",
+        "I build backend services.",
+    ]
+    assert loaded["questionnaire"].current_index == 1
+    assert loaded["cheating_monitor"].get_violation_count() == 1
+    assert [i["id"] for i in await store.list_interviews()] == ["a"]
+
+    assert await store.delete_interview("a")
+    assert not await store.delete_interview("a")
+    assert await store.get_interview("a") is None
+
+
+async def test_redis_interview_is_stored_as_json(make_redis_store, redis_client):
+    store = make_redis_store()
+    interview = _interview("a")
+    await store.save_interview(interview)
+
+    data = json.loads(await redis_client.get(store._interview_key("a")))
+    assert data == serialize_interview(interview)
+    assert deserialize_interview(data)["questionnaire"].to_dict() == (
+        interview["questionnaire"].to_dict()
+    )
+
+
+async def test_events_and_summary(make_store):
+    store = make_store()
+    assert await store.get_events("a") is None
+    assert await store.get_event_summary("a") is None
+
+    await store.append_event("a", _frame(0, event="NO_FACE", severity="high"))
+    await store.append_event("a", _frame(3, event="NO_FACE", severity="high"))
+    await store.append_event("a", _frame(6, event="MULTIPLE_FACES", severity="critical"))
+
+    events = await store.get_events("a")
+    assert [e["event"] for e in events] == ["NO_FACE", "NO_FACE", "MULTIPLE_FACES"]
+    assert events[0]["timestamp"] == "2024-01-01T12:00:00.000Z"
+
+    summary = await store.get_event_summary("a")
+    assert summary["total_events"] == 3
+    assert summary["face_missing_count"] == 2
+    assert summary["critical_events"] == 1
+
+    assert await store.delete_events("a")
+    assert await store.get_events("a") is None
+    assert await store.get_event_summary("a") is None
+
+
+async def test_redis_summary_counters(make_redis_store, redis_client):
+    store = make_redis_store()
+    await store.append_event("a", _frame(0, event="NO_FACE", severity="high"))
+    await store.append_event("a", _frame(3, event="NO_FACE", severity="high"))
+    await store.append_event("a", _frame(1, event="normal", severity="low"))
+
+    stats = await redis_client.hgetall(store._timeline_stats_key("a"))
+    assert stats[b"total"] == b"3"
+    assert stats[b"event:NO_FACE"] == b"2"
+    assert stats[b"severity:high"] == b"2"
+    assert stats[b"last_severity"] == b"low"
+    # The third frame went back in time, so bisecting is disabled
+    assert stats[b"unordered"] == b"1"
+
+
+async def test_idle_sessions_expire(make_store, clock):
+    store = make_store(idle_ttl=60)
+    await store.save_interview(_interview("a"))
+    await store.append_event("a", _frame(0))
+    await store.save_interview(_interview("b"))
+
+    clock.now += 45
+    assert await store.get_interview("b") is not None
+    clock.now += 30
+
+    assert await store.evict_expired() == 1
+    assert await store.get_events("a") is None
+    assert await store.get_interview("b") is not None
+    assert (await store.get_stats())["evicted_idle"] == 1
+
+
+async def test_memory_store_expires_on_access(clock):
+    store = InMemorySessionStore(idle_ttl=60)
+    await store.save_interview(_interview("a"))
+    clock.now += 61
+    assert await store.get_interview("a") is None
+    assert store.evicted_idle == 1
+
+
+async def test_redis_keys_carry_idle_ttl(make_redis_store, redis_client):
+    store = make_redis_store(idle_ttl=60)
+    await store.save_interview(_interview("a"))
+    await store.append_event("a", _frame(0))
+
+    for key in (
+        store._interview_key("a"),
+        store._timeline_key("a"),
+        store._timeline_stats_key("a"),
+    ):
+        assert 0 < await redis_client.ttl(key) <= 60
+
+    no_ttl = make_redis_store(prefix="other:")
+    await no_ttl.save_interview(_interview("a"))
+    assert await redis_client.ttl(no_ttl._interview_key("a")) == -1
+
+
+async def test_lru_cap_evicts_least_recently_used(make_store, clock):
+    store = make_store(max_sessions=2)
+    await store.save_interview(_interview("a"))
+    clock.now += 1
+    await store.save_interview(_interview("b"))
+    clock.now += 1
+    await store.get_interview("a")
+    clock.now += 1
+    await store.save_interview(_interview("c"))
+
+    assert await store.get_interview("b") is None
+    assert await store.get_interview("a") is not None
+    assert await store.get_interview("c") is not None
+    stats = await store.get_stats()
+    assert stats["live_sessions"] == 2
+    assert stats["evicted_lru"] == 1
+
+
+async def test_redis_session_index_is_ordered_by_access(make_redis_store, redis_client, clock):
+    store = make_redis_store()
+    for session_id in ("a", "b", "c"):
+        await store.save_interview(_interview(session_id))
+        clock.now += 1
+    await store.append_event("a", _frame(0))
+
+    assert await redis_client.zrange(store._sessions_key, 0, -1) == [b"b", b"c", b"a"]
+    await store.delete_interview("b")
+    assert await redis_client.zrange(store._sessions_key, 0, -1) == [b"c", b"a"]
+
+
+async def test_append_event_returns_calm_streak(make_store):
+    store = make_store()
+    streaks = [
+        await store.append_event("a", _frame(second, severity=severity))
+        for second, severity in enumerate(["low", "low", "high", "low", "low", "low"])
+    ]
+    assert streaks == [1, 2, 0, 1, 2, 3]
+
+
+async def test_redis_calm_streak_is_shared_between_workers(make_redis_store):
+    first, second = make_redis_store(), make_redis_store()
+    await first.append_event("a", _frame(0))
+    assert await second.append_event("a", _frame(3)) == 2
+
+
+@pytest.mark.parametrize("as_intervals", [False, True])
+async def test_polling_cursor_picks_up_growing_run(make_store, as_intervals):
+    store = make_store(compress_timelines=True)
+    await store.append_event("a", _frame(0))
+    await store.append_event("a", _frame(3))
+    first = await store.query_timeline("a", as_intervals=as_intervals)
+
+    await store.append_event("a", _frame(6))
+    second = await store.query_timeline(
+        "a", cursor=first["next_cursor"], as_intervals=as_intervals
+    )
+    assert len(second["items"]) == 1
+    if as_intervals:
+        assert second["items"][0]["count"] == 3
+    else:
+        assert second["items"][0]["timestamp"] == "2024-01-01T12:00:06.000Z"
+
+
+async def test_stale_save_is_rejected(make_store):
+    first = make_store()
+    await first.save_interview(_interview("a"))
+
+    # Two requests load the same version; the second save must not win
+    second = make_store() if isinstance(first, RedisSessionStore) else first
+    mine = await first.get_interview("a")
+    theirs = await second.get_interview("a")
+    if mine is theirs:
+        theirs = deserialize_interview(serialize_interview(mine))
+    mine["question_count"] = 2
+    await first.save_interview(mine)
+
+    theirs["question_count"] = 5
+    with pytest.raises(SessionConflictError):
+        await second.save_interview(theirs)
+    assert (await first.get_interview("a"))["question_count"] == 2
+
+    # A fresh load can be saved again
+    reloaded = await second.get_interview("a")
+    reloaded["question_count"] = 3
+    await second.save_interview(reloaded)
+    assert (await first.get_interview("a"))["question_count"] == 3
+
+
+async def test_memory_store_tracks_retained_bytes():
+    store = InMemorySessionStore(max_sessions=1)
+    await store.save_interview(_interview("a"))
+    await store.append_event("a", _frame(0))
+    interview_bytes = len(json.dumps(serialize_interview(await store.get_interview("a"))))
+    timeline_bytes = store.timelines["a"].nbytes()
+    assert (await store.get_stats())["bytes_retained"] == interview_bytes + timeline_bytes
+
+    await store.delete_events("a")
+    assert (await store.get_stats())["bytes_retained"] == interview_bytes
+
+    # LRU eviction releases the evicted session's bytes too
+    await store.save_interview(_interview("b"))
+    stats = await store.get_stats()
+    assert stats["evicted_lru"] == 1
+    assert stats["bytes_retained"] == len(
+        json.dumps(serialize_interview(await store.get_interview("b")))
+    )
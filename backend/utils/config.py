@@ -19,10 +19,40 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq")
     GROQ_API_KEY: Optional[str] = os.getenv("GROQ_API_KEY")
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    # Max concurrent LLM requests per process
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    # Shared LLM client connection pool
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60.0"))  # seconds
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "50"))
+    LLM_HTTP_MAX_KEEPALIVE: int = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
 
     # ML Service Configuration
     ML_SERVICE_URL: str = os.getenv("ML_SERVICE_URL", "http://localhost:8001")
 
+    # ML Service Connection Pool
+    ML_HTTP_TIMEOUT: float = float(os.getenv("ML_HTTP_TIMEOUT", "10.0"))  # seconds
+    ML_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("ML_HTTP_CONNECT_TIMEOUT", "5.0"))
+    ML_HTTP_MAX_CONNECTIONS: int = int(os.getenv("ML_HTTP_MAX_CONNECTIONS", "100"))
+    ML_HTTP_MAX_KEEPALIVE: int = int(os.getenv("ML_HTTP_MAX_KEEPALIVE", "20"))
+    ML_HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("ML_HTTP_KEEPALIVE_EXPIRY", "30.0")
+    )  # seconds
+    ML_HTTP2: bool = os.getenv("ML_HTTP2", "false").lower() == "true"
+
+    # Session Storage ("memory" for a single worker, "redis" to share across workers)
+    SESSION_STORE: str = os.getenv("SESSION_STORE", "memory")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Idle sessions are evicted after this many seconds (0 disables)
+    SESSION_IDLE_TTL: int = int(os.getenv("SESSION_IDLE_TTL", "3600"))
+    # Least recently used sessions are evicted beyond this count (0 disables;
+    # evictions are logged since they can end a live interview)
+    SESSION_MAX_SESSIONS: int = int(os.getenv("SESSION_MAX_SESSIONS", "0"))
+    SESSION_SWEEP_INTERVAL: int = int(
+        os.getenv("SESSION_SWEEP_INTERVAL", "60")
+    )  # seconds
+    # "rle" stores runs of identical proctoring events as single intervals
+    TIMELINE_COMPRESSION: str = os.getenv("TIMELINE_COMPRESSION", "none")
+
     # Server Configuration
     PORT: int = int(os.getenv("PORT", "8005"))
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -31,10 +61,45 @@ class Settings(BaseSettings):
     MAX_QUESTIONS: int = int(os.getenv("MAX_QUESTIONS", "7"))
     MIN_QUESTIONS: int = int(os.getenv("MIN_QUESTIONS", "5"))
 
+    # Conversation Context (approximate tokens)
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+    # Share of the budget for the rolling summary of older messages
+    CONTEXT_SUMMARY_TOKENS: int = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "1000"))
+
+    # Greeting Cache (greetings are pre-generated per role/persona)
+    GREETING_CACHE_ENABLED: bool = (
+        os.getenv("GREETING_CACHE_ENABLED", "true").lower() == "true"
+    )
+    GREETING_CACHE_TTL: int = int(os.getenv("GREETING_CACHE_TTL", "86400"))  # seconds
+    GREETING_POOL_SIZE: int = int(os.getenv("GREETING_POOL_SIZE", "3"))
+    # Generate all role/persona greetings at startup instead of on first use
+    GREETING_PREWARM: bool = os.getenv("GREETING_PREWARM", "false").lower() == "true"
+    # Generate a greeting live when no cached template is available
+    GREETING_LIVE_FALLBACK: bool = (
+        os.getenv("GREETING_LIVE_FALLBACK", "true").lower() == "true"
+    )
+
     # Cheating Detection Configuration
     CHEATING_CHECK_INTERVAL: int = int(
         os.getenv("CHEATING_CHECK_INTERVAL", "3")
     )  # seconds
+    # Adaptive capture: /cheating/log recommends the next capture delay
+    CAPTURE_ADAPTIVE: bool = os.getenv("CAPTURE_ADAPTIVE", "true").lower() == "true"
+    CAPTURE_MIN_INTERVAL: float = float(os.getenv("CAPTURE_MIN_INTERVAL", "1.0"))
+    CAPTURE_MAX_INTERVAL: float = float(os.getenv("CAPTURE_MAX_INTERVAL", "12.0"))
+    # Clean frames in a row before the interval grows by CHEATING_CHECK_INTERVAL
+    CAPTURE_CALM_FRAMES: int = int(os.getenv("CAPTURE_CALM_FRAMES", "5"))
+    # ML load above these targets stretches every interval proportionally
+    CAPTURE_LOAD_LATENCY_TARGET: float = float(
+        os.getenv("CAPTURE_LOAD_LATENCY_TARGET", "0.5")
+    )  # seconds
+    CAPTURE_LOAD_IN_FLIGHT_TARGET: int = int(
+        os.getenv("CAPTURE_LOAD_IN_FLIGHT_TARGET", "50")
+    )
+    # ML inference pool occupancy (pending / capacity, fleet-wide; 0 = ignore)
+    CAPTURE_LOAD_POOL_TARGET: float = float(
+        os.getenv("CAPTURE_LOAD_POOL_TARGET", "0.5")
+    )
 
     class Config:
         env_file = ".env"
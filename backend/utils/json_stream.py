@@ -0,0 +1,108 @@
+"""
+Incremental JSON Parsing
+Extracts a string field from a JSON object while it is still being generated
+"""
+
+import json
+
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally decodes the value of one top-level string field
+
+    Feed raw LLM output chunks as they arrive; each call returns the newly
+    decoded characters of the field's value (escape sequences resolved).
+    Once the closing quote is seen, `done` is True and further input is ignored.
+    """
+
+    def __init__(self, field: str):
+        self._key = json.dumps(field)
+        self._buffer = ""
+        self._pos = 0
+        self._state = "search"  # search -> colon -> open -> value -> done
+        self._escape = ""
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk of raw JSON text and return newly decoded value text"""
+        self._buffer += chunk
+        decoded = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer) and self._state != "done":
+            if self._state == "search":
+                index = buffer.find(self._key, self._pos)
+                if index == -1:
+                    # Keep a tail that might hold the start of a split key
+                    self._pos = max(self._pos, len(buffer) - len(self._key) + 1)
+                    break
+                self._pos = index + len(self._key)
+                self._state = "colon"
+                continue
+
+            char = buffer[self._pos]
+
+            if self._state == "colon":
+                self._pos += 1
+                if char == ":":
+                    self._state = "open"
+                elif not char.isspace():
+                    # The match was a string value, not a key
+                    self._state = "search"
+
+            elif self._state == "open":
+                self._pos += 1
+                if char == '"':
+                    self._state = "value"
+                elif not char.isspace():
+                    # Not a string value; nothing to stream
+                    self._state = "done"
+
+            elif self._escape:
+                self._escape += char
+                self._pos += 1
+                text, rewind = self._decode_escape()
+                if text is not None:
+                    decoded.append(text)
+                    self._escape = ""
+                    self._pos -= rewind
+
+            elif char == "\\":
+                self._escape = char
+                self._pos += 1
+
+            elif char == '"':
+                self._pos += 1
+                self._state = "done"
+
+            else:
+                decoded.append(char)
+                self._pos += 1
+
+        return "".join(decoded)
+
+    def _decode_escape(self):
+        """
+        Decode the pending escape sequence
+
+        Returns (text, rewind): text is None while the sequence is incomplete;
+        rewind is how many consumed characters must be parsed again.
+        """
+        escape = self._escape
+        if len(escape) < 2:
+            return None, 0
+        if escape[1] != "u":
+            return json.loads(f'"{escape}"'), 0
+        if len(escape) < 6:
+            return None, 0
+
+        # A high surrogate must be followed by a low surrogate escape
+        if 0xD800 <= int(escape[2:6], 16) < 0xDC00:
+            if not "\\u".startswith(escape[6:8]):
+                return "\ufffd", len(escape) - 6
+            if len(escape) < 12:
+                return None, 0
+        return json.loads(f'"{escape}"'), 0
@@ -0,0 +1,36 @@
+"""
+Token Counting Utilities
+Local approximation of LLM token counts for prompt budgeting
+"""
+
+import re
+
+# Words and individual punctuation marks
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def _piece_tokens(piece: str) -> int:
+    # BPE vocabularies split long words into several sub-word tokens
+    return 1 + len(piece) // 8
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens in text
+
+    Counts words and punctuation, with long words costing extra; a rough
+    estimate, but close enough for budgeting without shipping a tokenizer
+    """
+    if not text:
+        return 0
+    return sum(_piece_tokens(piece) for piece in _PIECE_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, ending with an ellipsis when shortened"""
+    used = 0
+    for match in _PIECE_PATTERN.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[: match.start()].rstrip() + "…"
+    return text
@@ -0,0 +1,144 @@
+"""
+Micro-batching queue for frame analysis
+
+Coalesces concurrent single-frame requests into one batch so the YOLO model
+runs once per batch instead of once per request.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many coroutines and processes them together
+
+    A batch is dispatched as soon as it reaches max_batch_size, or when
+    max_wait_ms has passed since the first item of the batch arrived.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        # Batch the dispatcher is still collecting (not yet handed to a task)
+        self._collecting: List[Tuple[Any, asyncio.Future]] = []
+
+        # Statistics
+        self.batches_processed = 0
+        self.items_processed = 0
+        self.largest_batch = 0
+
+    async def start(self):
+        """Start the background dispatcher"""
+        if self._dispatcher is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        """Stop the dispatcher and wait for in-flight batches"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # Fail the partly collected batch and anything still waiting in the queue
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """Queue a single item and wait for its result"""
+        if self._dispatcher is None:
+            raise RuntimeError("Batcher not started")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            "batches_processed": self.batches_processed,
+            "items_processed": self.items_processed,
+            "average_batch_size": (
+                round(self.items_processed / self.batches_processed, 2)
+                if self.batches_processed
+                else 0
+            ),
+            "largest_batch": self.largest_batch,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches_in_flight": len(self._inflight),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    async def _dispatch_loop(self):
+        while True:
+            # Block until the first item of the next batch arrives
+            batch = self._collecting = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            # Run the batch without blocking collection of the next one
+            self._collecting = []
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as exc:
+            logger.error(f"Batch processing error: {exc}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches_processed += 1
+        self.items_processed += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,107 @@
+"""
+ROI Tracking Benchmark
+Compares per-frame Haar face detection latency on a full frame against the
+padded region around the previous face (what ML_ROI_TRACKING does)
+
+Runs offline on any photo with one face; frames are resized to 640x480 and
+shifted by a few pixels per iteration to mimic a candidate moving slightly:
+
+    python benchmarks/roi_tracking.py --image face.jpg --frames 300
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from face_tracker import padded_roi  # noqa: E402
+from latency_stats import latency_summary  # noqa: E402
+
+DETECT_ARGS = {"scaleFactor": 1.1, "minNeighbors": 5, "minSize": (30, 30)}
+
+
+def _report(name: str, latencies: List[float], found: int) -> Dict:
+    return {
+        "mode": name,
+        "frames": len(latencies),
+        "frames_with_one_face": found,
+        **latency_summary(latencies),
+    }
+
+
+def make_frames(image: np.ndarray, count: int) -> List[np.ndarray]:
+    """Grayscale 640x480 frames with a small drifting offset"""
+    gray = cv2.cvtColor(cv2.resize(image, (640, 480)), cv2.COLOR_BGR2GRAY)
+    frames = []
+    for i in range(count):
+        dx, dy = int(6 * np.sin(i / 7)), int(4 * np.cos(i / 11))
+        shift = np.float32([[1, 0, dx], [0, 1, dy]])
+        frames.append(cv2.warpAffine(gray, shift, (640, 480), borderMode=cv2.BORDER_REPLICATE))
+    return frames
+
+
+def bench_full(cascade, frames: List[np.ndarray]) -> Dict:
+    latencies, found = [], 0
+    for gray in frames:
+        start = time.perf_counter()
+        faces = cascade.detectMultiScale(gray, **DETECT_ARGS)
+        latencies.append(time.perf_counter() - start)
+        found += len(faces) == 1
+    return _report("full_frame", latencies, found)
+
+
+def bench_roi(cascade, frames: List[np.ndarray], padding: float, refresh: int) -> Dict:
+    latencies, found = [], 0
+    box, since_full = None, 0
+    for gray in frames:
+        start = time.perf_counter()
+        faces = []
+        if box is not None and since_full + 1 < refresh:
+            x1, y1, x2, y2 = padded_roi(box, gray.shape, padding)
+            roi_faces = cascade.detectMultiScale(gray[y1:y2, x1:x2], **DETECT_ARGS)
+            if len(roi_faces) == 1:
+                x, y, w, h = roi_faces[0]
+                faces = [(x + x1, y + y1, w, h)]
+                since_full += 1
+        if not faces:
+            faces = cascade.detectMultiScale(gray, **DETECT_ARGS)
+            since_full = 0
+        latencies.append(time.perf_counter() - start)
+
+        box = [int(v) for v in faces[0]] if len(faces) == 1 else None
+        found += len(faces) == 1
+    return _report(f"roi (padding={padding}, refresh={refresh})", latencies, found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--image", required=True, help="Photo containing one face")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--padding", type=float, default=0.5)
+    parser.add_argument("--refresh", type=int, default=5)
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image)
+    if image is None:
+        sys.exit(f"Could not read {args.image}")
+
+    cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    )
+    frames = make_frames(image, args.frames)
+
+    full = bench_full(cascade, frames)
+    roi = bench_roi(cascade, frames, args.padding, args.refresh)
+    roi["speedup"] = f"{full['mean_ms'] / max(roi['mean_ms'], 1e-6):.1f}x"
+    print(json.dumps([full, roi], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+YOLO Backend Benchmark
+Compares throughput and p50/p99 latency of the PyTorch YOLO model against
+the ONNX Runtime export (FP32 and optionally INT8) on the same frames
+
+Runs offline; needs ultralytics plus the optional onnx and onnxruntime packages:
+
+    python benchmarks/yolo_backends.py --image frame.jpg --frames 200 --int8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from onnx_detector import load_onnx_detector  # noqa: E402
+from latency_stats import latency_summary  # noqa: E402
+from preprocessing import letterbox  # noqa: E402
+
+PREDICT_ARGS = {"classes": [67], "conf": 0.25, "iou": 0.7, "max_det": 10, "verbose": False}
+
+
+def bench(name: str, detector, frames: List[np.ndarray], imgsz: int, warmup: int = 5) -> Dict:
+    for frame in frames[:warmup]:
+        detector(frame, imgsz=imgsz, **PREDICT_ARGS)
+
+    latencies = []
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        detector(frame, imgsz=imgsz, **PREDICT_ARGS)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": name,
+        "frames": len(frames),
+        "fps": round(len(frames) / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--image", help="Frame to repeat (default: random noise frames)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--int8", action="store_true", help="Also benchmark the INT8 model")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = default)")
+    parser.add_argument("--cache-dir", default="models")
+    args = parser.parse_args()
+
+    if args.image:
+        image = cv2.imread(args.image)
+        if image is None:
+            sys.exit(f"Could not read {args.image}")
+        images = [image] * args.frames
+    else:
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 256, (480, 640, 3), np.uint8) for _ in range(args.frames)]
+
+    # Both backends get identical letterboxed inputs, as in the service
+    frames = [letterbox(image, args.imgsz)[0].copy() for image in images]
+
+    from ultralytics import YOLO
+
+    torch_model = YOLO(args.weights)
+    if args.threads > 0:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    results = [bench("torch", torch_model, frames, args.imgsz)]
+    for int8 in ([False, True] if args.int8 else [False]):
+        detector = load_onnx_detector(
+            lambda: YOLO(args.weights),
+            args.weights,
+            args.imgsz,
+            int8=int8,
+            cache_dir=args.cache_dir,
+            intra_threads=args.threads,
+            inter_threads=1,
+        )
+        results.append(bench("onnx-int8" if int8 else "onnx", detector, frames, args.imgsz))
+
+    baseline = results[0]["mean_ms"]
+    for result in results:
+        result["speedup"] = f"{baseline / max(result['mean_ms'], 1e-6):.2f}x"
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
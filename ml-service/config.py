@@ -0,0 +1,90 @@
+"""
+Configuration Management
+Loads environment variables and provides ML service settings
+"""
+
+import os
+from typing import List
+
+
+def _get_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_int_list(name: str, default: str) -> List[int]:
+    return [int(item) for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+class Settings:
+    """ML service settings loaded from environment variables"""
+
+    # Micro-batching: coalesce concurrent /ml/check_face calls into one YOLO batch
+    BATCH_ENABLED: bool = _get_bool("ML_BATCH_ENABLED", "true")
+    BATCH_MAX_SIZE: int = int(os.getenv("ML_BATCH_MAX_SIZE", "16"))
+    BATCH_MAX_WAIT_MS: float = float(os.getenv("ML_BATCH_MAX_WAIT_MS", "10"))
+
+    # Upper bound on frames accepted by /ml/check_faces_batch in one request
+    BATCH_ENDPOINT_MAX_FRAMES: int = int(
+        os.getenv("ML_BATCH_ENDPOINT_MAX_FRAMES", "64")
+    )
+
+    # Worker pool: "inline" (event loop), "thread" or "process"
+    EXECUTION_MODE: str = os.getenv("ML_EXECUTION_MODE", "thread")
+    # 0 = half the CPUs, at most 4 (each worker loads its own models)
+    WORKERS: int = int(os.getenv("ML_WORKERS", "0"))
+    MAX_QUEUE_DEPTH: int = int(os.getenv("ML_MAX_QUEUE_DEPTH", "64"))
+    # torch/OpenCV intra-op threads per worker (0 = library default, which
+    # oversubscribes the CPU once several workers run inference at once)
+    TORCH_THREADS: int = int(os.getenv("ML_TORCH_THREADS", "1"))
+
+    # Frame-difference gate: reuse the last result while an interview's frames
+    # stay within GATE_THRESHOLD (mean abs diff of a 32x24 gray thumbnail, 0-255)
+    GATE_ENABLED: bool = _get_bool("ML_GATE_ENABLED", "true")
+    GATE_THRESHOLD: float = float(os.getenv("ML_GATE_THRESHOLD", "4.0"))
+    # Force a fresh analysis after this many reused frames or seconds
+    GATE_REFRESH_FRAMES: int = int(os.getenv("ML_GATE_REFRESH_FRAMES", "10"))
+    GATE_REFRESH_SECONDS: float = float(os.getenv("ML_GATE_REFRESH_SECONDS", "15"))
+    GATE_MAX_SESSIONS: int = int(os.getenv("ML_GATE_MAX_SESSIONS", "10000"))
+
+    # Face ROI tracking: scan around each interview's last face box first
+    ROI_TRACKING: bool = _get_bool("ML_ROI_TRACKING", "true")
+    # Padding around the last box, as a fraction of its width/height per side
+    ROI_PADDING: float = float(os.getenv("ML_ROI_PADDING", "0.5"))
+    # Force a full-frame scan every N frames (catches faces outside the ROI)
+    ROI_REFRESH_FRAMES: int = int(os.getenv("ML_ROI_REFRESH_FRAMES", "5"))
+
+    # Preprocessing: JPEGs wider than this are shrunk while decoding (0 = off)
+    DECODE_MIN_WIDTH: int = int(os.getenv("ML_DECODE_MIN_WIDTH", "640"))
+    # Haar cascades run on a grayscale copy at most this wide (0 = full size)
+    CASCADE_WIDTH: int = int(os.getenv("ML_CASCADE_WIDTH", "320"))
+    # Smallest detectable face in uploaded-frame pixels; decoding and the
+    # cascade copy are never shrunk so far that such a face drops below the
+    # cascade's 24px window. The default of 48 (2x the window) is what lets
+    # 1280px JPEGs decode at half size and 640px frames scan at 320px; a
+    # webcam interview face is far larger, but set 24-30 to catch distant
+    # faces at the cost of full-size decoding and cascade scans
+    MIN_FACE_SIZE: int = int(os.getenv("ML_MIN_FACE_SIZE", "48"))
+    # YOLO input size; frames are letterboxed to imgsz x imgsz
+    YOLO_IMGSZ: int = int(os.getenv("ML_YOLO_IMGSZ", "640"))
+    # COCO classes YOLO keeps (67 = cell phone, add 0 to count people; empty = all)
+    YOLO_CLASSES: List[int] = _get_int_list("ML_YOLO_CLASSES", "67")
+    YOLO_CONF: float = float(os.getenv("ML_YOLO_CONF", "0.25"))
+    YOLO_IOU: float = float(os.getenv("ML_YOLO_IOU", "0.7"))
+    # FP16 inference (CUDA only; ignored on CPU)
+    YOLO_HALF: bool = _get_bool("ML_YOLO_HALF", "false")
+    YOLO_MAX_DET: int = int(os.getenv("ML_YOLO_MAX_DET", "10"))
+
+    # YOLO runtime: "torch" or "onnx" (ONNX Runtime CPU; needs onnx + onnxruntime)
+    YOLO_BACKEND: str = os.getenv("ML_YOLO_BACKEND", "torch")
+    # Dynamic INT8 quantization of the exported model
+    ONNX_INT8: bool = _get_bool("ML_ONNX_INT8", "false")
+    # Exported models are cached here and reused across restarts
+    ONNX_CACHE_DIR: str = os.getenv("ML_ONNX_CACHE_DIR", "models")
+    # ONNX Runtime threads per session (0 = runtime default, one per core;
+    # 1 avoids oversubscription when ML_WORKERS sessions run side by side)
+    ONNX_INTRA_THREADS: int = int(os.getenv("ML_ONNX_INTRA_THREADS", "1"))
+    ONNX_INTER_THREADS: int = int(os.getenv("ML_ONNX_INTER_THREADS", "1"))
+
+
+# Global settings instance
+settings = Settings()
@@ -0,0 +1,95 @@
+"""
+Face region-of-interest tracking
+
+A full-frame Haar scan is the most expensive step after YOLO. Between frames
+of the same interview the face barely moves, so the parent process remembers
+each interview's last face box and sends it with the next frame as a hint;
+the worker scans a padded region around it first and falls back to the full
+frame when the face is lost. A full scan is also forced periodically so a
+second face appearing elsewhere in the frame is not missed for long.
+
+State lives in the parent because workers may be separate processes; a
+stateful OpenCV tracker object cannot be shared across the process pool, so
+tracking is done by re-detecting inside the ROI instead.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# (x, y, w, h) in full-frame pixels
+Box = List[int]
+
+
+def padded_roi(box: Box, frame_shape: Tuple[int, ...], padding: float) -> Tuple[int, int, int, int]:
+    """Grow a face box by padding * its size on every side, clipped to the frame"""
+    x, y, w, h = box
+    frame_h, frame_w = frame_shape[:2]
+    pad_x, pad_y = int(w * padding), int(h * padding)
+    x1, y1 = max(0, x - pad_x), max(0, y - pad_y)
+    x2, y2 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+    return x1, y1, x2, y2
+
+
+class FaceTracker:
+    """
+    Last face box per interview, handed out as a hint for the next frame
+
+    Hints are withheld every refresh_frames frames (forcing a full scan) and
+    whenever the last analysis did not find exactly one face. State is held
+    for at most max_sessions interviews, least recently used dropped first.
+    """
+
+    def __init__(self, refresh_frames: int = 10, max_sessions: int = 10000):
+        self.refresh_frames = max(1, refresh_frames)
+        self.max_sessions = max(1, max_sessions)
+
+        # interview_id -> [box, frames since last full scan]
+        self._sessions: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hints = 0
+        self.full_scans = 0
+        self.roi_hits = 0
+        self.roi_misses = 0
+
+    def hint(self, session_id: str) -> Optional[Box]:
+        """Face box to search first for the session's next frame (None = full scan)"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or state[0] is None or state[1] + 1 >= self.refresh_frames:
+                self.full_scans += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            self.hints += 1
+            return state[0]
+
+    def update(self, session_id: str, result: Dict[str, Any], hinted: bool):
+        """Record the face box (if any) found in the session's latest frame"""
+        analysis = result.get("analysis", {})
+        box = analysis.get("face_box")
+        with self._lock:
+            if hinted:
+                if analysis.get("roi_used"):
+                    self.roi_hits += 1
+                else:
+                    self.roi_misses += 1
+            state = self._sessions.pop(session_id, None)
+            frames = state[1] + 1 if state is not None and analysis.get("roi_used") else 0
+            self._sessions[session_id] = [box, frames]
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracker statistics"""
+        hinted = self.roi_hits + self.roi_misses
+        return {
+            "sessions": len(self._sessions),
+            "hints": self.hints,
+            "full_scans": self.full_scans,
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "roi_hit_rate": round(self.roi_hits / hinted, 3) if hinted else 0,
+            "refresh_frames": self.refresh_frames,
+        }
@@ -0,0 +1,140 @@
+"""
+Frame-difference gate
+
+Webcam frames of a candidate sitting still are nearly identical, so running
+the full Haar + YOLO analysis on each of them repeats the same work. The gate
+keeps a tiny grayscale signature of the last analyzed frame per interview and
+reuses that frame's result while new frames stay within a difference threshold,
+forcing a fresh analysis every N frames or seconds.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Signature size (width, height); small enough to compare in microseconds
+SIGNATURE_SIZE = (32, 24)
+
+
+def frame_signature(image_bytes: bytes) -> Optional[np.ndarray]:
+    """
+    Cheap grayscale thumbnail of an encoded frame
+
+    JPEG frames are decoded at 1/8 scale (the decoder skips most of the
+    work), then shrunk to SIGNATURE_SIZE. Returns None if decoding fails.
+    """
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    small = cv2.imdecode(nparr, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if small is None:
+        return None
+    return cv2.resize(small, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def frame_difference(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute pixel difference between two signatures (0-255)"""
+    return float(cv2.absdiff(a, b).mean())
+
+
+class _SessionState:
+    __slots__ = ("signature", "result", "analyzed_at", "frames_since_refresh")
+
+    def __init__(self, signature: np.ndarray, result: Dict[str, Any]):
+        self.signature = signature
+        self.result = result
+        self.analyzed_at = time.monotonic()
+        self.frames_since_refresh = 0
+
+
+class FrameGate:
+    """
+    Per-interview similarity gate in front of frame analysis
+
+    State is held for at most max_sessions interviews (least recently used
+    are dropped), so abandoned interviews cost nothing beyond that bound.
+    The signature is compared against the last *analyzed* frame, not the
+    last received one, so slow drift still triggers a fresh analysis.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 4.0,
+        refresh_frames: int = 10,
+        refresh_seconds: float = 15.0,
+        max_sessions: int = 10000,
+    ):
+        self.threshold = threshold
+        self.refresh_frames = refresh_frames
+        self.refresh_seconds = refresh_seconds
+        self.max_sessions = max(1, max_sessions)
+
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.frames = 0
+        self.skipped = 0
+        self.forced_refreshes = 0
+        self.evictions = 0
+
+    def lookup(
+        self, session_id: str, signature: Optional[np.ndarray]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the previous result for a session if this frame is similar
+        enough to reuse it, else None (the caller analyzes and calls store())
+        """
+        with self._lock:
+            self.frames += 1
+            state = self._sessions.get(session_id)
+            if state is None or signature is None:
+                return None
+            self._sessions.move_to_end(session_id)
+
+            if (
+                state.frames_since_refresh + 1 >= self.refresh_frames
+                or time.monotonic() - state.analyzed_at >= self.refresh_seconds
+            ):
+                self.forced_refreshes += 1
+                return None
+            if state.signature.shape != signature.shape:
+                return None
+            if frame_difference(state.signature, signature) > self.threshold:
+                return None
+
+            state.frames_since_refresh += 1
+            self.skipped += 1
+            return state.result
+
+    def store(
+        self, session_id: str, signature: Optional[np.ndarray], result: Dict[str, Any]
+    ):
+        """Remember a freshly analyzed frame as the session's reference"""
+        if signature is None:
+            return
+        with self._lock:
+            self._sessions[session_id] = _SessionState(signature, result)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get gate statistics"""
+        return {
+            "sessions": len(self._sessions),
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.frames, 3) if self.frames else 0,
+            "forced_refreshes": self.forced_refreshes,
+            "evictions": self.evictions,
+            "threshold": self.threshold,
+            "refresh_frames": self.refresh_frames,
+            "refresh_seconds": self.refresh_seconds,
+        }
@@ -1,13 +1,25 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import time
+
+# Measured first so startup timings include the import stage
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, File, Form, Header, Request, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import cv2
 import numpy as np
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 import logging
+import threading
 from datetime import datetime
-from ultralytics import YOLO
-import torch
+from batching import MicroBatcher
+from config import settings
+from face_tracker import FaceTracker, padded_roi
+from frame_gate import FrameGate, frame_signature
+from onnx_detector import OnnxDetector, load_onnx_detector
+from preprocessing import CASCADE_WINDOW, cascade_gray, decode_frame, letterbox
+from worker_pool import InferenceWorkerPool, PoolSaturatedError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,10 +40,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load models
-try:
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+
+def load_yolo_model():
+    """Load the YOLO detector, allowlisting ultralytics classes for torch.load."""
+    # Imported here so the service can start (and answer /health) before torch loads
+    import torch
+    from ultralytics import YOLO
+
     # YOLO weights may be a checkpoint that requires allowing the ultralytics DetectionModel
     # class in torch's safe globals (PyTorch 2.6+ changed torch.load behavior).
     # Prefer using the safe_globals context manager for a minimal allowlist scope.
@@ -63,162 +78,493 @@ try:
     except Exception as _e:
         # If allowlisting or model load fails, log a helpful message and re-raise
         logger.warning(f"Could not apply safe_globals/add_safe_globals for ultralytics: {_e}")
-        # Attempt a normal load as a final fallback. If this raises, it will be
-        # caught by the outer exception handler and the service will mark models as None.
+        # Attempt a normal load as a final fallback. If this raises, the caller
+        # decides how to degrade (the service marks models as None).
         try:
             model = YOLO('yolov8n.pt')
         except Exception as final_e:
             raise final_e
-    logger.info("OpenCV & YOLO models loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load models: {e}")
-    face_cascade = None
-    eye_cascade = None
-    model = None
+    return model
+
 
+def load_detector():
+    """
+    Load the phone detector for the configured backend.
+
+    With ML_YOLO_BACKEND=onnx the model is served by ONNX Runtime from a cached
+    export (created from the PyTorch weights on first use); if that fails the
+    PyTorch model is used instead.
+    """
+    if settings.YOLO_BACKEND == "onnx":
+        try:
+            return load_onnx_detector(
+                load_yolo_model,
+                'yolov8n.pt',
+                settings.YOLO_IMGSZ,
+                int8=settings.ONNX_INT8,
+                cache_dir=settings.ONNX_CACHE_DIR,
+                intra_threads=settings.ONNX_INTRA_THREADS,
+                inter_threads=settings.ONNX_INTER_THREADS,
+            )
+        except Exception as e:
+            logger.warning(f"ONNX Runtime backend unavailable, using PyTorch: {e}")
+    return load_yolo_model()
 
-def detect_mobile_device(image: np.ndarray) -> Dict:
-    """Detects mobile phones using YOLO model."""
+
+def _timed(timings: Optional[Dict[str, float]], stage: str, fn: Callable, *args):
+    """Run fn(*args), recording its duration in ms under timings[stage]"""
+    start = time.perf_counter()
     try:
-        if model is None:
-            return {"detected": False, "reason": "Model not loaded"}
+        return fn(*args)
+    finally:
+        if timings is not None:
+            timings[stage] = round((time.perf_counter() - start) * 1000, 1)
 
-        results = model(image)
-        
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                class_id = int(box.cls[0])
-                # class 67 is 'cell phone' in COCO dataset
-                if class_id == 67:
-                    x1, y1, x2, y2 = box.xyxy[0]
-                    return {
-                        "detected": True,
-                        "bounding_box": [int(x1), int(y1), int(x2 - x1), int(y2 - y1)],
-                        "confidence": float(box.conf[0])
-                    }
-        
+
+def _load_cascades():
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+    return face_cascade, eye_cascade
+
+
+def load_models(timings: Optional[Dict[str, float]] = None):
+    """
+    Load Haar cascades and the YOLO model. Returns (face_cascade, eye_cascade, model).
+    
+    With a timings dict, per-stage load times (ms) are recorded in it.
+    """
+    face_cascade, eye_cascade = _timed(timings, "haar_cascades", _load_cascades)
+    model = _timed(timings, "detector", load_detector)
+    return face_cascade, eye_cascade, model
+
+
+# Models are loaded in the background after startup (see load_models_in_background),
+# so the process answers liveness checks immediately
+face_cascade = None
+eye_cascade = None
+model = None
+
+# Model lifecycle: state is "loading", "ready" or "failed"; timings are in ms
+model_status: Dict = {"state": "loading", "error": None, "timings": {}}
+
+# Models owned by the current pool worker (see init_worker)
+_worker_state = threading.local()
+
+
+def init_worker():
+    """
+    Give each inference pool worker its own detector models.
+
+    Thread and process workers each load a fresh set, so YOLO is never shared
+    across threads and process workers do not depend on the parent's copy.
+    """
+    if settings.TORCH_THREADS > 0:
+        cv2.setNumThreads(settings.TORCH_THREADS)
+        try:
+            import torch
+            torch.set_num_threads(settings.TORCH_THREADS)
+        except ImportError:
+            pass
+
+    try:
+        _worker_state.models = load_models()
+    except Exception as e:
+        logger.error(f"Worker model load failed, using shared models: {e}")
+        _worker_state.models = (face_cascade, eye_cascade, model)
+
+
+def _get_models():
+    """Return the models owned by the calling worker, or the module-level ones."""
+    return getattr(_worker_state, "models", None) or (face_cascade, eye_cascade, model)
+
+
+# COCO class ids
+PHONE_CLASS = 67  # 'cell phone'
+PERSON_CLASS = 0
+
+# Keyword arguments for every YOLO call
+YOLO_PREDICT_ARGS = {
+    "imgsz": settings.YOLO_IMGSZ,
+    "classes": settings.YOLO_CLASSES or None,
+    "conf": settings.YOLO_CONF,
+    "iou": settings.YOLO_IOU,
+    "half": settings.YOLO_HALF,
+    "max_det": settings.YOLO_MAX_DET,
+    "verbose": False,
+}
+
+
+def _to_numpy(values) -> np.ndarray:
+    """Detection fields as numpy (torch tensors from PyTorch, arrays from ONNX Runtime)"""
+    return values.cpu().numpy() if hasattr(values, "cpu") else np.asarray(values)
+
+
+def _parse_mobile_result(result, scale: float = 1.0, pad=(0, 0)) -> Dict:
+    """
+    Extract cell phone detections from a single YOLO result.
+    
+    All phones are returned under "phones" (best first); bounding_box and
+    confidence describe the best one. Boxes are mapped back from the
+    letterboxed model input with (p - pad) / scale, so they are in
+    uploaded-frame pixels.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
         return {"detected": False}
+
+    # Filter on the whole tensors at once instead of per box
+    class_ids = _to_numpy(boxes.cls)
+    detection: Dict = {"detected": False}
+    if PERSON_CLASS in (settings.YOLO_CLASSES or ()):
+        detection["person_count"] = int((class_ids == PERSON_CLASS).sum())
+
+    is_phone = class_ids == PHONE_CLASS
+    if not is_phone.any():
+        return detection
+
+    confidences = _to_numpy(boxes.conf)[is_phone]
+    xyxy = _to_numpy(boxes.xyxy)[is_phone]
+    xyxy[:, [0, 2]] = (xyxy[:, [0, 2]] - pad[0]) / scale
+    xyxy[:, [1, 3]] = (xyxy[:, [1, 3]] - pad[1]) / scale
+
+    phones = [
+        {
+            "bounding_box": [int(x1), int(y1), int(x2 - x1), int(y2 - y1)],
+            "confidence": float(confidence)
+        }
+        for (x1, y1, x2, y2), confidence in sorted(
+            zip(xyxy.tolist(), confidences.tolist()), key=lambda item: -item[1]
+        )
+    ]
+    detection.update(
+        detected=True,
+        bounding_box=phones[0]["bounding_box"],
+        confidence=phones[0]["confidence"],
+        count=len(phones),
+        phones=phones,
+    )
+    return detection
+
+
+def detect_mobile_devices_batch(images: List[np.ndarray], reductions: Optional[List[int]] = None) -> List[Dict]:
+    """Detects mobile phones in several frames with a single YOLO call."""
+    if not images:
+        return []
+    reductions = reductions or [1] * len(images)
+    try:
+        _, _, yolo_model = _get_models()
+        if yolo_model is None:
+            return [{"detected": False, "reason": "Model not loaded"} for _ in images]
+
+        # Each frame gets its own canvas buffer (slot) so the batch can be built up front
+        inputs = [letterbox(img, settings.YOLO_IMGSZ, slot) for slot, img in enumerate(images)]
+        results = yolo_model([canvas for canvas, _, _ in inputs], **YOLO_PREDICT_ARGS)
+        return [
+            _parse_mobile_result(result, scale / reduction, pad)
+            for result, (_, scale, pad), reduction in zip(results, inputs, reductions)
+        ]
     except Exception as exc:
-        logger.error(f"Mobile detection error: {exc}")
-        return {"detected": False}
+        logger.error(f"Batch mobile detection error: {exc}")
+        return [{"detected": False} for _ in images]
 
 
-def analyze_image(image_bytes: bytes) -> Dict:
+def decode_image(image_bytes: bytes):
     """
-    Analyze webcam image for cheating indicators:
-    - Multiple faces detected
-    - No face detected
-    - Face position/orientation
-    - Eye gaze detection (basic)
+    Decode encoded image bytes (JPG, PNG, etc.) into a BGR array.
+    
+    Large JPEGs are shrunk while decoding (down to ML_DECODE_MIN_WIDTH, and
+    only as far as keeps an ML_MIN_FACE_SIZE face detectable).
+    Returns (img, reduction): one img pixel spans reduction uploaded pixels.
     """
-    try:
-        # Convert bytes to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if img is None:
-            raise ValueError("Failed to decode image")
-        
-        # Convert to grayscale for face detection
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Detect faces
-        faces = face_cascade.detectMultiScale(
+    max_reduction = max(1, settings.MIN_FACE_SIZE // CASCADE_WINDOW)
+    return decode_frame(image_bytes, settings.DECODE_MIN_WIDTH, max_reduction)
+
+
+def detect_faces(face_detector, gray: np.ndarray, face_hint: Optional[List[int]] = None, scale: float = 1.0):
+    """
+    Detect faces in a grayscale frame. Returns (faces, roi_used).
+    
+    scale is gray pixels per uploaded-frame pixel; face_hint and the returned
+    faces are in uploaded-frame pixels.
+    
+    With a hint box (the face found in the previous frame), only the padded
+    region around it is scanned; that result is used when it holds exactly
+    one face, otherwise the whole frame is scanned.
+    """
+    # ML_MIN_FACE_SIZE in uploaded pixels (callers keep scale high enough
+    # for that to span the cascade window)
+    min_side = max(CASCADE_WINDOW, round(settings.MIN_FACE_SIZE * scale))
+    
+    faces, roi_used = [], False
+    if face_hint is not None:
+        hint = [round(v * scale) for v in face_hint]
+        x1, y1, x2, y2 = padded_roi(hint, gray.shape, settings.ROI_PADDING)
+        roi_faces = face_detector.detectMultiScale(
+            gray[y1:y2, x1:x2],
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_side, min_side)
+        )
+        if len(roi_faces) == 1:
+            x, y, w, h = roi_faces[0]
+            faces, roi_used = [(x + x1, y + y1, w, h)], True
+
+    if not roi_used:
+        faces = face_detector.detectMultiScale(
             gray,
             scaleFactor=1.1,
             minNeighbors=5,
-            minSize=(30, 30)
+            minSize=(min_side, min_side)
         )
+    return [tuple(round(v / scale) for v in face) for face in faces], roi_used
+
+
+def build_analysis(img: np.ndarray, mobile_detection: Dict, face_hint: Optional[List[int]] = None, reduction: int = 1) -> Dict:
+    """
+    Run face/eye checks on a decoded frame and combine them with the
+    mobile detection result into the /ml/check_face response schema.
+    """
+    face_detector, eye_detector, _ = _get_models()
+
+    # Downscaled grayscale for face detection, keeping ML_MIN_FACE_SIZE faces
+    # at least CASCADE_WINDOW pixels wide
+    min_scale = CASCADE_WINDOW * reduction / max(settings.MIN_FACE_SIZE, 1)
+    gray, gray_scale = cascade_gray(img, settings.CASCADE_WIDTH, min_scale)
+    
+    # Detect faces (around the previous face first when a hint is given)
+    faces, roi_used = detect_faces(face_detector, gray, face_hint, gray_scale / reduction)
+    
+    num_faces = len(faces)
+    face_box = None
+    cheating_score = 0
+    severity = "low"
+    issues = []
+
+    if mobile_detection.get("detected"):
+        cheating_score = max(cheating_score, 85)
+        severity = "critical"
+        issues.append("Possible mobile phone detected in frame")
+    
+    # Check face count
+    if num_faces == 0:
+        cheating_score = 70
+        severity = "high"
+        issues.append("No face detected")
+    elif num_faces > 1:
+        cheating_score = 90
+        severity = "critical"
+        issues.append(f"Multiple faces detected ({num_faces})")
+    else:
+        # Analyze single face
+        (x, y, w, h) = faces[0]
+        face_box = [int(x), int(y), int(w), int(h)]
         
-        num_faces = len(faces)
-        cheating_score = 0
-        severity = "low"
-        issues = []
-
-        mobile_detection = detect_mobile_device(img)
-        if mobile_detection.get("detected"):
-            cheating_score = max(cheating_score, 85)
-            severity = "critical"
-            issues.append("Possible mobile phone detected in frame")
+        # Check face position (should be centered), in uploaded-frame pixels
+        img_height, img_width = img.shape[0] * reduction, img.shape[1] * reduction
+        face_center_x = x + w // 2
+        face_center_y = y + h // 2
+        img_center_x = img_width // 2
+        img_center_y = img_height // 2
         
-        # Check face count
-        if num_faces == 0:
-            cheating_score = 70
-            severity = "high"
-            issues.append("No face detected")
-        elif num_faces > 1:
-            cheating_score = 90
-            severity = "critical"
-            issues.append(f"Multiple faces detected ({num_faces})")
-        else:
-            # Analyze single face
-            (x, y, w, h) = faces[0]
-            
-            # Check face position (should be centered)
-            img_height, img_width = img.shape[:2]
-            face_center_x = x + w // 2
-            face_center_y = y + h // 2
-            img_center_x = img_width // 2
-            img_center_y = img_height // 2
-            
-            # Calculate offset from center (normalized)
-            offset_x = abs(face_center_x - img_center_x) / img_width
-            offset_y = abs(face_center_y - img_center_y) / img_height
-            
-            if offset_x > 0.3 or offset_y > 0.3:
-                cheating_score += 30
-                issues.append("Face not centered - possible looking away")
-            
-            # Check face size (too small = far away, too large = too close)
-            face_area_ratio = (w * h) / (img_width * img_height)
-            if face_area_ratio < 0.05:
-                cheating_score += 25
-                issues.append("Face too small - person too far")
-            elif face_area_ratio > 0.5:
-                cheating_score += 15
-                issues.append("Face too close to camera")
-            
-            # Detect eyes within face region
-            roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(roi_gray)
-            
-            if len(eyes) < 2:
-                cheating_score += 5
-                issues.append("Eyes not clearly visible - possible gaze away")
-            
-            # Determine severity based on score
-            if severity != "critical":
-                if cheating_score >= 60:
-                    severity = "high"
-                elif cheating_score >= 40:
-                    severity = "medium"
-                else:
-                    severity = "low"
+        # Calculate offset from center (normalized)
+        offset_x = abs(face_center_x - img_center_x) / img_width
+        offset_y = abs(face_center_y - img_center_y) / img_height
         
-        # Build response
-        result = {
-            "success": True,
-            "cheating_score": min(cheating_score, 100),
-            "severity": severity,
-            "num_faces": int(num_faces),
-            "issues": issues,
-            "message": " | ".join(issues) if issues else "No significant issues detected",
-            "timestamp": datetime.now().isoformat(),
-            "analysis": {
-                "faces_detected": int(num_faces),
-                "optimal_condition": num_faces == 1 and cheating_score < 30,
-                "mobile_detection": mobile_detection
-            }
+        if offset_x > 0.3 or offset_y > 0.3:
+            cheating_score += 30
+            issues.append("Face not centered - possible looking away")
+        
+        # Check face size (too small = far away, too large = too close)
+        face_area_ratio = (w * h) / (img_width * img_height)
+        if face_area_ratio < 0.05:
+            cheating_score += 25
+            issues.append("Face too small - person too far")
+        elif face_area_ratio > 0.5:
+            cheating_score += 15
+            issues.append("Face too close to camera")
+        
+        # Detect eyes within face region (decoded resolution: eyes are small)
+        fx, fy, fw, fh = (v // reduction for v in (x, y, w, h))
+        roi_gray = cv2.cvtColor(img[fy:fy+fh, fx:fx+fw], cv2.COLOR_BGR2GRAY)
+        eyes = eye_detector.detectMultiScale(roi_gray)
+        
+        if len(eyes) < 2:
+            cheating_score += 5
+            issues.append("Eyes not clearly visible - possible gaze away")
+        
+        # Determine severity based on score
+        if severity != "critical":
+            if cheating_score >= 60:
+                severity = "high"
+            elif cheating_score >= 40:
+                severity = "medium"
+            else:
+                severity = "low"
+    
+    # Build response
+    result = {
+        "success": True,
+        "cheating_score": min(cheating_score, 100),
+        "severity": severity,
+        "num_faces": int(num_faces),
+        "issues": issues,
+        "message": " | ".join(issues) if issues else "No significant issues detected",
+        "timestamp": datetime.now().isoformat(),
+        "analysis": {
+            "faces_detected": int(num_faces),
+            "optimal_condition": num_faces == 1 and cheating_score < 30,
+            "mobile_detection": mobile_detection,
+            "face_box": face_box,
+            "roi_used": roi_used
         }
+    }
+
+    result["mobile_detected"] = mobile_detection.get("detected", False)
+    
+    return result
+
+
+def analyze_images_batch(images: List[bytes], face_hints: Optional[List[Optional[List[int]]]] = None) -> List[Dict]:
+    """
+    Analyze several webcam frames at once.
+
+    Frames are decoded individually, YOLO runs once over the whole batch,
+    and each entry of the returned list follows the /ml/check_face schema.
+    Frames that cannot be analyzed yield {"success": False, "error": ...}
+    instead of failing the whole batch. face_hints optionally gives, per
+    frame, the face box to search first (see detect_faces).
+    """
+    face_hints = face_hints or [None] * len(images)
+    results: List[Optional[Dict]] = [None] * len(images)
+    decoded = []
+
+    for index, image_bytes in enumerate(images):
+        try:
+            decoded.append((index, *decode_image(image_bytes)))
+        except Exception as e:
+            logger.error(f"Image decode error (batch index {index}): {e}")
+            results[index] = {"success": False, "error": f"Image analysis failed: {str(e)}"}
+
+    mobile_detections = detect_mobile_devices_batch(
+        [img for _, img, _ in decoded], [reduction for _, _, reduction in decoded]
+    )
+
+    for (index, img, reduction), mobile_detection in zip(decoded, mobile_detections):
+        try:
+            results[index] = build_analysis(img, mobile_detection, face_hints[index], reduction)
+        except Exception as e:
+            logger.error(f"Image analysis error (batch index {index}): {e}")
+            results[index] = {"success": False, "error": f"Image analysis failed: {str(e)}"}
+
+    return results
+
+
+# Runs frame analysis off the event loop
+inference_pool = InferenceWorkerPool(
+    mode=settings.EXECUTION_MODE,
+    max_workers=settings.WORKERS,
+    max_queue_depth=settings.MAX_QUEUE_DEPTH,
+    initializer=init_worker,
+)
+
+
+async def _run_analysis_batch(items: List[tuple]) -> List[Dict]:
+    # Items are (image_bytes, face_hint) pairs
+    images = [image_bytes for image_bytes, _ in items]
+    face_hints = [face_hint for _, face_hint in items]
+    return await inference_pool.submit(analyze_images_batch, images, face_hints)
+
+
+# Coalesces concurrent /ml/check_face requests into YOLO batches
+batcher = MicroBatcher(
+    _run_analysis_batch,
+    max_batch_size=settings.BATCH_MAX_SIZE,
+    max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+)
+
+
+# Reuses the previous result for frames that barely changed (per interview)
+frame_gate = FrameGate(
+    threshold=settings.GATE_THRESHOLD,
+    refresh_frames=settings.GATE_REFRESH_FRAMES,
+    refresh_seconds=settings.GATE_REFRESH_SECONDS,
+    max_sessions=settings.GATE_MAX_SESSIONS,
+)
+
+# Remembers each interview's face box so the next frame scans around it first
+face_tracker = FaceTracker(
+    refresh_frames=settings.ROI_REFRESH_FRAMES,
+    max_sessions=settings.GATE_MAX_SESSIONS,
+)
+
+
+def warm_up() -> bool:
+    """
+    Run the full analysis once on a synthetic frame.
+    
+    The first inference pays for lazy initialisation (kernel selection, memory
+    pools, cascade buffers); doing it here keeps that off the first real frame.
+    Runs on whichever thread or worker process calls it.
+    """
+    frame = np.zeros((480, 640, 3), np.uint8)
+    frame[:] = np.linspace(0, 255, 640, dtype=np.uint8)[None, :, None]
+    ok, encoded = cv2.imencode('.jpg', frame)
+    if not ok:
+        return False
+    return bool(analyze_images_batch([encoded.tobytes()])[0].get("success"))
 
-        result["mobile_detected"] = mobile_detection.get("detected", False)
+
+async def load_models_in_background():
+    """Load and warm up the parent's models, then the pool workers', and mark the service ready"""
+    global face_cascade, eye_cascade, model
+    timings = model_status["timings"]
+    started = time.perf_counter()
+    try:
+        face_cascade, eye_cascade, model = await asyncio.to_thread(load_models, timings)
+        logger.info("OpenCV & YOLO models loaded successfully")
+        await asyncio.to_thread(_timed, timings, "warmup", warm_up)
         
-        return result
+        if inference_pool.mode != "inline":
+            # One task per worker so every worker loads and warms its models now
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(inference_pool.submit(warm_up) for _ in range(inference_pool.max_workers)),
+                return_exceptions=True,
+            )
+            timings["worker_warmup"] = round((time.perf_counter() - start) * 1000, 1)
         
+        model_status["state"] = "ready"
     except Exception as e:
-        logger.error(f"Image analysis error: {e}")
-        raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
+        logger.error(f"Failed to load models: {e}")
+        model_status["state"] = "failed"
+        model_status["error"] = str(e)
+    
+    timings["models_total"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Model startup {model_status['state']}: {timings}")
+
+
+@app.middleware("http")
+async def report_inference_load(request: Request, call_next):
+    """Tell callers how busy the inference pool is, so they can back off before it saturates"""
+    response = await call_next(request)
+    response.headers["X-Inference-Load"] = f"{inference_pool.load:.3f}"
+    return response
+
+
+@app.on_event("startup")
+async def start_workers():
+    # Imports and module setup, up to the point the server starts the app
+    model_status["timings"]["module_import"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    inference_pool.start()
+    if settings.BATCH_ENABLED:
+        await batcher.start()
+    model_status["task"] = asyncio.create_task(load_models_in_background())
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await batcher.stop()
+    inference_pool.shutdown()
 
 
 @app.get("/")
@@ -232,24 +578,96 @@ async def root():
     }
 
 
+def models_ready() -> bool:
+    return model_status["state"] == "ready"
+
+
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check (liveness: answers while models are still loading)"""
     models_loaded = face_cascade is not None and eye_cascade is not None
+    status = {"ready": "healthy", "loading": "loading"}.get(model_status["state"], "degraded")
     return {
-        "status": "healthy" if models_loaded else "degraded",
+        "status": status,
+        "ready": models_ready(),
         "models_loaded": models_loaded,
+        "startup": {
+            "state": model_status["state"],
+            "error": model_status["error"],
+            "timings_ms": model_status["timings"],
+        },
+        "yolo_backend": "onnx" if isinstance(model, OnnxDetector) else "torch",
+        "batching": batcher.get_stats() if settings.BATCH_ENABLED else None,
+        "inference_pool": inference_pool.get_stats(),
+        "frame_gate": frame_gate.get_stats() if settings.GATE_ENABLED else None,
+        "face_tracker": face_tracker.get_stats() if settings.ROI_TRACKING else None,
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 200 once models are loaded and warmed up, 503 before (or on failure)"""
+    body = {"ready": models_ready(), "state": model_status["state"]}
+    return JSONResponse(content=body, status_code=200 if body["ready"] else 503)
+
+
+async def analyze_frame_bytes(image_bytes: bytes, interview_id: Optional[str] = None) -> Dict:
+    """
+    Analyze one encoded frame on the worker pool (coalesced with concurrent
+    requests when batching is on). Raises HTTPException on failure.
+    
+    With an interview_id and the frame gate on, a frame that barely differs
+    from that interview's last analyzed frame reuses its result (reused=True).
+    With ROI tracking on, the face search starts around the interview's last face.
+    """
+    # Check model availability
+    if not models_ready():
+        raise HTTPException(status_code=503, detail="ML models not loaded", headers={"Retry-After": "5"})
+    
+    if len(image_bytes) == 0:
+        raise HTTPException(status_code=400, detail="Empty image file")
+    
+    signature = None
+    if settings.GATE_ENABLED and interview_id:
+        signature = frame_signature(image_bytes)
+        previous = frame_gate.lookup(interview_id, signature)
+        if previous is not None:
+            return {**previous, "reused": True, "timestamp": datetime.now().isoformat()}
+    
+    face_hint = None
+    if settings.ROI_TRACKING and interview_id:
+        face_hint = face_tracker.hint(interview_id)
+    
+    try:
+        if settings.BATCH_ENABLED:
+            result = await batcher.submit((image_bytes, face_hint))
+        else:
+            result = (await inference_pool.submit(analyze_images_batch, [image_bytes], [face_hint]))[0]
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=result.get("error", "Image analysis failed"))
+    
+    if signature is not None:
+        frame_gate.store(interview_id, signature, result)
+    if settings.ROI_TRACKING and interview_id:
+        face_tracker.update(interview_id, result, face_hint is not None)
+    
+    logger.info(f"Image analyzed - Score: {result['cheating_score']}, Faces: {result['num_faces']}")
+    
+    return result
+
+
 @app.post("/ml/check_face")
-async def check_face(image: UploadFile = File(...)):
+async def check_face(image: UploadFile = File(...), interview_id: Optional[str] = Form(None)):
     """
     Analyze webcam image for cheating detection
     
     Parameters:
     - image: Uploaded image file (JPG, PNG, etc.)
+    - interview_id: Optional; enables the frame-difference gate for the frame
     
     Returns:
     - cheating_score: 0-100 score indicating likelihood of cheating
@@ -263,20 +681,39 @@ async def check_face(image: UploadFile = File(...)):
         if not image.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        # Check model availability
-        if face_cascade is None or eye_cascade is None:
-            raise HTTPException(status_code=503, detail="ML models not loaded")
-        
         # Read image bytes
         image_bytes = await image.read()
         
-        if len(image_bytes) == 0:
-            raise HTTPException(status_code=400, detail="Empty image file")
+        result = await analyze_frame_bytes(image_bytes, interview_id)
         
-        # Analyze image
-        result = analyze_image(image_bytes)
+        return JSONResponse(content=result)
         
-        logger.info(f"Image analyzed - Score: {result['cheating_score']}, Faces: {result['num_faces']}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Endpoint error: {e}")
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+
+@app.post("/ml/check_face_raw")
+async def check_face_raw(request: Request, x_interview_id: Optional[str] = Header(None)):
+    """
+    Analyze a webcam frame sent as the raw request body
+    
+    Same response as /ml/check_face, but the encoded image is the body itself
+    (Content-Type: image/* or application/octet-stream), so callers can forward
+    frames without building a multipart payload.
+    
+    An X-Interview-Id header enables the frame-difference gate for the frame.
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        if not (content_type.startswith("image/") or content_type.startswith("application/octet-stream")):
+            raise HTTPException(status_code=415, detail="Body must be an image or application/octet-stream")
+        
+        image_bytes = await request.body()
+        
+        result = await analyze_frame_bytes(image_bytes, x_interview_id)
         
         return JSONResponse(content=result)
         
@@ -287,6 +724,102 @@ async def check_face(image: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 
+@app.websocket("/ml/stream")
+async def stream_frames(websocket: WebSocket, interview_id: Optional[str] = None):
+    """
+    Long-lived frame stream (used by the backend to avoid per-frame HTTP requests)
+    
+    Each binary message is one encoded frame and is answered, in order, with a
+    JSON message using the /ml/check_face schema, or
+    {"success": false, "error": ..., "status_code": ...} on failure. Every
+    reply carries inference_load (the X-Inference-Load header of HTTP calls).
+    
+    An interview_id query parameter enables the frame-difference gate.
+    """
+    await websocket.accept()
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            image_bytes = message.get("bytes")
+            if image_bytes is None:
+                await websocket.send_json({"success": False, "error": "Frames must be binary", "status_code": 400})
+                continue
+            
+            try:
+                result = await analyze_frame_bytes(image_bytes, interview_id)
+            except HTTPException as e:
+                result = {"success": False, "error": e.detail, "status_code": e.status_code}
+            except Exception as e:
+                logger.error(f"Stream error: {e}")
+                result = {"success": False, "error": f"Processing failed: {str(e)}", "status_code": 500}
+            
+            await websocket.send_json({**result, "inference_load": round(inference_pool.load, 3)})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.post("/ml/check_faces_batch")
+async def check_faces_batch(
+    images: List[UploadFile] = File(...),
+    interview_ids: Optional[List[str]] = Form(None)
+):
+    """
+    Analyze several webcam frames (possibly from different interviews) at once
+    
+    Parameters:
+    - images: Uploaded image files, one per frame
+    - interview_ids: Optional interview ID per frame, echoed back in the results
+    
+    Returns:
+    - results: One entry per frame, in request order, using the /ml/check_face schema.
+      Frames that could not be analyzed have success=false and an error message.
+    """
+    try:
+        if len(images) > settings.BATCH_ENDPOINT_MAX_FRAMES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many frames (max {settings.BATCH_ENDPOINT_MAX_FRAMES})"
+            )
+        
+        if interview_ids is not None and len(interview_ids) != len(images):
+            raise HTTPException(status_code=400, detail="interview_ids must match number of images")
+        
+        for image in images:
+            if not image.content_type.startswith('image/'):
+                raise HTTPException(status_code=400, detail="All files must be images")
+        
+        # Check model availability
+        if not models_ready():
+            raise HTTPException(status_code=503, detail="ML models not loaded", headers={"Retry-After": "5"})
+        
+        frames = [await image.read() for image in images]
+        results = await inference_pool.submit(analyze_images_batch, frames)
+        
+        if interview_ids is not None:
+            for result, interview_id in zip(results, interview_ids):
+                result["interview_id"] = interview_id
+        
+        logger.info(f"Batch analyzed - Frames: {len(results)}")
+        
+        return JSONResponse(content={
+            "success": True,
+            "count": len(results),
+            "results": results
+        })
+        
+    except HTTPException:
+        raise
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Batch endpoint error: {e}")
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+
 @app.post("/ml/check_liveness")
 async def check_liveness(image: UploadFile = File(...)):
     """
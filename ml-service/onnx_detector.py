@@ -0,0 +1,242 @@
+"""
+ONNX Runtime YOLO detector
+
+Optional CPU serving path for the YOLO model (ML_YOLO_BACKEND=onnx). The
+PyTorch weights are exported to ONNX once, optionally quantized to INT8, and
+cached on disk; later starts load the cached artifact without importing the
+PyTorch model at all. Requires the optional packages `onnx` and `onnxruntime`.
+
+OnnxDetector is called like an ultralytics YOLO model on letterboxed frames
+and returns results exposing the same `boxes.cls/conf/xyxy` fields, so the
+rest of the service does not care which backend is serving.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_export_lock = threading.Lock()
+
+
+class OnnxBoxes:
+    """Detections of one frame as numpy arrays (mirrors ultralytics Boxes)"""
+
+    __slots__ = ("xyxy", "conf", "cls")
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+
+class OnnxResult:
+    __slots__ = ("boxes",)
+
+    def __init__(self, boxes: OnnxBoxes):
+        self.boxes = boxes
+
+
+def onnx_artifact_path(weights: str, imgsz: int, int8: bool, cache_dir: str) -> str:
+    """Cache location of the exported model for these export options"""
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    suffix = "-int8" if int8 else ""
+    return os.path.join(cache_dir, f"{stem}-{imgsz}{suffix}.onnx")
+
+
+@contextmanager
+def _cache_dir_lock(cache_dir: str):
+    """
+    Exclusive lock on the export cache, held across threads and processes
+
+    Process-mode pool workers (and several server processes) may all find the
+    artifact missing at startup; the file lock makes one of them export while
+    the others wait and then reuse the result. The OS releases it if the
+    holder dies.
+    """
+    with _export_lock, open(os.path.join(cache_dir, ".export.lock"), "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10s; keep waiting for long exports
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def export_onnx(
+    load_model: Callable[[], object],
+    weights: str,
+    imgsz: int,
+    int8: bool = False,
+    cache_dir: str = "models",
+) -> str:
+    """
+    Return the cached ONNX artifact, exporting (and quantizing) it first if needed
+
+    load_model is only called when the artifact is missing. Safe to call
+    from several threads or processes sharing cache_dir.
+    """
+    path = onnx_artifact_path(weights, imgsz, int8, cache_dir)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with _cache_dir_lock(cache_dir):
+        # Another thread or process may have exported while we waited
+        if os.path.exists(path):
+            return path
+
+        fp32_path = onnx_artifact_path(weights, imgsz, False, cache_dir)
+        if not os.path.exists(fp32_path):
+            start = time.perf_counter()
+            # Dynamic axes so one session serves any micro-batch size
+            exported = load_model().export(format="onnx", imgsz=imgsz, dynamic=True)
+            tmp_path = fp32_path + ".tmp"
+            shutil.move(exported, tmp_path)
+            os.replace(tmp_path, fp32_path)
+            logger.info(f"Exported YOLO to {fp32_path} in {time.perf_counter() - start:.1f}s")
+
+        if int8:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp_path = path + ".tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QUInt8)
+            os.replace(tmp_path, path)
+            logger.info(f"Quantized YOLO to INT8 at {path}")
+    return path
+
+
+class OnnxDetector:
+    """YOLOv8 inference through an ONNX Runtime CPU session"""
+
+    def __init__(self, path: str, intra_threads: int = 0, inter_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_threads > 0:
+            options.intra_op_num_threads = intra_threads
+        if inter_threads > 0:
+            options.inter_op_num_threads = inter_threads
+
+        self.path = path
+        self.session = ort.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(
+        self,
+        images,
+        classes: Optional[Sequence[int]] = None,
+        conf: float = 0.25,
+        iou: float = 0.7,
+        max_det: int = 300,
+        **_ignored,
+    ) -> List[OnnxResult]:
+        """
+        Detect objects in one or more letterboxed BGR frames
+
+        Accepts the same keyword arguments as the ultralytics predictor;
+        imgsz/half/verbose are fixed at export time and ignored here.
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+        # NCHW float32 RGB in [0, 1], as the exported graph expects
+        blob = cv2.dnn.blobFromImages(images, 1 / 255.0, swapRB=True)
+        outputs = self.session.run(None, {self.input_name: blob})[0]
+        return [
+            OnnxResult(self._postprocess(prediction, classes, conf, iou, max_det))
+            for prediction in outputs
+        ]
+
+    @staticmethod
+    def _postprocess(
+        prediction: np.ndarray,
+        classes: Optional[Sequence[int]],
+        conf: float,
+        iou: float,
+        max_det: int,
+    ) -> OnnxBoxes:
+        # (4 + num_classes, anchors) -> (anchors, 4 + num_classes)
+        prediction = prediction.T
+        scores = prediction[:, 4:]
+        class_ids = np.arange(scores.shape[1])
+        if classes:
+            class_ids = np.asarray(classes)
+            scores = scores[:, class_ids]
+
+        best = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), best]
+        keep = confidences >= conf
+        if not keep.any():
+            empty = np.zeros((0,), np.float32)
+            return OnnxBoxes(np.zeros((0, 4), np.float32), empty, empty)
+
+        cxcywh = prediction[keep, :4]
+        confidences = confidences[keep]
+        labels = class_ids[best[keep]]
+
+        # Class-aware NMS, as the ultralytics predictor does by default
+        xywh = cxcywh.copy()
+        xywh[:, :2] -= cxcywh[:, 2:] / 2
+        indices = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), confidences.tolist(), labels.tolist(), conf, iou
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        indices = indices[np.argsort(-confidences[indices])][:max_det]
+
+        xyxy = np.concatenate([xywh[indices, :2], xywh[indices, :2] + cxcywh[indices, 2:]], axis=1)
+        return OnnxBoxes(
+            xyxy.astype(np.float32),
+            confidences[indices].astype(np.float32),
+            labels[indices].astype(np.float32),
+        )
+
+
+def load_onnx_detector(
+    load_model: Callable[[], object],
+    weights: str,
+    imgsz: int,
+    int8: bool = False,
+    cache_dir: str = "models",
+    intra_threads: int = 0,
+    inter_threads: int = 0,
+) -> OnnxDetector:
+    """Export (once) and open the ONNX detector; raises ImportError without onnxruntime"""
+    import onnxruntime  # noqa: F401  Fail before exporting if the runtime is missing
+
+    path = export_onnx(load_model, weights, imgsz, int8, cache_dir)
+    detector = OnnxDetector(path, intra_threads, inter_threads)
+    logger.info(f"ONNX Runtime detector ready ({path})")
+    return detector
@@ -0,0 +1,153 @@
+"""
+Frame preprocessing
+
+Decodes each frame once, as small as the detectors allow, and prepares the
+two inputs analysis needs: a downscaled grayscale image for the Haar
+cascades and a letterboxed square image for YOLO. Intermediate images are
+written into per-thread buffers that are reused across calls, so steady-state
+analysis does not allocate a new full-size array per step.
+
+Coordinates: detectors work on scaled images, but every box leaving this
+service is in the pixels of the frame as it was uploaded.
+"""
+
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# JPEG reduced-size decode flags by reduction factor (libjpeg scales during IDCT)
+_REDUCED_COLOR = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Start-of-frame markers carrying the image size (SOF0-SOF15 minus DHT/JPG/DAC)
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Padding colour used by ultralytics' own letterboxing
+LETTERBOX_FILL = 114
+
+# Training window of the Haar face cascade: smaller faces cannot be detected
+CASCADE_WINDOW = 24
+
+_buffers = threading.local()
+
+
+def _buffer(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Per-thread uint8 scratch array, reallocated only when the shape changes"""
+    pool = getattr(_buffers, "pool", None)
+    if pool is None:
+        pool = _buffers.pool = {}
+    buffer = pool.get(name)
+    if buffer is None or buffer.shape != shape:
+        buffer = pool[name] = np.empty(shape, np.uint8)
+    return buffer
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG header without decoding, or None if not a JPEG"""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Markers without a length
+            i += 2
+            continue
+        if marker in _SOF_MARKERS:
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def decode_frame(
+    image_bytes: bytes, min_width: int = 0, max_reduction: int = 8
+) -> Tuple[np.ndarray, int]:
+    """
+    Decode a frame, shrinking large JPEGs during decoding
+
+    Picks the largest reduction (2, 4 or 8, at most max_reduction) that keeps
+    the decoded width at or above min_width; other formats decode at full
+    size. Returns (BGR image, reduction factor). Raises ValueError if
+    decoding fails.
+    """
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    reduction = 1
+    if min_width > 0:
+        size = jpeg_dimensions(image_bytes)
+        if size is not None:
+            for factor in (8, 4, 2):
+                if factor <= max_reduction and size[0] // factor >= min_width:
+                    reduction = factor
+                    break
+
+    flags = _REDUCED_COLOR.get(reduction, cv2.IMREAD_COLOR)
+    img = cv2.imdecode(nparr, flags)
+    if img is None:
+        raise ValueError("Failed to decode image")
+    return img, reduction
+
+
+def cascade_gray(
+    img: np.ndarray, max_width: int = 0, min_scale: float = 0.0
+) -> Tuple[np.ndarray, float]:
+    """
+    Grayscale image for the Haar cascades, at most max_width wide unless
+    that would scale it below min_scale
+    Returns (gray, scale) where scale = gray pixels per img pixel
+    """
+    height, width = img.shape[:2]
+    scale = max(max_width / width, min_scale) if max_width > 0 else 1.0
+    if scale >= 1.0:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=_buffer("gray", (height, width))), 1.0
+
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    # Shrink first so the colour conversion only touches the small image
+    small = cv2.resize(
+        img, size, dst=_buffer("small", (size[1], size[0], 3)), interpolation=cv2.INTER_AREA
+    )
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=_buffer("gray", (size[1], size[0])))
+    return gray, scale
+
+
+def letterbox(img: np.ndarray, imgsz: int, slot: int = 0) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Fit img into an imgsz x imgsz canvas, keeping aspect ratio and padding the rest
+
+    slot selects the buffer, so a batch can hold several canvases at once.
+    Returns (canvas, scale, (pad_x, pad_y)); a canvas pixel p maps back to
+    (p - pad) / scale in img.
+    """
+    height, width = img.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+    canvas = _buffer(f"letterbox{slot}", (imgsz, imgsz, 3))
+    # Only the padding bands need refilling; the image area is overwritten
+    canvas[:pad_y] = LETTERBOX_FILL
+    canvas[pad_y + new_h:] = LETTERBOX_FILL
+    canvas[:, :pad_x] = LETTERBOX_FILL
+    canvas[:, pad_x + new_w:] = LETTERBOX_FILL
+
+    if (new_w, new_h) == (width, height):
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = img
+    else:
+        resized = cv2.resize(
+            img,
+            (new_w, new_h),
+            dst=_buffer(f"resized{slot}", (new_h, new_w, 3)),
+            interpolation=cv2.INTER_LINEAR,
+        )
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return canvas, scale, (pad_x, pad_y)
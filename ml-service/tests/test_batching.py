@@ -0,0 +1,36 @@
+"""
+Tests for the micro-batching queue
+"""
+
+import asyncio
+
+import pytest
+
+from batching import MicroBatcher
+
+
+async def _double(items):
+    return [item * 2 for item in items]
+
+
+async def test_batches_concurrent_items():
+    batcher = MicroBatcher(_double, max_batch_size=4, max_wait_ms=50)
+    await batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+        assert results == [0, 2, 4, 6]
+        assert batcher.get_stats()["batches_processed"] == 1
+    finally:
+        await batcher.stop()
+
+
+async def test_stop_fails_partly_collected_batch():
+    batcher = MicroBatcher(_double, max_batch_size=8, max_wait_ms=10_000)
+    await batcher.start()
+    submitted = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+    await asyncio.sleep(0.05)
+
+    await batcher.stop()
+    for task in submitted:
+        with pytest.raises(RuntimeError, match="Batcher stopped"):
+            await asyncio.wait_for(task, 1)
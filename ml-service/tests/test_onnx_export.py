@@ -0,0 +1,58 @@
+"""
+Tests for the cached ONNX export
+"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from onnx_detector import export_onnx, onnx_artifact_path
+
+
+class _FakeModel:
+    """Stands in for the ultralytics model; logs each export to a file"""
+
+    def __init__(self, workdir: str):
+        self.workdir = workdir
+
+    def export(self, format: str, imgsz: int, dynamic: bool) -> str:
+        with open(os.path.join(self.workdir, "exports.log"), "a") as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(0.2)  # Long enough for the other exporters to arrive
+        path = os.path.join(self.workdir, f"export-{os.getpid()}.onnx")
+        with open(path, "wb") as handle:
+            handle.write(b"onnx")
+        return path
+
+
+def _export_in_child(workdir: str) -> None:
+    export_onnx(lambda: _FakeModel(workdir), "yolov8n.pt", 320, cache_dir=os.path.join(workdir, "models"))
+
+
+def test_concurrent_processes_export_once(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_export_in_child, args=(str(tmp_path),)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    assert len((tmp_path / "exports.log").read_text().splitlines()) == 1
+    assert os.path.exists(onnx_artifact_path("yolov8n.pt", 320, False, str(tmp_path / "models")))
+
+
+def test_cached_artifact_skips_export(tmp_path):
+    cache_dir = str(tmp_path / "models")
+    os.makedirs(cache_dir)
+    path = onnx_artifact_path("yolov8n.pt", 320, False, cache_dir)
+    open(path, "wb").close()
+
+    def load_model():
+        raise AssertionError("model loaded despite cached artifact")
+
+    assert export_onnx(load_model, "yolov8n.pt", 320, cache_dir=cache_dir) == path
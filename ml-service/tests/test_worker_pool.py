@@ -0,0 +1,76 @@
+"""
+Tests for the inference worker pool
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from worker_pool import InferenceWorkerPool, PoolSaturatedError, default_worker_count
+
+
+def test_default_worker_count_is_bounded():
+    assert 1 <= default_worker_count() <= 4
+    assert InferenceWorkerPool(max_workers=0).max_workers == default_worker_count()
+
+
+async def test_cancelled_caller_keeps_slot_until_job_ends():
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(5)
+
+    pool = InferenceWorkerPool(mode="thread", max_workers=1, max_queue_depth=0)
+    pool.start()
+    try:
+        task = asyncio.create_task(pool.submit(blocking_job))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The job is still running, so the pool is still full
+        assert pool.get_stats()["pending"] == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.submit(sum, [1, 2])
+
+        release.set()
+        for _ in range(100):
+            if pool.get_stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.get_stats()["pending"] == 0
+        assert pool.get_stats()["completed"] == 1
+        assert await pool.submit(sum, [1, 2]) == 3
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+async def test_errors_are_raised_and_counted():
+    pool = InferenceWorkerPool(mode="thread", max_workers=1)
+    pool.start()
+    try:
+        with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+            await pool.submit(divmod, 1, 0)
+        await asyncio.sleep(0.01)
+        stats = pool.get_stats()
+        assert stats["failed"] == 1
+        assert stats["pending"] == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_failed_submit_releases_slot():
+    pool = InferenceWorkerPool(mode="thread", max_workers=1, max_queue_depth=0)
+    pool.start()
+    pool._executor.shutdown()  # As if the executor broke underneath the pool
+    try:
+        with pytest.raises(RuntimeError):
+            await pool.submit(sum, [1, 2])
+        assert pool.get_stats()["pending"] == 0
+    finally:
+        pool.shutdown()
@@ -0,0 +1,207 @@
+"""
+Inference worker pool
+
+Runs CPU-bound frame analysis outside the asyncio event loop, either on a
+thread pool (OpenCV and torch release the GIL) or on a process pool, with a
+bounded queue and per-worker metrics.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("inline", "thread", "process")
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool already holds its maximum number of pending tasks"""
+
+
+def default_worker_count() -> int:
+    """Half the CPUs, at most 4: every worker holds its own copy of the models"""
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+def _worker_id() -> str:
+    return f"{os.getpid()}:{threading.current_thread().name}"
+
+
+def _run_task(fn: Callable, args: Tuple) -> Tuple[Any, str, float, Optional[str]]:
+    """
+    Execute a task inside a worker and report which worker ran it
+
+    Exceptions are flattened to strings so they can cross process boundaries.
+    """
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+        error = None
+    except Exception as exc:
+        result = None
+        error = f"{type(exc).__name__}: {exc}"
+    return result, _worker_id(), time.perf_counter() - start, error
+
+
+class InferenceWorkerPool:
+    """
+    Bounded executor for frame analysis tasks
+
+    Modes:
+    - inline: run on the event loop (legacy behaviour, useful for debugging)
+    - thread: ThreadPoolExecutor, each thread loads its own models via initializer
+    - process: ProcessPoolExecutor, each process loads its own models via initializer
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue_depth: int = 64,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Invalid execution mode '{mode}'. Must be one of: {EXECUTION_MODES}")
+
+        self.mode = mode
+        self.max_workers = max_workers or default_worker_count()
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.initializer = initializer
+
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.worker_stats: Dict[str, Dict[str, Any]] = {}
+
+    def start(self):
+        """Create the underlying executor"""
+        if self._executor is not None or self.mode == "inline":
+            return
+
+        if self.mode == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference",
+                initializer=self.initializer,
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        logger.info(f"Inference pool started ({self.mode}, {self.max_workers} workers)")
+
+    def shutdown(self):
+        """Stop the executor, dropping tasks that have not started yet"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of tasks that may be running or queued at once"""
+        return self.max_workers + self.max_queue_depth
+
+    @property
+    def load(self) -> float:
+        """Fraction of capacity in use (1.0 = new tasks are rejected)"""
+        return self._pending / self.capacity
+
+    async def submit(self, fn: Callable, *args) -> Any:
+        """
+        Run fn(*args) on a worker and return its result
+
+        Raises PoolSaturatedError when the pool is at capacity.
+        """
+        if self._pending >= self.capacity:
+            self.rejected += 1
+            raise PoolSaturatedError(
+                f"Inference queue full ({self._pending} pending, capacity {self.capacity})"
+            )
+
+        self._pending += 1
+        self.submitted += 1
+        if self._executor is None:
+            try:
+                outcome = _run_task(fn, args)
+            finally:
+                self._pending -= 1
+            self._record(*outcome[1:])
+        else:
+            # The slot is released when the job ends, not when the caller stops
+            # waiting: cancelling the caller does not stop a job already running
+            loop = asyncio.get_running_loop()
+            try:
+                job = self._executor.submit(_run_task, fn, args)
+            except Exception:  # Executor shut down or broken: no job will release the slot
+                self._pending -= 1
+                raise
+            job.add_done_callback(functools.partial(self._job_done, loop))
+            outcome = await asyncio.wrap_future(job)
+
+        result, _, _, error = outcome
+        if error is not None:
+            raise RuntimeError(error)
+        return result
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop, job: Future):
+        # Called from the worker thread (or the executor's management thread)
+        try:
+            loop.call_soon_threadsafe(self._finish, job)
+        except RuntimeError:  # Event loop already closed
+            pass
+
+    def _finish(self, job: Future):
+        self._pending -= 1
+        if not job.cancelled() and job.exception() is None:
+            self._record(*job.result()[1:])
+
+    def _record(self, worker: str, elapsed: float, error: Optional[str]):
+        stats = self.worker_stats.setdefault(
+            worker, {"tasks": 0, "errors": 0, "busy_seconds": 0.0, "last_task_ms": 0.0}
+        )
+        stats["tasks"] += 1
+        stats["busy_seconds"] += elapsed
+        stats["last_task_ms"] = round(elapsed * 1000.0, 2)
+
+        if error is None:
+            self.completed += 1
+        else:
+            stats["errors"] += 1
+            self.failed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool and per-worker statistics"""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "load": round(self.load, 3),
+            "queued": max(0, self._pending - self.max_workers),
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "per_worker": {
+                worker: {
+                    **stats,
+                    "busy_seconds": round(stats["busy_seconds"], 3),
+                    "avg_task_ms": round(stats["busy_seconds"] * 1000.0 / stats["tasks"], 2),
+                }
+                for worker, stats in self.worker_stats.items()
+            },
+        }
@@ -1,8 +1,9 @@
 import { useRef, useState, useEffect, useCallback } from 'react';
 import Webcam from 'react-webcam';
-import { logCheatingEvent } from '../services/api';
+import { logCheatingEvent, openCheatingStream } from '../services/api';
 
-const CAPTURE_INTERVAL = 3000; // 3 seconds
+const CAPTURE_INTERVAL = 3000; // 3 seconds, until the server recommends otherwise
+const STREAM_RECONNECT_DELAY = 5000; // 5 seconds
 
 export default function WebcamFeed({ interviewId, onAlert }) {
   const webcamRef = useRef(null);
@@ -13,6 +14,105 @@ export default function WebcamFeed({ interviewId, onAlert }) {
   const [captureCount, setCaptureCount] = useState(0);
   const [error, setError] = useState('');
 
+  const socketRef = useRef(null);
+  const onAlertRef = useRef(onAlert);
+  const captureDelayRef = useRef(CAPTURE_INTERVAL);
+
+  useEffect(() => {
+    onAlertRef.current = onAlert;
+  }, [onAlert]);
+
+  // Apply a detection result from either the HTTP fallback or the stream
+  const handleDetection = useCallback((response, transient) => {
+    // The server adapts the capture rate to risk and load
+    if (response.next_capture_ms) {
+      captureDelayRef.current = response.next_capture_ms;
+    }
+
+    // Update status based on detection
+    const severity = response.detection_result?.severity || 'low';
+
+    if (severity === 'critical') {
+      setDetectionStatus('critical');
+    } else if (severity === 'high' || severity === 'medium') {
+      setDetectionStatus('warning');
+    } else {
+      setDetectionStatus('normal');
+    }
+
+    // Notify parent if critical event was logged (mobile/multiple faces)
+    if (response.event_logged && onAlertRef.current) {
+      console.log('🔔 WebcamFeed: Critical event detected, calling onAlert');
+      console.log('📦 Response data:', response);
+
+      // Determine event type from detection result
+      const detectionResult = response.detection_result || {};
+      let eventType = 'UNKNOWN';
+
+      if (detectionResult.mobile_detected) {
+        eventType = 'MOBILE_DEVICE_DETECTED';
+      }
+
+      console.log(`🎯 Event Type determined: ${eventType}`);
+
+      onAlertRef.current({
+        severity,
+        message: detectionResult.message || 'Detection event',
+        score: detectionResult.cheating_score || 0,
+        event_type: eventType,
+        issues: detectionResult.issues,
+        detection_result: detectionResult,
+      });
+    }
+
+    // Polled results only describe one frame, so reset non-critical status after 2 seconds.
+    // Streamed states persist until the server pushes a change.
+    if (transient && severity !== 'critical') {
+      setTimeout(() => setDetectionStatus('normal'), 2000);
+    }
+  }, []);
+
+  // Persistent proctoring stream; frames fall back to HTTP while it is down
+  useEffect(() => {
+    if (!isActive || !interviewId) return;
+
+    let closed = false;
+    let reconnectTimer = null;
+
+    const connect = () => {
+      const socket = openCheatingStream(interviewId);
+
+      socket.onmessage = event => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'error') {
+          console.error('Cheating stream error:', message.error);
+          setError('Detection temporarily unavailable');
+          setTimeout(() => setError(''), 3000);
+          return;
+        }
+        handleDetection(message, false);
+      };
+
+      socket.onclose = () => {
+        if (socketRef.current === socket) socketRef.current = null;
+        if (!closed) reconnectTimer = setTimeout(connect, STREAM_RECONNECT_DELAY);
+      };
+
+      socketRef.current = socket;
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      if (socketRef.current) {
+        socketRef.current.close();
+        socketRef.current = null;
+      }
+    };
+  }, [isActive, interviewId, handleDetection]);
+
   const captureAndSend = useCallback(async () => {
     if (!webcamRef.current || !interviewId) return;
 
@@ -27,75 +127,49 @@ export default function WebcamFeed({ interviewId, onAlert }) {
       // Extract base64 data (remove data:image/jpeg;base64, prefix)
       const base64Data = imageSrc.split(',')[1];
 
-      // Send to backend
-      const response = await logCheatingEvent({
-        interview_id: interviewId,
-        frame_data: base64Data,
-        timestamp: new Date().toISOString(),
-      });
-
-      // Update status based on detection
-      const severity = response.detection_result?.severity || 'low';
-
-      if (severity === 'critical') {
-        setDetectionStatus('critical');
-      } else if (severity === 'high' || severity === 'medium') {
-        setDetectionStatus('warning');
+      const socket = socketRef.current;
+      if (socket && socket.readyState === WebSocket.OPEN) {
+        // Stream raw JPEG bytes; the server only replies when the state or capture interval changes
+        socket.send(Uint8Array.from(atob(base64Data), c => c.charCodeAt(0)));
       } else {
-        setDetectionStatus('normal');
+        // Send to backend
+        const response = await logCheatingEvent({
+          interview_id: interviewId,
+          frame_data: base64Data,
+          timestamp: new Date().toISOString(),
+        });
+        handleDetection(response, true);
       }
 
       // Update last check time
       setLastCheck(new Date().toLocaleTimeString());
       setCaptureCount(prev => prev + 1);
-
-      // Notify parent if critical event was logged (mobile/multiple faces)
-      if (response.event_logged && onAlert) {
-        console.log('🔔 WebcamFeed: Critical event detected, calling onAlert');
-        console.log('📦 Response data:', response);
-
-        // Determine event type from detection result
-        const detectionResult = response.detection_result || {};
-        let eventType = 'UNKNOWN';
-
-        if (detectionResult.mobile_detected) {
-          eventType = 'MOBILE_DEVICE_DETECTED';
-        }
-
-        console.log(`🎯 Event Type determined: ${eventType}`);
-
-        onAlert({
-          severity,
-          message: detectionResult.message || 'Detection event',
-          score: detectionResult.cheating_score || 0,
-          event_type: eventType,
-          issues: detectionResult.issues,
-          detection_result: detectionResult,
-        });
-      }
-
-      // Reset status indicator after 2 seconds for non-critical events
-      if (severity !== 'critical') {
-        setTimeout(() => setDetectionStatus('normal'), 2000);
-      }
     } catch (err) {
       console.error('Cheating detection error:', err);
       setError('Detection temporarily unavailable');
       setTimeout(() => setError(''), 3000);
     }
-  }, [interviewId]); // Remove onAlert from dependencies to prevent infinite loop
+  }, [interviewId, handleDetection]);
 
-  // Auto-capture interval
+  // Auto-capture loop: each capture schedules the next after the recommended delay
   useEffect(() => {
     if (!isActive || !interviewId) return;
 
-    // Call immediately on mount
-    captureAndSend();
+    let stopped = false;
+    let timer = null;
 
-    // Then set interval
-    const interval = setInterval(captureAndSend, CAPTURE_INTERVAL);
+    const loop = async () => {
+      await captureAndSend();
+      if (!stopped) timer = setTimeout(loop, captureDelayRef.current);
+    };
+
+    // Call immediately on mount
+    loop();
 
-    return () => clearInterval(interval);
+    return () => {
+      stopped = true;
+      clearTimeout(timer);
+    };
   }, [isActive, interviewId, captureAndSend]);
 
   const handleUserMediaError = error => {
@@ -2,7 +2,7 @@ import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import toast from 'react-hot-toast';
 import { useInterview } from '../context/InterviewContext';
-import { sendAnswer, endInterview } from '../services/api';
+import { sendAnswerStream, endInterview } from '../services/api';
 import Header from '../components/Header';
 import ChatBubble from '../components/ChatBubble';
 import ChatInput from '../components/ChatInput';
@@ -14,6 +14,7 @@ export default function Interview() {
   const messagesEndRef = useRef(null);
 
   const [loading, setLoading] = useState(false);
+  const [streamingText, setStreamingText] = useState('');
   const [error, setError] = useState('');
   const [alerts, setAlerts] = useState([]);
 
@@ -28,7 +29,7 @@ export default function Interview() {
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [interviewData?.messages]);
+  }, [interviewData?.messages, streamingText]);
 
   // Tab switching detection
   useEffect(() => {
@@ -69,11 +70,15 @@ export default function Interview() {
       };
       addMessage(userMessage);
 
-      // Send to backend
-      const response = await sendAnswer({
-        interview_id: interviewData.interviewId,
-        user_answer: answer,
-      });
+      // Send to backend, rendering the agent response as it streams in
+      const response = await sendAnswerStream(
+        {
+          interview_id: interviewData.interviewId,
+          user_answer: answer,
+        },
+        text => setStreamingText(prev => prev + text)
+      );
+      setStreamingText('');
 
       // Add agent response
       const agentResponse = {
@@ -104,6 +109,7 @@ export default function Interview() {
         err.response?.data?.detail || 'Failed to send answer. Please try again.'
       );
     } finally {
+      setStreamingText('');
       setLoading(false);
     }
   };
@@ -236,8 +242,16 @@ export default function Interview() {
               </div>
             )}
 
+            {/* Streaming Agent Response */}
+            {streamingText && (
+              <ChatBubble
+                message={{ role: 'assistant', content: streamingText }}
+                variant="agent"
+              />
+            )}
+
             {/* Thinking Indicator */}
-            {loading && (
+            {loading && !streamingText && (
               <div className="flex justify-start mb-4">
                 <div className="bg-gray-100 rounded-lg p-4 rounded-bl-none">
                   <div className="flex items-center space-x-2 text-gray-600">
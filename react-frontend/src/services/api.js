@@ -47,6 +47,58 @@ export const sendAnswer = async data => {
   return response.data;
 };
 
+// Streams the agent response over Server-Sent Events; onToken receives text
+// as it is generated and the resolved value matches sendAnswer's response
+export const sendAnswerStream = async (data, onToken) => {
+  const response = await fetch(`${BASE_URL}/interview/next/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+  });
+
+  if (!response.ok) {
+    const error = new Error(`Request failed with status ${response.status}`);
+    error.response = { data: await response.json().catch(() => ({})) };
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let payload = '';
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) payload += line.slice(6);
+      }
+      const parsed = payload ? JSON.parse(payload) : {};
+
+      if (event === 'token') {
+        onToken?.(parsed.text);
+      } else if (event === 'done') {
+        return parsed;
+      } else if (event === 'error') {
+        const error = new Error(parsed.detail);
+        error.response = { data: parsed };
+        throw error;
+      }
+    }
+  }
+
+  throw new Error('Response stream ended unexpectedly');
+};
+
 export const endInterview = async data => {
   const response = await api.post('/interview/end', data);
   return response.data;
@@ -58,6 +110,14 @@ export const logCheatingEvent = async data => {
   return response.data;
 };
 
+// Persistent proctoring channel: send binary JPEG frames, receive state/alert pushes
+export const openCheatingStream = interviewId => {
+  const wsUrl = BASE_URL.replace(/^http/, 'ws');
+  const socket = new WebSocket(`${wsUrl}/cheating/stream/${interviewId}`);
+  socket.binaryType = 'arraybuffer';
+  return socket;
+};
+
 export const getCheatingTimeline = async interviewId => {
   const response = await api.get(`/cheating/timeline/${interviewId}`);
   return response.data;